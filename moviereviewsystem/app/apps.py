@@ -1,6 +1,39 @@
 from django.apps import AppConfig
+import os
+import sys
+
+
+def serving_requests():
+    """
+    True when this process is a web worker rather than a management command
+
+    `manage.py runserver` counts only in the process that actually serves
+    (the autoreloader child, or the only process with --noreload).
+    """
+    program = os.path.basename(sys.argv[0]) if sys.argv else ''
+    if program not in ('manage.py', 'django-admin') or len(sys.argv) < 2:
+        return True  # gunicorn, uwsgi, daphne, uvicorn, ...
+    if sys.argv[1] == 'runserver':
+        return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+    return False
 
 
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from django.conf import settings
+        from . import autocomplete, catalogue, response_cache  # connect their Movie signal handlers
+        from . import reviews  # keeps MovieSentiment totals in step with Review rows
+        from . import taxonomy  # re-links genres/countries of saved movies
+        from . import metrics  # counts queries of sampled requests
+
+        # Warm the sentiment model (and the process pool, if used) up off the
+        # request path, web workers only
+        if getattr(settings, 'SENTIMENT_WARMUP', True) and serving_requests():
+            from .sentiment import model_registry
+            model_registry.warm_up()
+
+        if autocomplete.MOVIE_AUTOCOMPLETE_ENABLED and serving_requests():
+            autocomplete.warm_up()
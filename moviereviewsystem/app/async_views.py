@@ -0,0 +1,185 @@
+"""
+Async (ASGI) versions of the sentiment and catalogue API endpoints
+
+Served under /api/async/ and meant for `asgi.py` deployments (uvicorn,
+daphne, ...). Under WSGI they still work, but Django runs each one in its
+own event loop, so there is no benefit.
+
+Concurrency limits:
+  * Idle or waiting connections cost a coroutine, not a thread. One ASGI
+    worker can keep thousands of keep-alive connections open.
+  * Inference is CPU-bound. It runs in a dedicated pool of
+    SENTIMENT_ASYNC_INFERENCE_WORKERS threads, so the event loop never
+    blocks on the pipeline. Per worker process, at most that many reviews
+    are scored at once (fewer in practice, because of the GIL).
+  * At most SENTIMENT_ASYNC_MAX_PENDING scoring requests may be running or
+    queued at once. Past that, requests get an immediate 503 instead of
+    piling up unbounded latency.
+  * Database calls go through sync_to_async(thread_sensitive=True), which
+    runs them on one shared thread per process. DB access is therefore
+    serialized per worker; scale DB-heavy traffic with more processes.
+"""
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from . import autocomplete
+from .metrics import stage
+from .sentiment import model_registry
+from .models import Movie
+from .views import (
+    analyze_review, csrf_passes, csrf_rejected, list_movies, parse_movie_fields, parse_search_params,
+    parse_tag_filters, review_movie_id, save_review, search_movies,
+)
+import asyncio
+import contextvars
+import functools
+import json
+import threading
+
+SENTIMENT_ASYNC_INFERENCE_WORKERS = getattr(settings, 'SENTIMENT_ASYNC_INFERENCE_WORKERS', 4)
+SENTIMENT_ASYNC_MAX_PENDING = getattr(settings, 'SENTIMENT_ASYNC_MAX_PENDING', 256)
+
+# Bounded pool for CPU-bound scoring, separate from the DB thread
+inference_executor = ThreadPoolExecutor(
+    max_workers=SENTIMENT_ASYNC_INFERENCE_WORKERS,
+    thread_name_prefix='sentiment-async',
+)
+
+# Seconds clients are asked to wait before retrying an overloaded request
+OVERLOAD_RETRY_AFTER = 1
+
+# run_inference() result when the call was refused (None can be a real result)
+OVERLOADED = object()
+
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+async def run_inference(func, *args):
+    """
+    Run a CPU-bound call in the inference pool without blocking the event loop
+
+    Returns OVERLOADED instead of running it when SENTIMENT_ASYNC_MAX_PENDING
+    calls are already in flight.
+    """
+    global _pending
+    with _pending_lock:
+        if _pending >= SENTIMENT_ASYNC_MAX_PENDING:
+            return OVERLOADED
+        _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        # run_in_executor doesn't carry the context over; copy it so metrics stages still count
+        call = functools.partial(contextvars.copy_context().run, func, *args)
+        return await loop.run_in_executor(inference_executor, call)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+def _overloaded():
+    response = JsonResponse({
+        'error': 'Sentiment service is busy, please retry',
+        'sentiment': 'unknown',
+        'confidence': 0
+    }, status=503)
+    response['Retry-After'] = str(OVERLOAD_RETRY_AFTER)
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def analyze_sentiment(request):
+    """
+    Async API endpoint to analyze sentiment of a movie review
+
+    With a movie_id the review is also saved and counted in that movie's
+    summary; that needs a valid CSRF token (X-CSRFToken), scoring alone doesn't.
+    """
+    # Loading the model (first request only) also happens off the event loop
+    model = model_registry.current
+    if model is None:
+        model = await run_inference(model_registry.get)
+        if model is OVERLOADED:
+            return _overloaded()
+    if model is None:
+        return JsonResponse({
+            'error': 'Sentiment model not available',
+            'sentiment': 'unknown',
+            'confidence': 0
+        }, status=503)
+
+    try:
+        with stage('parse'):
+            data = json.loads(request.body)
+        review_text = data.get('review', '').strip()
+
+        if not review_text:
+            return JsonResponse({
+                'error': 'No review text provided',
+                'sentiment': 'unknown',
+                'confidence': 0
+            }, status=400)
+
+        if data.get('movie_id') not in (None, '') and not csrf_passes(request):
+            return csrf_rejected()
+        try:
+            movie_id = await sync_to_async(review_movie_id)(data)
+        except ValueError as e:
+            return JsonResponse({'error': str(e), 'sentiment': 'unknown', 'confidence': 0}, status=400)
+        except Movie.DoesNotExist as e:
+            return JsonResponse({'error': str(e), 'sentiment': 'unknown', 'confidence': 0}, status=404)
+
+        result = await run_inference(analyze_review, review_text)
+        if result is OVERLOADED:
+            return _overloaded()
+        if movie_id is not None:
+            user = await request.auser()
+            await sync_to_async(save_review)(result, movie_id, user, review_text)
+        with stage('serialize'):
+            return JsonResponse(result)
+
+    except Exception as e:
+        return JsonResponse({
+            'error': f'Analysis failed: {str(e)}',
+            'sentiment': 'unknown',
+            'confidence': 0
+        }, status=500)
+
+
+async def movie_search_api(request):
+    """Async API endpoint for movie search"""
+    try:
+        query, limit, mode = parse_search_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # Require minimum 2 characters
+    if not query or len(query) < 2:
+        return JsonResponse([], safe=False)
+
+    try:
+        # A built autocomplete index answers in memory; no need to hop to the DB thread
+        if mode == 'typeahead' and autocomplete.autocomplete_index.ready:
+            return JsonResponse(search_movies(query, limit, mode), safe=False)
+        results = await sync_to_async(search_movies, thread_sensitive=True)(query, limit, mode)
+        return JsonResponse(results, safe=False)
+    except Exception as e:
+        return JsonResponse({'error': 'Search failed'}, status=500)
+
+
+async def movie_list(request):
+    """Async API endpoint for all movies (supports ?fields=, ?genre= and ?country= like /api/movies/)"""
+    try:
+        fields = parse_movie_fields(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    try:
+        movies = await sync_to_async(list_movies, thread_sensitive=True)(fields, *parse_tag_filters(request))
+        return JsonResponse(movies, safe=False)
+    except Exception as e:
+        return JsonResponse({'error': 'Failed to fetch movies'}, status=500)
@@ -0,0 +1,316 @@
+from bisect import bisect_left, insort
+from django.conf import settings
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import CatalogueStamp, Movie
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+
+# Serve typeahead lookups from an in-process index of titles instead of the DB
+MOVIE_AUTOCOMPLETE_ENABLED = getattr(settings, 'MOVIE_AUTOCOMPLETE_ENABLED', True)
+
+# Seconds between checks for catalogue changes made by other processes
+MOVIE_AUTOCOMPLETE_REFRESH_INTERVAL = getattr(settings, 'MOVIE_AUTOCOMPLETE_REFRESH_INTERVAL', 60)
+
+# Fields returned for each suggestion (same shape as the search API)
+SUGGESTION_FIELDS = ('id', 'title', 'release_year', 'type', 'rating', 'poster_url')
+
+# Share of the query's trigrams a title needs for a typo-tolerant match
+FUZZY_MIN_SIMILARITY = 0.5
+FUZZY_MIN_QUERY_LENGTH = 4
+
+# Short prefixes match thousands of titles; their top results are memoized
+# (up to the API's max limit) instead of re-ranking the whole range per keystroke
+MEMO_MAX_PREFIX_LENGTH = 3
+MEMO_RESULTS = 50
+
+NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_title(text):
+    """Lowercase, strip accents and collapse punctuation to single spaces"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return NON_WORD_PATTERN.sub(' ', text).strip()
+
+
+def word_trigrams(text, partial_last_word=False):
+    """
+    Trigrams of every word, padded like pg_trgm ("  w", " wo", "wor", "ord", "rd ")
+
+    With `partial_last_word` the last word gets no trailing pad, since the
+    user may still be typing it.
+    """
+    words = text.split()
+    trigrams = set()
+    for position, word in enumerate(words):
+        last = partial_last_word and position == len(words) - 1
+        padded = f"  {word}" if last else f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+class AutocompleteIndex:
+    """
+    In-memory typeahead index over Movie.title
+
+    * a sorted array of (suffix, id) for every word start of every title, so
+      a bisect finds prefix matches on any word ("dark kn" -> The Dark Knight)
+    * a trigram -> ids map for infix matches and typo-tolerant fallback
+
+    Results are ordered like the search API (-release_year, title): prefix
+    matches first, then infix matches, then fuzzy matches by similarity.
+    Saves and deletes in this process update the index through signals.
+    Changes made by other processes (another worker, a bulk import) are
+    picked up by a periodic rebuild when the catalogue version changes.
+    """
+
+    def __init__(self, refresh_interval=MOVIE_AUTOCOMPLETE_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._suggestions = {}   # id -> suggestion dict
+        self._sort_keys = {}     # id -> (-release_year, title, id)
+        self._normalized = {}    # id -> normalized title
+        self._prefixes = []      # sorted (suffix, id)
+        self._trigrams = {}      # trigram -> set of ids
+        self._title_trigrams = {}  # id -> set of trigrams
+        self._memo = {}          # short prefix -> best MEMO_RESULTS ids
+        self._fingerprint = None
+        self._checked_at = 0.0
+        self._refreshing = False
+        self.ready = False
+
+    # --- building ---------------------------------------------------------
+
+    def build(self, movies=None):
+        """(Re)build the whole index from `movies` dicts, or from the database"""
+        fingerprint = None
+        if movies is None:
+            fingerprint = self._current_fingerprint()
+            movies = self._load()
+
+        suggestions, sort_keys, normalized, prefixes, trigrams, title_trigrams = {}, {}, {}, [], {}, {}
+        for movie in movies:
+            movie_id = movie['id']
+            suggestions[movie_id] = {field: movie[field] for field in SUGGESTION_FIELDS}
+            sort_keys[movie_id] = (-movie['release_year'], movie['title'], movie_id)
+            key = normalized[movie_id] = normalize_title(movie['title'])
+            prefixes.extend((suffix, movie_id) for suffix in self._suffixes(key))
+            title_trigrams[movie_id] = word_trigrams(key)
+            for trigram in title_trigrams[movie_id]:
+                trigrams.setdefault(trigram, set()).add(movie_id)
+        prefixes.sort()
+
+        # Precompute the two-letter prefixes (the API's minimum query) so the
+        # first keystroke never ranks a few thousand titles
+        groups = {}
+        for suffix, movie_id in prefixes:
+            groups.setdefault(suffix[:2], set()).add(movie_id)
+        memo = {prefix: heapq.nsmallest(MEMO_RESULTS, ids, key=sort_keys.__getitem__)
+                for prefix, ids in groups.items()}
+
+        # Swap everything at once so lookups never see a half-built index
+        with self._lock:
+            self._suggestions, self._sort_keys, self._normalized = suggestions, sort_keys, normalized
+            self._prefixes, self._trigrams, self._title_trigrams = prefixes, trigrams, title_trigrams
+            self._memo = memo
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            self.ready = True
+        return len(suggestions)
+
+    def ensure_ready(self):
+        """Build the index once; concurrent callers wait for the same build"""
+        if not self.ready:
+            with self._build_lock:
+                if not self.ready:
+                    self.build()
+
+    def _load(self):
+        return Movie.objects.values(*SUGGESTION_FIELDS).iterator(chunk_size=2000)
+
+    def _current_fingerprint(self):
+        return CatalogueStamp.objects.filter(id=1).values_list('version', flat=True).first()
+
+    @staticmethod
+    def _suffixes(key):
+        """The title from each word start onwards"""
+        starts = [0] + [i + 1 for i, char in enumerate(key) if char == ' ']
+        return [key[start:] for start in starts]
+
+    # --- incremental updates ------------------------------------------------
+
+    def add(self, movie):
+        """Insert or replace one movie (a dict with SUGGESTION_FIELDS)"""
+        with self._lock:
+            if not self.ready:
+                return  # picked up by the first build
+            self._remove(movie['id'])
+            movie_id = movie['id']
+            self._suggestions[movie_id] = {field: movie[field] for field in SUGGESTION_FIELDS}
+            self._sort_keys[movie_id] = (-movie['release_year'], movie['title'], movie_id)
+            key = self._normalized[movie_id] = normalize_title(movie['title'])
+            for suffix in self._suffixes(key):
+                insort(self._prefixes, (suffix, movie_id))
+            self._forget_memo(key)
+            self._title_trigrams[movie_id] = word_trigrams(key)
+            for trigram in self._title_trigrams[movie_id]:
+                self._trigrams.setdefault(trigram, set()).add(movie_id)
+
+    def remove(self, movie_id):
+        with self._lock:
+            if self.ready:
+                self._remove(movie_id)
+
+    def _remove(self, movie_id):
+        key = self._normalized.pop(movie_id, None)
+        if key is None:
+            return
+        del self._suggestions[movie_id]
+        del self._sort_keys[movie_id]
+        for suffix in self._suffixes(key):
+            position = bisect_left(self._prefixes, (suffix, movie_id))
+            if position < len(self._prefixes) and self._prefixes[position] == (suffix, movie_id):
+                del self._prefixes[position]
+        self._forget_memo(key)
+        for trigram in self._title_trigrams.pop(movie_id):
+            ids = self._trigrams.get(trigram)
+            if ids is not None:
+                ids.discard(movie_id)
+                if not ids:
+                    del self._trigrams[trigram]
+
+    def _forget_memo(self, key):
+        """Drop memoized results for every short prefix of the title's words"""
+        for suffix in self._suffixes(key):
+            for length in range(1, MEMO_MAX_PREFIX_LENGTH + 1):
+                self._memo.pop(suffix[:length], None)
+
+    def _maybe_refresh(self):
+        """Rebuild in the background if another process changed the catalogue"""
+        if not self.refresh_interval or time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._checked_at = time.monotonic()
+        threading.Thread(target=self._refresh, name='movie-autocomplete-refresh', daemon=True).start()
+
+    def _refresh(self):
+        try:
+            if self._current_fingerprint() != self._fingerprint:
+                self.build()
+        except Exception as e:
+            print(f"⚠️ Autocomplete index refresh failed: {e}")
+        finally:
+            self._refreshing = False
+            connection.close()  # this thread's connection would otherwise linger
+
+    # --- lookups ------------------------------------------------------------
+
+    def lookup(self, query, limit=8):
+        """Up to `limit` suggestion dicts for a partial title (none when limit < 1)"""
+        self.ensure_ready()
+        self._maybe_refresh()
+
+        key = normalize_title(query)
+        if not key or limit < 1:
+            return []  # a negative limit would slice from the end of the memoized lists
+
+        with self._lock:
+            sort_key = self._sort_keys.__getitem__
+            results = self._prefix_matches(key, limit, sort_key)
+            if len(results) < limit and len(key) >= 3:
+                seen = set(results)
+                results.extend(self._infix_matches(key, limit - len(results), seen, sort_key))
+            # Typo tolerance only when nothing matched exactly
+            if not results and len(key) >= FUZZY_MIN_QUERY_LENGTH:
+                results = self._fuzzy_matches(key, limit, sort_key)
+            return [self._suggestions[movie_id] for movie_id in results]
+
+    def _prefix_matches(self, key, limit, sort_key):
+        if len(key) <= MEMO_MAX_PREFIX_LENGTH and limit <= MEMO_RESULTS:
+            best = self._memo.get(key)
+            if best is None:
+                best = self._memo[key] = self._rank_prefix(key, MEMO_RESULTS, sort_key)
+            return best[:limit]
+        return self._rank_prefix(key, limit, sort_key)
+
+    def _rank_prefix(self, key, limit, sort_key):
+        # Every suffix starting with `key` sorts between key and key's successor
+        upper = key[:-1] + chr(ord(key[-1]) + 1)
+        start = bisect_left(self._prefixes, (key,))
+        end = bisect_left(self._prefixes, (upper,), start)
+        ids = {movie_id for _, movie_id in self._prefixes[start:end]}
+        return heapq.nsmallest(limit, ids, key=sort_key)
+
+    def _infix_matches(self, key, limit, seen, sort_key):
+        # Every title containing `key` has all of its (unpadded) trigrams
+        postings = [self._trigrams.get(key[i:i + 3]) for i in range(len(key) - 2)]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:]) - seen
+        normalized = self._normalized
+        matches = [movie_id for movie_id in candidates if key in normalized[movie_id]]
+        return heapq.nsmallest(limit, matches, key=sort_key)
+
+    def _fuzzy_matches(self, key, limit, sort_key):
+        query_trigrams = word_trigrams(key, partial_last_word=True)
+        needed = math.ceil(FUZZY_MIN_SIMILARITY * len(query_trigrams))
+
+        # A title sharing `needed` trigrams must contain at least one of the
+        # len - needed + 1 rarest ones, so only their postings are candidates
+        postings = sorted((self._trigrams.get(trigram, ()) for trigram in query_trigrams), key=len)
+        candidates = set().union(*postings[:len(postings) - needed + 1])
+
+        title_trigrams = self._title_trigrams
+        matches = []
+        for movie_id in candidates:
+            shared = len(query_trigrams & title_trigrams[movie_id])
+            if shared >= needed:
+                matches.append((-shared, sort_key(movie_id), movie_id))
+        return [movie_id for _, _, movie_id in heapq.nsmallest(limit, matches)]
+
+    def stats(self):
+        return {
+            'ready': self.ready,
+            'titles': len(self._suggestions),
+            'prefix_entries': len(self._prefixes),
+            'trigrams': len(self._trigrams),
+        }
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def warm_up():
+    """Build the index in a background thread so the first keystroke is fast"""
+    def build():
+        try:
+            autocomplete_index.ensure_ready()
+        except Exception as e:
+            print(f"⚠️ Autocomplete index warm-up failed: {e}")
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=build, name='movie-autocomplete-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+@receiver(post_save, sender=Movie)
+def index_saved_movie(sender, instance, **kwargs):
+    autocomplete_index.add({field: getattr(instance, field) for field in SUGGESTION_FIELDS})
+
+
+@receiver(post_delete, sender=Movie)
+def unindex_deleted_movie(sender, instance, **kwargs):
+    autocomplete_index.remove(instance.id)
@@ -0,0 +1,121 @@
+from concurrent.futures import Future
+from django.conf import settings
+import queue
+import threading
+import time
+
+# Coalesce concurrent single-review requests into one predict_proba call
+SENTIMENT_MICROBATCH_ENABLED = getattr(settings, 'SENTIMENT_MICROBATCH_ENABLED', False)
+SENTIMENT_MICROBATCH_MAX_BATCH_SIZE = getattr(settings, 'SENTIMENT_MICROBATCH_MAX_BATCH_SIZE', 32)
+SENTIMENT_MICROBATCH_MAX_WAIT_MS = getattr(settings, 'SENTIMENT_MICROBATCH_MAX_WAIT_MS', 5)
+
+
+class MicroBatcher:
+    """
+    In-process micro-batching scheduler for sentiment scoring
+
+    Request threads enqueue (text, model) and wait on a Future. One worker
+    thread takes the first queued item, keeps collecting until `max_batch_size`
+    items or `max_wait_ms` have passed, scores the batch with one call per
+    model snapshot and resolves the futures. If a batch fails, its items are
+    retried one by one so a single bad input only fails its own request.
+    """
+
+    def __init__(self, score_batch, max_batch_size=SENTIMENT_MICROBATCH_MAX_BATCH_SIZE,
+                 max_wait_ms=SENTIMENT_MICROBATCH_MAX_WAIT_MS):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def submit(self, text, model):
+        """Queue one text for scoring with `model`; returns a Future of its result dict"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, model, future))
+        return future
+
+    def score_texts(self, texts, model, timeout=None):
+        """Score texts through the batcher and wait for all results, in input order"""
+        futures = [self.submit(text, model) for text in texts]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='sentiment-microbatch', daemon=True)
+                self._worker.start()
+
+    def _collect(self):
+        """Block for the first item, then gather more until the batch is full or the wait is over"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self.batches += 1
+            self.items += len(batch)
+
+            # Items queued around a model swap are scored by the model they asked for
+            groups = {}
+            for text, model, future in batch:
+                groups.setdefault(model.identity, (model, []))[1].append((text, future))
+
+            for model, items in groups.values():
+                self._process(model, items)
+
+    def _process(self, model, items):
+        try:
+            results = self.score_batch([text for text, _ in items], model)
+        except Exception:
+            results = None
+
+        if results is not None:
+            for (_, future), result in zip(items, results):
+                future.set_result(result)
+            return
+
+        for text, future in items:
+            try:
+                future.set_result(self.score_batch([text], model)[0])
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'queued': self._queue.qsize(),
+        }
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    """The process-wide micro-batcher, created on first use"""
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                from .inference_pool import score_with_backend
+                _batcher = MicroBatcher(score_with_backend)
+    return _batcher
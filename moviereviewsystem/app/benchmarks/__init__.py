@@ -0,0 +1,77 @@
+import importlib
+import statistics
+import time
+
+# Suite name -> module exposing run(repeat=...) that returns result rows
+# (dicts with name, unit, min/median/mean/max and optional extra metrics)
+SUITES = {
+    'inference': 'app.benchmarks.inference',
+    'normalizer': 'app.benchmarks.normalizer',
+    'microbatch': 'app.benchmarks.microbatch',
+    'http': 'app.benchmarks.http',
+    'process_pool': 'app.benchmarks.process_pool',
+    'search': 'app.benchmarks.search',
+    'autocomplete': 'app.benchmarks.autocomplete',
+    'pagination': 'app.benchmarks.pagination',
+    'movie_list': 'app.benchmarks.movie_list',
+    'views': 'app.benchmarks.views',
+    'import': 'app.benchmarks.importer',
+}
+
+
+def get_suite(name):
+    """Import a benchmark suite module by name"""
+    return importlib.import_module(SUITES[name])
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def latency_row(name, latencies, elapsed, **extra):
+    """Result row for a load test: p50/p99 latency (ms) and throughput (req/s)"""
+    row = {
+        'name': name,
+        'unit': 'ms',
+        'repeat': 1,
+        'number': len(latencies),
+        'min': min(latencies),
+        'median': percentile(latencies, 0.50),
+        'mean': statistics.mean(latencies),
+        'max': max(latencies),
+        'p99': percentile(latencies, 0.99),
+        'throughput': len(latencies) / elapsed,
+    }
+    row.update(extra)
+    return row
+
+
+def measure(name, func, repeat=5, number=1, **extra):
+    """
+    Time func() `number` times per round over `repeat` rounds
+
+    Returns one result row with per-call timings in milliseconds.
+    """
+    func()  # warm-up call, not measured
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number * 1000)
+
+    row = {
+        'name': name,
+        'unit': 'ms',
+        'repeat': repeat,
+        'number': number,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'max': max(timings),
+    }
+    row.update(extra)
+    return row
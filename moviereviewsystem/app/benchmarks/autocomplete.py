@@ -0,0 +1,45 @@
+import time
+from app import search
+from app.autocomplete import AutocompleteIndex
+from app.models import Movie
+from . import latency_row, measure
+from .search import title_icontains
+
+# Queries as typed into the search box: prefixes, an infix and typos
+QUERIES = ['st', 'str', 'stranger th', 'love', 'the crown', 'ight', 'godfahter', 'narcs']
+
+# Every keystroke of these titles, as the debounced search box would send them
+TYPED_TITLES = ['Stranger Things', 'The Irishman', 'Money Heist', 'Bird Box']
+
+
+def keystrokes():
+    return [title[:length] for title in TYPED_TITLES for length in range(2, len(title) + 1)]
+
+
+def run(repeat=5):
+    if not Movie.objects.exists():
+        raise RuntimeError("The catalogue is empty; import netflix_titles.csv first")
+
+    index = AutocompleteIndex(refresh_interval=0)
+    rows = [measure('build index', index.build, repeat=repeat, number=1, titles=index.stats()['titles'])]
+
+    for query in QUERIES:
+        rows.append(measure(f'title icontains  q={query!r}', lambda: title_icontains(query),
+                            repeat=repeat, number=20, query=query))
+        if search.fts_available():
+            rows.append(measure(f'FTS5 prefix      q={query!r}', lambda: search.search_movies_fts(query, 8),
+                                repeat=repeat, number=20, query=query))
+        rows.append(measure(f'autocomplete     q={query!r}', lambda: index.lookup(query, 8),
+                            repeat=repeat, number=200, query=query))
+
+    # Latency distribution over realistic typing, cold memo included
+    index.build()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in keystrokes():
+            start = time.perf_counter()
+            index.lookup(query, 8)
+            latencies.append((time.perf_counter() - start) * 1000)
+    rows.append(latency_row('autocomplete keystrokes', latencies, time.perf_counter() - started))
+    return rows
@@ -0,0 +1,82 @@
+from app import sentiment
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from . import latency_row
+from .inference import CORPUS
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import itertools
+import json
+import time
+
+CONCURRENCY_LEVELS = (1, 16, 64)
+
+# Every review is unique so the prediction cache never answers for the model
+_review_ids = itertools.count()
+
+# (label, method, sync path, async path, payload builder)
+ENDPOINTS = [
+    ('analyze-sentiment', 'post', '/api/analyze-sentiment/', '/api/async/analyze-sentiment/',
+     lambda i: {'review': f"{CORPUS[i % len(CORPUS)]} #{next(_review_ids)}"}),
+    ('movies/search', 'get', '/api/movies/search/', '/api/async/movies/search/',
+     lambda i: {'q': ('the', 'love', 'man', 'star')[i % 4]}),
+]
+
+
+def wsgi_load_test(method, path, payload, concurrency, total):
+    """Sync views through the WSGI handler, one thread per concurrent client"""
+    clients = [Client() for _ in range(concurrency)]
+
+    def request(i):
+        client = clients[i % concurrency]
+        started = time.perf_counter()
+        if method == 'post':
+            client.post(path, json.dumps(payload(i)), content_type='application/json')
+        else:
+            client.get(path, payload(i))
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(request, range(total)))
+    return latencies, time.perf_counter() - started
+
+
+def asgi_load_test(method, path, payload, concurrency, total):
+    """Async views through the ASGI handler, `concurrency` coroutines on one event loop"""
+    async def main():
+        client = AsyncClient()
+        slots = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def request(i):
+            async with slots:
+                started = time.perf_counter()
+                if method == 'post':
+                    await client.post(path, json.dumps(payload(i)), content_type='application/json')
+                else:
+                    await client.get(path, payload(i))
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request(i) for i in range(total)))
+        return latencies, time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def run(repeat=5):
+    sentiment.get_model()  # load outside the measurements
+    setup_test_environment()  # allow the test clients' 'testserver' host
+    try:
+        rows = []
+        for label, method, sync_path, async_path, payload in ENDPOINTS:
+            for concurrency in CONCURRENCY_LEVELS:
+                total = max(concurrency, 20) * repeat
+                latencies, elapsed = wsgi_load_test(method, sync_path, payload, concurrency, total)
+                rows.append(latency_row(f'WSGI {label}, {concurrency} concurrent', latencies, elapsed))
+                latencies, elapsed = asgi_load_test(method, async_path, payload, concurrency, total)
+                rows.append(latency_row(f'ASGI {label}, {concurrency} concurrent', latencies, elapsed))
+        return rows
+    finally:
+        teardown_test_environment()
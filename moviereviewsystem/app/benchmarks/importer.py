@@ -0,0 +1,87 @@
+import csv
+import io
+import itertools
+import statistics
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from app.models import Movie
+from app.management.commands.import_titles import coerce_row
+
+# Rows imported by the per-row get_or_create loop (it's far too slow for the whole file)
+LEGACY_ROWS = 500
+
+
+def legacy_import(rows):
+    """The original insertData.run loop: one get_or_create (SELECT + INSERT) per row"""
+    for row in rows:
+        Movie.objects.get_or_create(show_id=row['show_id'], defaults={
+            field: value for field, value in coerce_row(row).items() if field != 'show_id'
+        })
+
+
+def clear_catalogue():
+    # Raw DELETE: no per-row signals or cascades, so clearing stays cheap
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {Movie._meta.db_table}')
+
+
+def measure_import(name, func, rows, repeat, empty=True):
+    """
+    Time func() over `repeat` rounds, each in a transaction that is rolled back
+
+    With empty=True the catalogue is cleared first (inside the transaction,
+    outside the timing), so every round imports into an empty table.
+    Timings are per imported row.
+    """
+    timings = []
+    for _ in range(repeat + 1):  # the first round is a warm-up
+        with transaction.atomic():
+            if empty:
+                clear_catalogue()
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) / rows * 1000)
+            transaction.set_rollback(True)
+    timings = timings[1:]
+
+    return {
+        'name': name,
+        'unit': 'ms/row',
+        'repeat': repeat,
+        'number': rows,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'max': max(timings),
+        'rows_per_sec': 1000 / statistics.median(timings),
+    }
+
+
+def run(repeat=5):
+    from app import insertData
+
+    csv_path = Path(settings.BASE_DIR) / 'netflix_titles.csv'
+    if not csv_path.exists():
+        raise RuntimeError(f"CSV file not found at: {csv_path}")
+    with open(csv_path, encoding='utf-8', newline='') as file:
+        total = sum(1 for _ in csv.DictReader(file))
+        file.seek(0)
+        subset = list(itertools.islice(csv.DictReader(file), LEGACY_ROWS))
+
+    def quiet(*args):
+        return lambda: call_command(*args, stdout=io.StringIO())
+
+    def insert_data():
+        with redirect_stdout(io.StringIO()):
+            insertData.run()
+
+    return [
+        measure_import('insertData.run (empty catalogue)', insert_data, total, repeat),
+        measure_import('import_titles --sync (unchanged)', quiet('import_titles', '--sync'), total, repeat, empty=False),
+        measure_import(f'get_or_create per row ({LEGACY_ROWS} rows, before)', lambda: legacy_import(subset),
+                       len(subset), repeat),
+    ]
@@ -0,0 +1,58 @@
+from app import sentiment
+from . import measure
+import pandas as pd
+
+# Fixed review corpus so runs are comparable across commits
+SAMPLE_REVIEWS = [
+    "An absolute masterpiece. The acting was brilliant and the story kept me hooked until the very end.",
+    "Terrible movie, a complete waste of two hours. The plot made no sense at all.",
+    "I loved the soundtrack but the pacing in the second half was painfully slow.",
+    "One of the best films I have seen this year, funny, touching and beautifully shot!",
+    "Boring, predictable and badly acted. I almost walked out of the cinema.",
+    "<br />The cast does what it can with a weak script, yet a few scenes really work.",
+    "A fun ride for the whole family. The kids could not stop laughing.",
+    "Not worth the hype; the ending was rushed and the characters were flat.",
+]
+
+# 200 reviews of one to three sentences, built deterministically from the samples
+CORPUS = [
+    " ".join(SAMPLE_REVIEWS[(i + j) % len(SAMPLE_REVIEWS)] for j in range(i % 3 + 1))
+    for i in range(200)
+]
+
+
+def predict_twice(pipeline, texts):
+    """The original scoring path: predict and predict_proba as two pipeline passes"""
+    for text in texts:
+        review_series = pd.Series([text])
+        pipeline.predict(review_series)
+        pipeline.predict_proba(review_series)
+
+
+def score_one_by_one(model, texts):
+    """Single-pass scoring, one review per call (what analyze_sentiment does)"""
+    for text in texts:
+        sentiment.score_text(text, model=model)
+
+
+def measure_per_review(name, func, repeat, reviews):
+    """Measure a whole-corpus run and report it per review"""
+    row = measure(name, func, repeat=repeat, reviews=reviews)
+    for key in ('min', 'median', 'mean', 'max'):
+        row[key] /= reviews
+    row['unit'] = 'ms/review'
+    return row
+
+
+def run(repeat=5):
+    model = sentiment.get_model()
+
+    reviews = len(CORPUS)
+    return [
+        measure_per_review('predict + predict_proba',
+                           lambda: predict_twice(model.pipeline, CORPUS), repeat, reviews),
+        measure_per_review('single pass (score_text)',
+                           lambda: score_one_by_one(model, CORPUS), repeat, reviews),
+        measure_per_review('single pass batched (score_texts)',
+                           lambda: sentiment.score_texts(CORPUS, model=model), repeat, reviews),
+    ]
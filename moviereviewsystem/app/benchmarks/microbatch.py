@@ -0,0 +1,61 @@
+from app import sentiment
+from app.batching import MicroBatcher
+from . import latency_row
+from .inference import CORPUS
+import threading
+import time
+
+CONCURRENCY_LEVELS = (1, 8, 32)
+
+
+def load_test(name, score, concurrency, requests_per_thread):
+    """
+    Fire single-review requests from `concurrency` threads at once
+
+    Returns a result row with p50/p99 latency (ms) and throughput (req/s).
+    """
+    latencies = []
+    latencies_lock = threading.Lock()
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def client(offset):
+        own = []
+        start_barrier.wait()
+        for i in range(requests_per_thread):
+            text = f"{CORPUS[(offset + i) % len(CORPUS)]} #{offset}-{i}"
+            started = time.perf_counter()
+            score(text)
+            own.append((time.perf_counter() - started) * 1000)
+        with latencies_lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=client, args=(n * requests_per_thread,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return latency_row(name, latencies, elapsed)
+
+
+def run(repeat=5):
+    model = sentiment.get_model()
+    batcher = MicroBatcher(lambda texts, model: sentiment.score_texts(texts, model=model))
+    requests_per_thread = 10 * repeat
+
+    rows = []
+    for concurrency in CONCURRENCY_LEVELS:
+        rows.append(load_test(
+            f'micro-batching off, {concurrency} threads',
+            lambda text: sentiment.score_text(text, model=model),
+            concurrency, requests_per_thread,
+        ))
+        rows.append(load_test(
+            f'micro-batching on, {concurrency} threads',
+            lambda text: batcher.submit(text, model).result(),
+            concurrency, requests_per_thread,
+        ))
+    return rows
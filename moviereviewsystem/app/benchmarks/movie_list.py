@@ -0,0 +1,71 @@
+import time
+import tracemalloc
+from django.http import JsonResponse
+from django.test import RequestFactory
+from app.models import Movie
+from app.views import list_movies, movie_list
+
+factory = RequestFactory(SERVER_NAME='localhost')
+
+
+def legacy_movie_list(request):
+    """The original endpoint: every row in a list, one JsonResponse"""
+    return JsonResponse(list_movies(), safe=False)
+
+
+def consume(view, query):
+    """Run a view and read its whole body; returns (time to first byte, total time, bytes) in ms"""
+    start = time.perf_counter()
+    response = view(factory.get('/api/movies/', query))
+    first_byte = None
+    size = 0
+    chunks = response.streaming_content if response.streaming else [response.content]
+    for chunk in chunks:
+        if first_byte is None:
+            first_byte = time.perf_counter()
+        size += len(chunk)
+    end = time.perf_counter()
+    return (first_byte - start) * 1000, (end - start) * 1000, size
+
+
+CASES = [
+    ('JsonResponse(list(...)) (before)', legacy_movie_list, {}),
+    ('streamed JSON array', movie_list, {}),
+    ('streamed NDJSON', movie_list, {'format': 'ndjson'}),
+    ('streamed, fields=id,title,poster_url', movie_list, {'fields': 'id,title,poster_url'}),
+    ('one page, limit=100', movie_list, {'limit': 100}),
+]
+
+
+def run(repeat=5):
+    if not Movie.objects.exists():
+        raise RuntimeError("The catalogue is empty; import netflix_titles.csv first")
+
+    rows = []
+    for name, view, query in CASES:
+        consume(view, query)  # warm-up
+        ttfb, totals = [], []
+        for _ in range(repeat):
+            first_byte, total, size = consume(view, query)
+            ttfb.append(first_byte)
+            totals.append(total)
+
+        tracemalloc.start()
+        consume(view, query)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        rows.append({
+            'name': name,
+            'unit': 'ms',
+            'repeat': repeat,
+            'number': 1,
+            'min': min(totals),
+            'median': sorted(totals)[len(totals) // 2],
+            'mean': sum(totals) / len(totals),
+            'max': max(totals),
+            'ttfb_ms': sorted(ttfb)[len(ttfb) // 2],
+            'peak_mb': peak / 1024 / 1024,
+            'body_kb': size / 1024,
+        })
+    return rows
@@ -0,0 +1,36 @@
+from app.sentiment import clean_text_manual, get_stop_words
+from . import measure
+from .inference import SAMPLE_REVIEWS
+import re
+import string
+
+
+def clean_text_legacy(text):
+    """The original clean_text_manual regex chain, kept as the reference implementation"""
+    if not text:
+        return ""
+
+    text = re.sub("<.*?>", "", text)  # remove HTML tags
+    text = re.sub("[%s]" % re.escape(string.punctuation), "", text)  # remove punctuation
+    text = re.sub(r"\d+", "", text)  # remove numbers
+    text = text.lower()  # lowercase
+
+    stop_words = get_stop_words()
+    text = " ".join([word for word in text.split() if word not in stop_words])
+    return text
+
+
+def long_review(sentences):
+    """A deterministic long review built from the sample sentences"""
+    return " ".join(SAMPLE_REVIEWS[i % len(SAMPLE_REVIEWS)] for i in range(sentences))
+
+
+def run(repeat=5):
+    rows = []
+    for sentences in (5, 50, 500):
+        review = long_review(sentences)
+        rows.append(measure(f'legacy regex chain ({len(review)} chars)',
+                            lambda: clean_text_legacy(review), repeat=repeat, number=50))
+        rows.append(measure(f'precompiled normalizer ({len(review)} chars)',
+                            lambda: clean_text_manual(review), repeat=repeat, number=50))
+    return rows
@@ -0,0 +1,51 @@
+from django.core.paginator import Paginator
+from app.models import Movie
+from app.pagination import KeysetPaginator
+from app.views import MOVIES_PER_PAGE, browse_movies
+from . import measure
+
+
+def offset_page(number):
+    """The original movies() pagination: COUNT(*) then OFFSET/LIMIT"""
+    paginator = Paginator(browse_movies(''), MOVIES_PER_PAGE)
+    paginator.count
+    return list(paginator.page(number))
+
+
+def cursors_by_page(last_page):
+    """Cursor for every page up to last_page, found by walking the keyset pages once"""
+    cursors = {1: None}
+    paginator = KeysetPaginator(browse_movies(''), MOVIES_PER_PAGE, count='none')
+    page = paginator.page()
+    while page.has_next() and page.number < last_page:
+        cursors[page.number + 1] = page.next_cursor
+        page = paginator.page(page.next_cursor)
+    return cursors
+
+
+def keyset_page(cursor, count):
+    """What movie_page() does: the page, then the count (skipped on cursor pages for 'exact')"""
+    paginator = KeysetPaginator(browse_movies(''), MOVIES_PER_PAGE, count=count)
+    page = paginator.page(cursor)
+    paginator.count
+    return list(page)
+
+
+def run(repeat=5):
+    total = Movie.objects.count()
+    if not total:
+        raise RuntimeError("The catalogue is empty; import netflix_titles.csv first")
+
+    last = -(-total // MOVIES_PER_PAGE)
+    pages = sorted({1, 10, last // 4, last // 2, last})
+    cursors = cursors_by_page(last)
+
+    rows = []
+    for number in pages:
+        rows.append(measure(f'OFFSET + COUNT        page {number}', lambda: offset_page(number),
+                            repeat=repeat, number=20, page=number))
+        rows.append(measure(f'keyset, count=exact   page {number}', lambda: keyset_page(cursors[number], 'exact'),
+                            repeat=repeat, number=20, page=number))
+        rows.append(measure(f'keyset, count=cached  page {number}', lambda: keyset_page(cursors[number], 'cached'),
+                            repeat=repeat, number=20, page=number))
+    return rows
@@ -0,0 +1,49 @@
+from app import sentiment
+from app.inference_pool import InferencePool
+from . import latency_row
+from .normalizer import long_review
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+
+POOL_SIZES = (1, 2, 4, 8)
+CLIENT_THREADS = 8
+
+
+def load_test(name, score, total, **extra):
+    """Single long-review requests from CLIENT_THREADS threads; throughput in reviews/s"""
+    reviews = [f"{long_review(40)} #{i}" for i in range(total)]
+
+    def request(text):
+        started = time.perf_counter()
+        score([text])
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CLIENT_THREADS) as executor:
+        latencies = list(executor.map(request, reviews))
+    return latency_row(name, latencies, time.perf_counter() - started, **extra)
+
+
+def run(repeat=5):
+    model = sentiment.get_model()
+    total = 40 * repeat
+
+    rows = [load_test(
+        f'inline, {CLIENT_THREADS} client threads',
+        lambda texts: sentiment.score_texts(texts, model=model), total, cores=1.0,
+    )]
+    for size in POOL_SIZES:
+        if size > (os.cpu_count() or 1):
+            break
+        pool = InferencePool(size=size)
+        try:
+            pool.warm_up(model)
+            pool.score_texts(['warm-up'] * size, model)
+            rows.append(load_test(
+                f'process pool, {size} workers',
+                lambda texts: pool.score_texts(texts, model), total, cores=float(size),
+            ))
+        finally:
+            pool.close()
+    return rows
@@ -0,0 +1,28 @@
+from app import search
+from app.models import Movie
+from . import measure
+
+# Typeahead-style queries of growing length
+QUERIES = ['lo', 'lov', 'love', 'love s', 'love story', 'the dark knight']
+
+
+def title_icontains(query, limit=8):
+    """The original movie_search_api query: LIKE '%q%' on title"""
+    return list(Movie.objects.filter(title__icontains=query).order_by('-release_year', 'title')[:limit])
+
+
+def run(repeat=5):
+    if not Movie.objects.exists():
+        raise RuntimeError("The catalogue is empty; import netflix_titles.csv first")
+    if not search.fts_available():
+        raise RuntimeError("No FTS5 search index; run `python manage.py migrate` on SQLite")
+
+    rows = []
+    for query in QUERIES:
+        rows.append(measure(f'title icontains   q={query!r}', lambda: title_icontains(query),
+                            repeat=repeat, number=20, query=query))
+        rows.append(measure(f'4-column icontains q={query!r}', lambda: search.search_movies_like(query, 8),
+                            repeat=repeat, number=20, query=query))
+        rows.append(measure(f'FTS5 prefix       q={query!r}', lambda: search.search_movies_fts(query, 8),
+                            repeat=repeat, number=20, query=query))
+    return rows
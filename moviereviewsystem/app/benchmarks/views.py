@@ -0,0 +1,92 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from app.models import Movie
+from app.pagination import KeysetPaginator
+from app.response_cache import response_cache
+from app.views import MOVIES_PER_PAGE, browse_movies, movie_search_api, movies
+from . import measure
+
+factory = RequestFactory(SERVER_NAME='localhost')
+
+# Search queries by length, from the shortest accepted one to a full title
+QUERIES = ['lo', 'love', 'love story', 'the dark knight rises']
+
+# Browser filters: all titles, movies only, TV shows only
+TYPE_FILTERS = ['', 'movie', 'tv']
+
+# (genre, country) slugs: joins through the genre/country link tables
+TAG_FILTERS = [('dramas', ''), ('', 'india'), ('comedies', 'united-states')]
+
+
+def call(view, path, query):
+    request = factory.get(path, query)
+    request.user = AnonymousUser()  # catalogue_page reads it for the ETag
+    response = view(request)
+    assert response.status_code == 200, response.status_code
+    return response
+
+
+def page_cursors(type_filter):
+    """Cursors of pages 1, 10 and the last page (walking next links, like a user paging)"""
+    paginator = KeysetPaginator(browse_movies(type_filter), MOVIES_PER_PAGE)
+    cursors = {1: ''}
+    page = paginator.page()
+    cursor = ''
+    while page.next_cursor:
+        cursor = page.next_cursor
+        page = paginator.page(cursor)
+        if page.number == 10:
+            cursors[10] = cursor
+    cursors[page.number] = cursor
+    return cursors
+
+
+def uncached(func):
+    """Run func with the response cache bypassed, so every call does the real work"""
+    def wrapped():
+        enabled = response_cache.enabled
+        response_cache.enabled = False
+        try:
+            return func()
+        finally:
+            response_cache.enabled = enabled
+    return wrapped
+
+
+def run(repeat=5):
+    if not Movie.objects.exists():
+        raise RuntimeError("The catalogue is empty; import netflix_titles.csv or use --fixture")
+
+    rows = []
+    for mode in ('full', 'typeahead'):
+        for query in QUERIES:
+            params = {'q': query, 'mode': mode}
+            rows.append(measure(
+                f'movie_search_api {mode:<9} q={query!r}',
+                uncached(lambda: call(movie_search_api, '/api/search/', params)),
+                repeat=repeat, number=20, query_length=len(query),
+            ))
+
+    for type_filter in TYPE_FILTERS:
+        for number, cursor in page_cursors(type_filter).items():
+            params = {'type': type_filter, 'cursor': cursor}
+            rows.append(measure(
+                f'movies type={type_filter or "all":<5} page {number}',
+                uncached(lambda: call(movies, '/movies/', params)),
+                repeat=repeat, number=10,
+            ))
+        params = {'type': type_filter}
+        rows.append(measure(
+            f'movies type={type_filter or "all":<5} page 1 (cached grid)',
+            lambda: call(movies, '/movies/', params),
+            repeat=repeat, number=10,
+        ))
+
+    for genre, country in TAG_FILTERS:
+        params = {'genre': genre, 'country': country}
+        rows.append(measure(
+            f'movies genre={genre or "-"} country={country or "-"} page 1',
+            uncached(lambda: call(movies, '/movies/', params)),
+            repeat=repeat, number=10,
+        ))
+    return rows
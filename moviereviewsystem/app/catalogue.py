@@ -0,0 +1,139 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from .models import CatalogueStamp, Movie
+from functools import partial, wraps
+import hashlib
+import threading
+import time
+
+# How long a process reuses the stamp it read before asking the database again
+CATALOGUE_STAMP_TTL = getattr(settings, 'CATALOGUE_STAMP_TTL', 1.0)
+
+# Cache-Control max-age for the catalogue API responses (shared caches/CDNs)
+CATALOGUE_CACHE_MAX_AGE = getattr(settings, 'CATALOGUE_CACHE_MAX_AGE', 60)
+
+_stamp = None
+_stamp_read_at = 0.0
+_stamp_lock = threading.Lock()
+
+
+def catalogue_stamp():
+    """(version, modified) of the catalogue, re-read at most every CATALOGUE_STAMP_TTL seconds"""
+    global _stamp, _stamp_read_at
+    now = time.monotonic()
+    if _stamp is None or now - _stamp_read_at >= CATALOGUE_STAMP_TTL:
+        stamp, _ = CatalogueStamp.objects.get_or_create(id=1, defaults={'modified': timezone.now()})
+        with _stamp_lock:
+            _stamp = (stamp.version, stamp.modified)
+            _stamp_read_at = now
+    return _stamp
+
+
+def forget_catalogue_stamp():
+    """Make the next catalogue_stamp() call read the database"""
+    global _stamp
+    _stamp = None
+
+
+def triggers_installed():
+    """True when SQLite triggers on app_movie and its tag link tables keep the stamp current (0004, 0009)"""
+    return connection.vendor == 'sqlite'
+
+
+def bump_catalogue_version(force=False):
+    """
+    Record a catalogue change
+
+    Call this after writes that skip model signals (bulk_create, bulk_update,
+    queryset.update/delete). On SQLite the triggers have already done it,
+    unless `force` is set.
+    """
+    if force or not triggers_installed():
+        updated = CatalogueStamp.objects.filter(id=1).update(version=F('version') + 1, modified=timezone.now())
+        if not updated:
+            CatalogueStamp.objects.get_or_create(id=1, defaults={'version': 2, 'modified': timezone.now()})
+    forget_catalogue_stamp()
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def movie_changed(sender, **kwargs):
+    bump_catalogue_version()
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+@receiver(m2m_changed, sender=Movie.countries.through)
+def movie_tags_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_catalogue_version()
+
+
+# --- conditional responses ----------------------------------------------------
+
+def catalogue_etag(request, *args, **kwargs):
+    # ETags are compared per URL, so one version covers every query string
+    return f"catalogue-{catalogue_stamp()[0]}"
+
+
+def catalogue_last_modified(request, *args, **kwargs):
+    return catalogue_stamp()[1]
+
+
+def page_etag(request, *args, **kwargs):
+    """HTML pages also depend on who is logged in and on the CSRF cookie in their forms"""
+    viewer = f"{request.user.pk if request.user.is_authenticated else 'anon'}:{request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')}"
+    digest = hashlib.sha256(viewer.encode()).hexdigest()[:16]
+    return f"catalogue-{catalogue_stamp()[0]}-{digest}"
+
+
+def catalogue_api(view):
+    """
+    ETag/Last-Modified from the catalogue stamp, 304 on a match, cacheable by shared caches
+
+    Repeat requests revalidate with If-None-Match and get an empty 304 until
+    an import or poster job changes a movie.
+    """
+    conditional = condition(etag_func=catalogue_etag, last_modified_func=catalogue_last_modified)(view)
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        response = conditional(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            patch_cache_control(response, public=True, max_age=CATALOGUE_CACHE_MAX_AGE)
+        return response
+    return wrapped
+
+
+def catalogue_page(view=None, *, extra_etag=None):
+    """
+    Per-viewer ETag for server-rendered pages; private caches only
+
+    Browsers revalidate every time (max-age=0) and get a 304 while neither
+    the catalogue nor their login changed. No Last-Modified: logging in
+    doesn't change it, so If-Modified-Since alone could return a stale page.
+    extra_etag(request, *args, **kwargs) covers page content that isn't in
+    the catalogue, such as a movie's review summary.
+    """
+    if view is None:
+        return partial(catalogue_page, extra_etag=extra_etag)
+
+    def etag(request, *args, **kwargs):
+        tag = page_etag(request, *args, **kwargs)
+        return f"{tag}-{extra_etag(request, *args, **kwargs)}" if extra_etag else tag
+
+    conditional = condition(etag_func=etag)(view)
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        response = conditional(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+            patch_vary_headers(response, ('Cookie',))
+        return response
+    return wrapped
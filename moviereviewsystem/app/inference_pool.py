@@ -0,0 +1,183 @@
+from django.conf import settings
+from . import sentiment
+import multiprocessing
+import os
+import threading
+
+# 'inline' scores in the calling thread; 'process' sends texts to a pre-forked
+# pool of worker processes so long reviews don't serialize on the GIL
+SENTIMENT_INFERENCE_BACKEND = getattr(settings, 'SENTIMENT_INFERENCE_BACKEND', 'inline')
+SENTIMENT_PROCESS_POOL_SIZE = getattr(settings, 'SENTIMENT_PROCESS_POOL_SIZE', None) or os.cpu_count() or 1
+SENTIMENT_PROCESS_START_METHOD = getattr(settings, 'SENTIMENT_PROCESS_START_METHOD', 'spawn')
+
+# Texts per task when a large request is split across workers
+SENTIMENT_PROCESS_CHUNK_SIZE = 16
+
+
+# --- worker process side ---------------------------------------------------
+
+_worker_model = None
+
+
+def _init_worker(version, identity, path):
+    """Pool initializer: load the model once per worker process"""
+    global _worker_model
+    _worker_model = sentiment.LoadedModel(sentiment.load_pipeline(path), version, identity, path)
+
+
+def _score_in_worker(texts):
+    return sentiment.score_texts(texts, model=_worker_model)
+
+
+# --- server side -------------------------------------------------------------
+
+class InferencePool:
+    """
+    Pre-forked process pool that scores texts with the active model
+
+    Every worker loads the model once in its initializer. When a newer model
+    is asked for, a pool is started for it and the old one is retired: calls
+    already using it finish there, and once the last one returns it is
+    closed and joined in a background thread. Requests that started before
+    the swap and arrive after their pool is gone are scored in the calling
+    thread with the model they hold.
+    """
+
+    def __init__(self, size=SENTIMENT_PROCESS_POOL_SIZE, start_method=SENTIMENT_PROCESS_START_METHOD):
+        self.size = size
+        self.start_method = start_method
+        self._pools = {}  # model identity -> pool (the current one plus retired ones still in use)
+        self._users = {}  # model identity -> calls using its pool right now
+        self._identity = None  # identity of the current pool
+        self._retired = set()  # identities whose pool was replaced
+        self._lock = threading.Lock()
+
+    def _acquire(self, model):
+        """The pool for `model` with its user count raised, or None to score inline"""
+        with self._lock:
+            pool = self._pools.get(model.identity)
+            if pool is None:
+                if model.identity in self._retired and not self._is_active(model):
+                    return None  # started before a swap; its pool has already gone
+                context = multiprocessing.get_context(self.start_method)
+                pool = self._pools[model.identity] = context.Pool(
+                    self.size,
+                    initializer=_init_worker,
+                    initargs=(model.version, model.identity, model.path),
+                )
+                self._users[model.identity] = 0
+                self._retired.discard(model.identity)
+                if self._identity is not None:
+                    self._retired.add(self._identity)
+                    if not self._users[self._identity]:
+                        self._shut_down(self._identity)
+                self._identity = model.identity
+            self._users[model.identity] += 1
+            return pool
+
+    def _release(self, identity):
+        with self._lock:
+            if identity not in self._users:
+                return  # close() already took the pool down
+            self._users[identity] -= 1
+            if identity != self._identity and not self._users[identity]:
+                self._shut_down(identity)
+
+    @staticmethod
+    def _is_active(model):
+        active = sentiment.model_registry.current
+        return active is not None and active.identity == model.identity
+
+    def _shut_down(self, identity):
+        # Called with the lock held; joining can take a while, so not here
+        pool = self._pools.pop(identity)
+        del self._users[identity]
+        threading.Thread(target=_close_and_join, args=(pool,), name='sentiment-pool-retire', daemon=True).start()
+
+    def score_texts(self, texts, model):
+        """Score texts in the worker processes; results come back in input order"""
+        texts = list(texts)
+        if not texts:
+            return []
+
+        pool = self._acquire(model)
+        if pool is None:
+            return sentiment.score_texts(texts, model=model)
+        try:
+            if len(texts) <= SENTIMENT_PROCESS_CHUNK_SIZE:
+                return pool.apply(_score_in_worker, (texts,))
+
+            chunks = [texts[i:i + SENTIMENT_PROCESS_CHUNK_SIZE]
+                      for i in range(0, len(texts), SENTIMENT_PROCESS_CHUNK_SIZE)]
+            results = []
+            for chunk_results in pool.map(_score_in_worker, chunks):
+                results.extend(chunk_results)
+            return results
+        finally:
+            self._release(model.identity)
+
+    def submit(self, texts, model):
+        """Score texts in one worker without waiting; .get() on the result returns the scores"""
+        texts = list(texts)
+        pool = self._acquire(model)
+        if pool is None:
+            return InlineResult(sentiment.score_texts(texts, model=model))
+
+        def release(_):
+            self._release(model.identity)
+        try:
+            return pool.apply_async(_score_in_worker, (texts,), callback=release, error_callback=release)
+        except Exception:
+            self._release(model.identity)
+            raise
+
+    def warm_up(self, model):
+        """Start the worker processes (and their model loads) ahead of traffic"""
+        if self._acquire(model) is not None:
+            self._release(model.identity)
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            self._users.clear()
+            self._retired.clear()
+            self._identity = None
+        for pool in pools:
+            _close_and_join(pool)
+
+
+class InlineResult:
+    """Already-computed stand-in for a pool AsyncResult"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self, timeout=None):
+        return self.value
+
+
+def _close_and_join(pool):
+    pool.close()  # finish queued work, then let the workers exit
+    pool.join()
+
+
+_inference_pool = None
+_inference_pool_lock = threading.Lock()
+
+
+def get_inference_pool():
+    """The process-wide inference pool, created on first use"""
+    global _inference_pool
+    if _inference_pool is None:
+        with _inference_pool_lock:
+            if _inference_pool is None:
+                _inference_pool = InferencePool()
+    return _inference_pool
+
+
+def score_with_backend(texts, model):
+    """Score texts with the configured inference backend"""
+    if SENTIMENT_INFERENCE_BACKEND == 'process':
+        return get_inference_pool().score_texts(texts, model)
+    return sentiment.score_texts(texts, model=model)
@@ -0,0 +1,85 @@
+import os
+import tempfile
+from django.core.management.base import BaseCommand, CommandError
+from app.sentiment import ACTIVE_POINTER, model_file_identity, model_registry
+
+
+class Command(BaseCommand):
+    help = 'List versioned sentiment models or switch the active one (workers pick it up without a restart)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "version", nargs="?",
+            help="Model version to activate (file name in the model directory without extension)"
+        )
+        parser.add_argument(
+            "--latest", action="store_true",
+            help="Remove the pin and always serve the newest model file"
+        )
+        parser.add_argument(
+            "--no-verify", action="store_true",
+            help="Activate without test-loading the model first"
+        )
+
+    def handle(self, *args, **options):
+        version = options["version"]
+        pointer_path = os.path.join(model_registry.model_dir, ACTIVE_POINTER)
+
+        if options["latest"]:
+            if os.path.exists(pointer_path):
+                os.remove(pointer_path)
+            self.stdout.write(self.style.SUCCESS("✅ Unpinned: workers will serve the newest model file"))
+            return
+
+        if not version:
+            self.list_versions()
+            return
+
+        versions = model_registry.available_versions()
+        if version not in versions:
+            raise CommandError(f"Unknown model version {version!r}. Available: {', '.join(sorted(versions)) or 'none'}")
+
+        if not options["no_verify"]:
+            self.verify(version, versions[version])
+
+        # Write the pointer atomically so workers never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=model_registry.model_dir, prefix='.active-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
+            tmp.write(version + "\n")
+        os.replace(tmp_path, pointer_path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Activated {version!r}; workers switch within "
+            f"{model_registry.poll_interval}s without dropping requests"
+        ))
+
+    def verify(self, version, path):
+        """Make sure the pickle loads and can score before any worker switches to it"""
+        import joblib
+        import pandas as pd
+
+        self.stdout.write(f"🔎 Verifying {version!r}...")
+        try:
+            pipeline = joblib.load(path)
+            pipeline.predict_proba(pd.Series(["a quick sanity check review"]))
+        except Exception as e:
+            raise CommandError(f"Model {version!r} failed verification: {e}")
+
+    def list_versions(self):
+        versions = model_registry.available_versions()
+        pinned = model_registry.pinned_version()
+        active, _ = model_registry.selected()
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"SENTIMENT MODELS in {model_registry.model_dir}")
+        self.stdout.write("=" * 60)
+        if not versions:
+            self.stdout.write("No model files found.")
+            return
+
+        for name, path in sorted(versions.items()):
+            marker = "*" if name == active else " "
+            self.stdout.write(f"{marker} {name:<45} {model_file_identity(path)}")
+
+        self.stdout.write("-" * 60)
+        self.stdout.write(f"Pinned: {pinned}" if pinned else "Not pinned: newest file is active")
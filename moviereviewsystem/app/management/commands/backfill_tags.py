@@ -0,0 +1,48 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from app.catalogue import bump_catalogue_version
+from app.models import Movie
+from app.response_cache import ORDER_TAG, response_cache
+from app.taxonomy import TAG_RELATIONS, sync_movie_tags
+
+
+class Command(BaseCommand):
+    help = 'Fill the Genre/Country tables and movie links from listed_in and country (run once after migrating)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=2000,
+            help="Movies per transaction (default: 2000)"
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        total = Movie.objects.count()
+        self.stdout.write(f"🏷️ Linking genres and countries for {total} movies...")
+        start = time.perf_counter()
+        last_id = 0
+        done = 0
+        links = dict.fromkeys(TAG_RELATIONS, 0)
+        while True:
+            batch = list(Movie.objects.filter(id__gt=last_id).order_by('id')
+                         .values('id', 'listed_in', 'country')[:options["batch_size"]])
+            if not batch:
+                break
+            with transaction.atomic():
+                for relation, count in sync_movie_tags(batch).items():
+                    links[relation] += count
+            last_id = batch[-1]['id']
+            done += len(batch)
+            self.stdout.write(f"   {done}/{total} movies")
+
+        # Filtered pages may list different movies now; bump the stamp
+        # ourselves rather than rely on the link table triggers
+        response_cache.invalidate(ORDER_TAG)
+        bump_catalogue_version(force=True)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Done in {time.perf_counter() - start:.2f}s"))
+        for relation, (_, model) in TAG_RELATIONS.items():
+            self.stdout.write(f"   {relation}: {model.objects.count()} names, {links[relation]} links")
@@ -0,0 +1,184 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+from contextlib import ExitStack, redirect_stdout
+from pathlib import Path
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from app import sentiment
+from app.benchmarks import SUITES, get_suite
+from app.benchmarks.fixtures import fixture_catalogue, stand_in_model
+from app.models import Movie
+
+# Keys every result row has; anything else numeric is printed as an extra metric
+STANDARD_KEYS = {'name', 'unit', 'repeat', 'number', 'min', 'median', 'mean', 'max'}
+
+
+def git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def compare_results(baseline, current):
+    """
+    (suite, name, baseline median, current median, change) for every row in both runs
+
+    change is the relative difference of the medians (0.25 = 25% slower).
+    """
+    changes = []
+    for suite, rows in current['suites'].items():
+        before = {row['name']: row for row in baseline.get('suites', {}).get(suite, [])}
+        for row in rows:
+            old = before.get(row['name'])
+            if old is None or not old['median']:
+                continue
+            changes.append((suite, row['name'], old['median'], row['median'], row['median'] / old['median'] - 1))
+    return changes
+
+
+class Command(BaseCommand):
+    help = 'Run performance benchmarks and print per-call timings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "suites", nargs="*",
+            help=f"Suites to run (default: all). Available: {', '.join(SUITES)}"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5,
+            help="Measured rounds per benchmark (default: 5)"
+        )
+        parser.add_argument(
+            "--fixture", action="store_true",
+            help="Run against a throwaway database imported from netflix_titles.csv (not the real one)"
+        )
+        parser.add_argument(
+            "--stand-in-model", action="store_true",
+            help="Score with a small pipeline trained on the sample reviews (automatic when no model file exists)"
+        )
+        parser.add_argument(
+            "--json", metavar="PATH",
+            help="Also write the results and run metadata as JSON ('-' for stdout)"
+        )
+        parser.add_argument(
+            "--compare", metavar="BASELINE",
+            help="Compare medians with an earlier --json file and fail on regressions"
+        )
+        parser.add_argument(
+            "--threshold", type=float, default=0.10,
+            help="Slowdown that counts as a regression with --compare (default: 0.10 = 10%%)"
+        )
+
+    def handle(self, *args, **options):
+        suites = options["suites"] or list(SUITES)
+        unknown = [name for name in suites if name not in SUITES]
+        if unknown:
+            raise CommandError(f"Unknown suite(s): {', '.join(unknown)}")
+
+        baseline = None
+        if options["compare"]:
+            try:
+                baseline = json.loads(Path(options["compare"]).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Can't read baseline {options['compare']}: {e}")
+
+        # Results go to stderr when the JSON goes to stdout
+        self.out = self.stderr if options["json"] == '-' else self.stdout
+
+        with ExitStack() as stack:
+            if options["json"] == '-':
+                stack.enter_context(redirect_stdout(sys.stderr))  # e.g. the model loader's print()
+            if options["fixture"]:
+                self.out.write("🧪 Importing the fixture catalogue...")
+                stack.enter_context(fixture_catalogue())
+            stand_in = options["stand_in_model"] or sentiment.model_registry.selected()[1] is None
+            if stand_in:
+                stack.enter_context(stand_in_model())
+
+            results = {'meta': self.metadata(options, stand_in), 'suites': {}}
+            for name in suites:
+                results['suites'][name] = self.run_suite(name, options["repeat"])
+
+        if options["json"]:
+            payload = json.dumps(results, indent=2, default=str)
+            if options["json"] == '-':
+                self.stdout.write(payload)
+            else:
+                Path(options["json"]).write_text(payload + '\n')
+                self.out.write(f"💾 Results written to {options['json']}")
+
+        if baseline is not None:
+            self.report_changes(baseline, results, options["threshold"])
+
+    def run_suite(self, name, repeat):
+        self.out.write("=" * 78)
+        self.out.write(f"⏱️  {name}")
+        self.out.write("=" * 78)
+
+        try:
+            rows = get_suite(name).run(repeat=repeat)
+        except RuntimeError as e:
+            raise CommandError(f"{name}: {e}")
+
+        for row in rows:
+            extras = "".join(
+                f" {key} {value:.2f}" for key, value in row.items()
+                if key not in STANDARD_KEYS and isinstance(value, float)
+            )
+            self.out.write(
+                f"{row['name']:<44} median {row['median']:9.3f} "
+                f"mean {row['mean']:9.3f} min {row['min']:9.3f} {row['unit']}{extras}"
+            )
+        return rows
+
+    def metadata(self, options, stand_in):
+        """Where and on what the numbers were taken, so two runs can be judged comparable"""
+        model = sentiment.model_registry.get()
+        return {
+            'created': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'argv': sys.argv[1:],
+            'repeat': options["repeat"],
+            'fixture': options["fixture"],
+            'movies': Movie.objects.count(),
+            'model_version': model.version if model else None,
+            'stand_in_model': stand_in,
+        }
+
+    def report_changes(self, baseline, results, threshold):
+        changes = compare_results(baseline, results)
+        meta = baseline.get('meta', {})
+        self.out.write("=" * 78)
+        self.out.write(f"📊 Compared with {meta.get('commit') or 'baseline'} ({meta.get('created', 'unknown date')})")
+        self.out.write("=" * 78)
+
+        regressions = []
+        for suite, name, before, after, change in changes:
+            line = f"{suite}: {name:<44} {before:9.3f} -> {after:9.3f} ({change:+.1%})"
+            if change > threshold:
+                regressions.append(line)
+                self.out.write(self.style.ERROR(f"🐢 {line}"))
+            elif change < -threshold:
+                self.out.write(self.style.SUCCESS(f"🚀 {line}"))
+            else:
+                self.out.write(f"   {line}")
+
+        if not changes:
+            self.out.write(self.style.WARNING("⚠️ No benchmarks in common with the baseline"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark(s) slower than the baseline by more than {threshold:.0%}")
+        self.out.write(self.style.SUCCESS(f"✅ No regressions above {threshold:.0%}"))
@@ -0,0 +1,115 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from django.core.management.base import BaseCommand, CommandError
+from app.sentiment import MMAP_EXTENSION, PICKLE_EXTENSION, model_registry
+
+# Runs in a fresh interpreter so each measurement starts from a clean process
+MEASURE_RSS_SCRIPT = """
+import json, sys
+import joblib
+import pandas as pd
+
+def memory():
+    values = {}
+    with open('/proc/self/status') as status:
+        for line in status:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                values[key] = int(value.split()[0]) / 1024  # kB -> MB
+    return values
+
+# Import the usual sklearn modules first so the baseline excludes code, not data
+import sklearn.pipeline, sklearn.feature_extraction.text, sklearn.linear_model, sklearn.naive_bayes, sklearn.svm
+
+sample = pd.Series(['warming up every page the model touches while scoring'])
+before = memory()
+pipeline = joblib.load(sys.argv[1], mmap_mode=sys.argv[2] or None)
+pipeline.predict_proba(sample)
+after = memory()
+print(json.dumps({'before': before, 'after': after}))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Convert a pickled sentiment model into a memory-mappable .joblib layout and report per-worker RSS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "version", nargs="?",
+            help="Model version to convert (default: the active one)"
+        )
+        parser.add_argument(
+            "--skip-report", action="store_true",
+            help="Don't measure RSS before/after"
+        )
+
+    def handle(self, *args, **options):
+        import joblib
+
+        version = options["version"] or model_registry.selected()[0]
+        source = os.path.join(model_registry.model_dir, f"{version}{PICKLE_EXTENSION}")
+        if not version or not os.path.exists(source):
+            raise CommandError(f"No pickled model {version!r} in {model_registry.model_dir}")
+
+        target = os.path.join(model_registry.model_dir, f"{version}{MMAP_EXTENSION}")
+        self.stdout.write(f"📦 Converting {os.path.basename(source)} -> {os.path.basename(target)}")
+
+        # Uncompressed dump: joblib stores NumPy arrays aligned in the file so
+        # joblib.load(..., mmap_mode='r') can map them instead of copying
+        pipeline = joblib.load(source)
+        fd, tmp_path = tempfile.mkstemp(dir=model_registry.model_dir, prefix='.convert-')
+        os.close(fd)
+        try:
+            joblib.dump(pipeline, tmp_path, compress=0)
+            os.replace(tmp_path, target)  # workers never see a half-written file
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        del pipeline
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Wrote {target} ({os.path.getsize(target) / 1024 / 1024:.1f} MB); "
+            f"workers switch to it on their next model check"
+        ))
+
+        if not options["skip_report"]:
+            self.report(source, target)
+
+    def measure(self, path, mmap_mode):
+        result = subprocess.run(
+            [sys.executable, "-c", MEASURE_RSS_SCRIPT, path, mmap_mode],
+            capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def report(self, source, target):
+        if not os.path.exists('/proc/self/status'):
+            self.stdout.write("⚠️ RSS report needs /proc (Linux); skipping")
+            return
+
+        try:
+            rows = [
+                ("pickle (before)", self.measure(source, "")),
+                ("mmap (after)", self.measure(target, "r")),
+            ]
+        except (subprocess.CalledProcessError, ValueError) as e:
+            self.stdout.write(f"⚠️ RSS measurement failed: {e}")
+            return
+
+        self.stdout.write("=" * 60)
+        self.stdout.write("PER-WORKER MEMORY FOR THE LOADED MODEL (MB)")
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"{'layout':<18}{'RSS':>10}{'private':>12}{'shared':>12}")
+        for label, values in rows:
+            before, after = values['before'], values['after']
+            rss = after['VmRSS'] - before['VmRSS']
+            private = after.get('RssAnon', 0) - before.get('RssAnon', 0)
+            shared = after.get('RssFile', 0) - before.get('RssFile', 0)
+            self.stdout.write(f"{label:<18}{rss:>10.1f}{private:>12.1f}{shared:>12.1f}")
+        self.stdout.write("-" * 60)
+        self.stdout.write("private = anonymous memory duplicated in every worker;")
+        self.stdout.write("shared = file-backed pages served once from the page cache.")
+        self.stdout.write("Python objects (e.g. a vectorizer's vocabulary dict) stay private.")
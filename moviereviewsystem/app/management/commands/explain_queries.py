@@ -0,0 +1,99 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from app import search
+from app.models import Movie
+from app.pagination import KeysetPaginator
+from app.views import MOVIE_LIST_FIELDS, MOVIE_LIST_MAX_LIMIT, browse_movies, filter_by_tags
+
+# Plan fragments that mean the query sorts or scans the whole table
+TEMP_SORT = 'USE TEMP B-TREE'
+FULL_SCAN = 'SCAN app_movie'
+
+
+def hot_queries():
+    """
+    (name, sql, params, forbidden plan fragments) for each hot query in app/views.py
+
+    Built from the same helpers the views use, so a change there is explained too.
+    """
+    queries = []
+
+    def add(name, queryset, forbid=()):
+        sql, params = queryset.query.sql_with_params()
+        queries.append((name, sql, params, forbid))
+
+    # movies() / movie_page(): a page after a cursor, unfiltered and filtered by type
+    for type_filter in ('', 'movie', 'tv'):
+        paginator = KeysetPaginator(browse_movies(type_filter), 24)
+        seek = paginator.queryset.filter(paginator._seek([2018, 'M', 1], forward=True))
+        add(f"movies page ({type_filter or 'all'})", seek[:25], forbid=(TEMP_SORT,))
+
+    # ?genre= / ?country=: joins through the link tables' indexes, no LIKE scan
+    for genre, country in (('dramas', ''), ('', 'india'), ('comedies', 'united-states')):
+        paginator = KeysetPaginator(browse_movies('', genre, country), 24)
+        label = ', '.join(f'{name}={value}' for name, value in (('genre', genre), ('country', country)) if value)
+        add(f"movies page ({label})", paginator.queryset[:25], forbid=(FULL_SCAN,))
+
+    # KeysetPaginator.count for a filtered page (cache miss)
+    sql, params = browse_movies('movie').order_by().values('pk').query.sql_with_params()
+    queries.append(("movies count (type=movie)", f"SELECT COUNT(*) FROM ({sql}) subquery", params, (FULL_SCAN,)))
+
+    # movie_detail()
+    add("movie detail", Movie.objects.filter(id=1), forbid=(FULL_SCAN,))
+
+    # movie_search_api() / search_movies()
+    if search.fts_available():
+        queries.append(("search (FTS5)", search.SEARCH_SQL,
+                        [search.build_match_query('stranger th'), 8], (FULL_SCAN,)))
+    add("search (icontains fallback)", search.like_queryset('stranger')[:8])
+
+    # movie_list(): the whole catalogue streamed in id order, or one ?limit= page after an id cursor
+    movies = filter_by_tags(Movie.objects.all(), '', '')
+    add("movie list (stream)", movies.order_by('id').values(*MOVIE_LIST_FIELDS), forbid=(TEMP_SORT,))
+    columns = tuple(dict.fromkeys(MOVIE_LIST_FIELDS + ('id',)))
+    paginator = KeysetPaginator(movies.values(*columns), MOVIE_LIST_MAX_LIMIT, ordering=('id',))
+    seek = paginator.queryset.filter(paginator._seek([5000], forward=True))
+    add("movie list (page)", seek[:MOVIE_LIST_MAX_LIMIT + 1], forbid=(TEMP_SORT, FULL_SCAN))
+    return queries
+
+
+class Command(BaseCommand):
+    help = 'Print the query plan of each hot query in app/views.py'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Exit with an error if a hot query sorts or scans where it shouldn't"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"EXPLAIN QUERY PLAN is SQLite-only; this database is {connection.vendor}")
+
+        problems = []
+        for name, sql, params, forbid in hot_queries():
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                plan = [row[-1] for row in cursor.fetchall()]
+
+            self.stdout.write("=" * 60)
+            self.stdout.write(f"🔍 {name}")
+            self.stdout.write("-" * 60)
+            self.stdout.write(sql.strip())
+            for step in plan:
+                self.stdout.write(f"   {step}")
+
+            for fragment in forbid:
+                # "SCAN app_movie USING INDEX ..." is an ordered index walk, not a table scan
+                bad = [step for step in plan if fragment in step and 'USING' not in step]
+                if bad:
+                    problems.append(f"{name}: {bad[0]}")
+                    self.stdout.write(self.style.WARNING(f"⚠️ {bad[0]}"))
+
+        self.stdout.write("=" * 60)
+        if not problems:
+            self.stdout.write(self.style.SUCCESS("✅ No table sorts or unexpected scans in the hot queries"))
+        elif options["check"]:
+            raise CommandError("Query plan regressions:\n" + "\n".join(problems))
+        else:
+            self.stdout.write(self.style.WARNING(f"⚠️ {len(problems)} query plan problem(s); see above"))
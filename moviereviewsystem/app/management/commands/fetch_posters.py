@@ -1,88 +1,190 @@
-import requests
+import json
+import os
 import time
-from django.core.management.base import BaseCommand
-from app.models import Movie
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from django.db.models import Q
+from app.catalogue import bump_catalogue_version
+from app.models import Movie
+from app.response_cache import invalidate_movies
+from app.tmdb import TMDB_API_BASE, TMDB_RATE_LIMIT, TMDbAuthError, TMDbClient, TMDbError
 
+IMAGE_FIELDS = ['poster_url', 'backdrop_url']
 
-class Command(BaseCommand):
-    help = 'Fetch movie posters from TMDb API'
-
-    def fetch_movie_poster(self, movie_data):
-        movie, api_key, image_base = movie_data
-        try:
-            endpoint = 'tv' if movie.type == 'TV Show' else 'movie'
-            params = {
-                'api_key': api_key,
-                'query': movie.title,
-                'year': movie.release_year
-            }
-
-            response = requests.get(f'https://api.themoviedb.org/3/search/{endpoint}', params=params)
-            data = response.json()
-
-            if data.get('results'):
-                result = data['results'][0]
-                poster_path = result.get('poster_path')
-                backdrop_path = result.get('backdrop_path')
-
-                updates = {}
-                if poster_path:
-                    updates['poster_url'] = f'{image_base}{poster_path}'
-                if backdrop_path:
-                    updates['backdrop_url'] = f'{image_base}{backdrop_path}'
-
-                return movie, updates, None
-            else:
-                return movie, None, 'Not found'
-
-        except Exception as e:
-            return movie, None, str(e)
-
-    def handle(self, *args, **options):
-        api_key = '7b995d3c6fd91a2284b4ad8cb390c7b8'
-        image_base = 'https://image.tmdb.org/t/p/w500'
-
-        movies = Movie.objects.filter(poster_url__isnull=True)
-        total = movies.count()
+# Progress of an interrupted run; removed once a run finishes
+TMDB_CHECKPOINT_PATH = getattr(settings, 'TMDB_CHECKPOINT_PATH', Path(settings.BASE_DIR) / 'cache' / 'fetch_posters.json')
 
-        self.stdout.write(f'Fetching posters for {total} movies...')
 
-        # Prepare movie data for threading
-        movie_data = [(movie, api_key, image_base) for movie in movies]
+class Command(BaseCommand):
+    help = 'Fetch poster/backdrop URLs from TMDb for movies missing them (rate limited, resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", "--threads", type=int, default=10,
+            help="Concurrent requests (default: 10)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=100,
+            help="Movies per database write and checkpoint (default: 100)"
+        )
+        parser.add_argument(
+            "--rate", type=float, default=TMDB_RATE_LIMIT,
+            help=f"Max requests per second (default: {TMDB_RATE_LIMIT})"
+        )
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Refetch every movie, not only those without a poster"
+        )
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Ignore the checkpoint of an interrupted run and start over"
+        )
+        parser.add_argument(
+            "--checkpoint", default=str(TMDB_CHECKPOINT_PATH),
+            help="Checkpoint file (default: settings.TMDB_CHECKPOINT_PATH)"
+        )
+        parser.add_argument(
+            "--api-base", default=TMDB_API_BASE,
+            help="TMDb API base URL, e.g. a local stub server (default: settings.TMDB_API_BASE)"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="List the movies that would be fetched without calling TMDb"
+        )
 
-        successful = 0
-        failed = 0
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["batch_size"] < 1 or options["rate"] <= 0:
+            raise CommandError("--workers, --batch-size and --rate must be positive")
+        api_key = getattr(settings, 'TMDB_API_KEY', '')
+        if not api_key and not options["dry_run"]:
+            raise CommandError("Set the TMDB_API_KEY environment variable (settings.TMDB_API_KEY)")
+
+        self.verbosity = options["verbosity"]
+        selection = 'all' if options["all"] else 'missing'
+        movies = Movie.objects.only('id', 'title', 'release_year', 'type', *IMAGE_FIELDS).order_by('id')
+        if selection == 'missing':
+            movies = movies.filter(Q(poster_url__isnull=True) | Q(poster_url=''))
+
+        checkpoint_path = Path(options["checkpoint"])
+        checkpoint = {} if options["restart"] else self.load_checkpoint(checkpoint_path)
+        if checkpoint.get('selection') != selection:
+            checkpoint = {}
+        last_id = checkpoint.get('last_id', 0)
+        totals = checkpoint.get('totals') or {'updated': 0, 'not_found': 0, 'failed': 0}
+
+        remaining = movies.filter(id__gt=last_id).count()
+        if last_id:
+            self.stdout.write(f"⏯️ Resuming after movie #{last_id} ({sum(totals.values())} already processed)")
+        self.stdout.write(f"🎬 {remaining} movies to fetch ({selection})")
+        if not remaining:
+            checkpoint_path.unlink(missing_ok=True)
+            return
+
+        if options["dry_run"]:
+            for movie in movies.filter(id__gt=last_id)[:50]:
+                self.stdout.write(f"🧩 Would fetch: {movie.title} ({movie.release_year})")
+            if remaining > 50:
+                self.stdout.write(f"   ... and {remaining - 50} more")
+            return
+
+        client = TMDbClient(api_key, api_base=options["api_base"], rate=options["rate"], pool_size=options["workers"])
+        executor = ThreadPoolExecutor(max_workers=options["workers"])
+        start = time.perf_counter()
         processed = 0
-
-        # Use ThreadPoolExecutor for concurrent requests
-        with ThreadPoolExecutor(max_workers=10) as executor:  # Adjust workers as needed
-            future_to_movie = {executor.submit(self.fetch_movie_poster, data): data[0] for data in movie_data}
-
-            for future in as_completed(future_to_movie):
-                movie = future_to_movie[future]
-                processed += 1
-
-                try:
-                    result_movie, updates, error = future.result()
-
-                    if updates:
-                        # Bulk update in transaction
-                        with transaction.atomic():
-                            for field, value in updates.items():
-                                setattr(movie, field, value)
-                            movie.save()
-                        successful += 1
-                        self.stdout.write(f'[{processed}/{total}] ✓ {movie.title}')
-                    else:
-                        failed += 1
-                        self.stdout.write(f'[{processed}/{total}] ✗ {movie.title} - {error}')
-
-                except Exception as e:
-                    failed += 1
-                    self.stdout.write(f'[{processed}/{total}] ERROR: {movie.title} - {str(e)}')
-
+        try:
+            while True:
+                # Keyset batches: updated movies leave the "missing" filter without shifting the rest
+                batch = list(movies.filter(id__gt=last_id)[:options["batch_size"]])
+                if not batch:
+                    break
+
+                results = list(executor.map(lambda movie: self.fetch(client, movie), batch))
+                for outcome, count in self.save_batch(batch, results).items():
+                    totals[outcome] += count
+
+                last_id = batch[-1].id
+                processed += len(batch)
+                self.save_checkpoint(checkpoint_path, {'selection': selection, 'last_id': last_id, 'totals': totals})
+
+                rate = processed / (time.perf_counter() - start)
+                self.stdout.write(
+                    f"🚀 {processed}/{remaining} ({rate:.1f} movies/sec) — "
+                    f"updated {totals['updated']}, not found {totals['not_found']}, failed {totals['failed']}"
+                )
+        except TMDbAuthError as e:
+            raise CommandError(str(e))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(f"⏸️ Interrupted; run again to resume after movie #{last_id}"))
+            return
+        finally:
+            executor.shutdown(cancel_futures=True)
+            client.close()
+
+        checkpoint_path.unlink(missing_ok=True)
+        stats = client.stats
         self.stdout.write(self.style.SUCCESS(
-            f'Complete! Successful: {successful}, Failed: {failed}, Total: {total}'
-        ))
\ No newline at end of file
+            f"🎉 Done in {time.perf_counter() - start:.1f}s: updated {totals['updated']}, "
+            f"not found {totals['not_found']}, failed {totals['failed']} "
+            f"({stats['requests']} requests, {stats['retries']} retries, {stats['throttled']} throttled)"
+        ))
+
+    def fetch(self, client, movie):
+        """(movie, (poster_url, backdrop_url) or None, error)"""
+        media_type = 'tv' if movie.type == 'TV Show' else 'movie'
+        try:
+            return movie, client.search_images(movie.title, movie.release_year, media_type), None
+        except TMDbAuthError:
+            raise
+        except (TMDbError, ValueError) as e:  # ValueError: response wasn't JSON
+            return movie, None, str(e)
+
+    def save_batch(self, batch, results):
+        """Write the batch's new URLs with one bulk_update; returns outcome counts"""
+        counts = {'updated': 0, 'not_found': 0, 'failed': 0}
+        changed = []
+        for movie, urls, error in results:
+            if error:
+                counts['failed'] += 1
+                self.stdout.write(self.style.WARNING(f"❌ {movie.title}: {error}"))
+                continue
+            if urls is None:
+                counts['not_found'] += 1
+                if self.verbosity >= 2:
+                    self.stdout.write(f"⚠️ No results found for: {movie.title}")
+                continue
+
+            counts['updated'] += 1
+            before = (movie.poster_url, movie.backdrop_url)
+            movie.poster_url = urls[0] or movie.poster_url
+            movie.backdrop_url = urls[1] or movie.backdrop_url
+            if (movie.poster_url, movie.backdrop_url) != before:
+                changed.append(movie)
+            if self.verbosity >= 2:
+                self.stdout.write(f"✅ Updated: {movie.title}")
+
+        if changed:
+            with transaction.atomic():
+                Movie.objects.bulk_update(changed, IMAGE_FIELDS)
+            # bulk_update sends no signals
+            invalidate_movies([movie.id for movie in changed], IMAGE_FIELDS)
+            bump_catalogue_version()
+        return counts
+
+    def load_checkpoint(self, path):
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            self.stdout.write(self.style.WARNING(f"⚠️ Ignoring unreadable checkpoint {path}"))
+            return {}
+
+    def save_checkpoint(self, path, state):
+        # Write then rename, so an interrupted write never leaves half a file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
@@ -0,0 +1,244 @@
+import csv
+import hashlib
+import json
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from app.catalogue import bump_catalogue_version
+from app.models import Movie
+from app.response_cache import invalidate_movies
+from app.taxonomy import sync_movie_tags
+
+# CSV columns copied onto Movie (poster/backdrop URLs come from TMDb, never the CSV)
+IMPORT_FIELDS = (
+    'show_id', 'type', 'title', 'director', 'cast', 'country', 'date_added',
+    'release_year', 'rating', 'duration', 'listed_in', 'description',
+)
+UPDATE_FIELDS = IMPORT_FIELDS[1:]
+REQUIRED_FIELDS = ('show_id', 'type', 'title', 'release_year')
+
+# Rows whose stored hash is still blank (imported before --sync existed) are
+# hashed from the database this many at a time
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def content_hash(values):
+    """Digest of a title's CSV columns, compared by --sync instead of the columns themselves"""
+    payload = json.dumps([values[field] for field in UPDATE_FIELDS], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def coerce_row(row):
+    """
+    CSV row -> dict of Movie field values
+
+    Strips whitespace, turns empty strings into None and parses
+    release_year. Raises ValueError for rows the model can't hold.
+    """
+    values = {}
+    for field in IMPORT_FIELDS:
+        value = (row.get(field) or '').strip()
+        values[field] = value or None
+
+    missing = [field for field in REQUIRED_FIELDS if values[field] is None]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    try:
+        values['release_year'] = int(values['release_year'])
+    except ValueError:
+        raise ValueError(f"release_year {values['release_year']!r} is not a year")
+
+    for field in IMPORT_FIELDS:
+        max_length = Movie._meta.get_field(field).max_length
+        if max_length and values[field] is not None and len(values[field]) > max_length:
+            raise ValueError(f"{field} is longer than {max_length} characters")
+    return values
+
+
+class Command(BaseCommand):
+    help = 'Import titles from netflix_titles.csv with batched inserts (upserts with --update, diff-only with --sync)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "csv_path", nargs="?",
+            help="CSV file to import (default: netflix_titles.csv in BASE_DIR)"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Rows per INSERT statement and transaction (default: 1000)"
+        )
+        parser.add_argument(
+            "--update", action="store_true",
+            help="Refresh existing titles whose CSV data changed (default: skip existing titles)"
+        )
+        parser.add_argument(
+            "--sync", action="store_true",
+            help="Compare rows with the stored content hashes and write only new and changed titles"
+        )
+        parser.add_argument(
+            "--delete-missing", action="store_true",
+            help="With --sync, delete titles that are no longer in the CSV"
+        )
+
+    def handle(self, *args, **options):
+        csv_path = Path(options["csv_path"] or Path(settings.BASE_DIR) / 'netflix_titles.csv')
+        if not csv_path.exists():
+            raise CommandError(f"CSV file not found at: {csv_path}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options["delete_missing"] and not options["sync"]:
+            raise CommandError("--delete-missing needs --sync")
+
+        self.update = options["update"] or options["sync"]
+        self.batch_size = options["batch_size"]
+        self.totals = {'read': 0, 'invalid': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+
+        mode = ' (sync)' if options["sync"] else ' (updating changed titles)' if self.update else ''
+        self.stdout.write(f"📥 Importing {csv_path.name} in batches of {self.batch_size}{mode}...")
+        self.start = time.perf_counter()
+
+        if options["sync"]:
+            self.sync(csv_path, options["delete_missing"])
+        else:
+            batch = {}
+            for values in self.read_rows(csv_path):
+                batch[values['show_id']] = values  # a repeated show_id keeps its last row
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch)
+                    batch = {}
+                    self.progress()
+            if batch:
+                self.write_batch(batch)
+
+        elapsed = time.perf_counter() - self.start
+        totals = self.totals
+        self.stdout.write("=" * 50)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {totals['read']} rows in {elapsed:.2f}s ({totals['read'] / elapsed:,.0f} rows/sec)"
+        ))
+        self.stdout.write(f"   created:   {totals['created']}")
+        self.stdout.write(f"   updated:   {totals['updated']}")
+        self.stdout.write(f"   unchanged: {totals['unchanged']}{'' if self.update else ' (existing titles skipped)'}")
+        self.stdout.write(f"   invalid:   {totals['invalid']}")
+        if totals['deleted']:
+            self.stdout.write(f"   deleted:   {totals['deleted']}")
+
+    def read_rows(self, csv_path):
+        """Valid rows of the CSV as Movie field values; invalid ones are counted and skipped"""
+        with open(csv_path, encoding='utf-8', newline='') as file:
+            # Line numbers are the CSV's own (header is line 1)
+            for line, row in enumerate(csv.DictReader(file), start=2):
+                self.totals['read'] += 1
+                try:
+                    yield coerce_row(row)
+                except ValueError as e:
+                    self.totals['invalid'] += 1
+                    if self.totals['invalid'] <= 10:
+                        self.stdout.write(self.style.WARNING(f"⚠️ line {line}: {e}"))
+
+    def write_batch(self, batch):
+        """Insert new titles (and changed ones with --update) after comparing them with the database"""
+        existing = {
+            row['show_id']: row
+            for row in Movie.objects.filter(show_id__in=list(batch)).values(*IMPORT_FIELDS)
+        }
+        new = [values for show_id, values in batch.items() if show_id not in existing]
+        changed = [
+            values for show_id, values in batch.items()
+            if show_id in existing and self.update and values != existing[show_id]
+        ]
+        self.write(new, changed)
+        self.totals['unchanged'] += len(batch) - len(new) - len(changed)
+
+    def write(self, new, changed):
+        """Insert/upsert rows in one statement and transaction"""
+        rows = [Movie(**values, content_hash=content_hash(values)) for values in new + changed]
+        if not rows:
+            return
+
+        with transaction.atomic():
+            if self.update:
+                Movie.objects.bulk_create(
+                    rows, update_conflicts=True, unique_fields=['show_id'],
+                    update_fields=UPDATE_FIELDS + ('content_hash',)
+                )
+            else:
+                Movie.objects.bulk_create(rows, ignore_conflicts=True)
+
+            # Genre/country links follow listed_in/country; bulk_create sends no
+            # signals, so expire cached pages for these titles too
+            touched = list(Movie.objects.filter(show_id__in=[row.show_id for row in rows])
+                           .values('id', 'listed_in', 'country'))
+            sync_movie_tags(touched)
+            ids = [movie['id'] for movie in touched]
+            transaction.on_commit(lambda: (invalidate_movies(ids), bump_catalogue_version()))
+
+        self.totals['created'] += len(new)
+        self.totals['updated'] += len(changed)
+
+    def sync(self, csv_path, delete_missing):
+        """
+        Write only what differs from the last import
+
+        One query loads every stored hash; rows whose hash matches are
+        skipped without touching the database, so a new CSV drop costs
+        one pass over the file plus writes for the titles that changed.
+        The hash is of the CSV columns as last imported: edits made in
+        the admin are kept until the CSV row itself changes.
+        """
+        known = dict(Movie.objects.values_list('show_id', 'content_hash'))
+        self.backfill_hashes(known)
+
+        seen = set()
+        new, changed = {}, {}
+        for values in self.read_rows(csv_path):
+            show_id = values['show_id']
+            seen.add(show_id)
+            digest = content_hash(values)
+            if known.get(show_id) == digest:
+                if show_id not in new and show_id not in changed:
+                    self.totals['unchanged'] += 1
+                continue
+
+            # a repeated show_id keeps its last row
+            (changed if show_id in known and show_id not in new else new)[show_id] = values
+            known[show_id] = digest
+            if len(new) + len(changed) >= self.batch_size:
+                self.write(list(new.values()), list(changed.values()))
+                new, changed = {}, {}
+                self.progress()
+        self.write(list(new.values()), list(changed.values()))
+
+        missing = [show_id for show_id in known if show_id not in seen]
+        if missing and delete_missing:
+            for i in range(0, len(missing), self.batch_size):
+                # queryset.delete() sends post_delete, which expires caches
+                _, deleted = Movie.objects.filter(show_id__in=missing[i:i + self.batch_size]).delete()
+                self.totals['deleted'] += deleted.get('app.Movie', 0)
+        elif missing:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️ {len(missing)} titles are no longer in the CSV (use --delete-missing to remove them)"
+            ))
+
+    def backfill_hashes(self, known):
+        """Hash titles imported before content_hash existed, so --sync can skip them when unchanged"""
+        blank = [show_id for show_id, digest in known.items() if not digest]
+        if not blank:
+            return
+
+        self.stdout.write(f"🔑 Hashing {len(blank)} titles imported without a content hash...")
+        for i in range(0, len(blank), BACKFILL_CHUNK_SIZE):
+            rows = Movie.objects.filter(show_id__in=blank[i:i + BACKFILL_CHUNK_SIZE]).values('id', *IMPORT_FIELDS)
+            movies = []
+            for row in rows:
+                known[row['show_id']] = content_hash(row)
+                movies.append(Movie(id=row['id'], content_hash=known[row['show_id']]))
+            # Only the hash column changes: no cached page depends on it
+            Movie.objects.bulk_update(movies, ['content_hash'], batch_size=self.batch_size)
+
+    def progress(self):
+        elapsed = time.perf_counter() - self.start
+        self.stdout.write(f"   {self.totals['read']} rows ({self.totals['read'] / elapsed:,.0f} rows/sec)")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+from app import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for movies (SQLite FTS5)'
+
+    def handle(self, *args, **options):
+        if not search.fts_available():
+            raise CommandError(
+                "No FTS5 search index on this database. On SQLite run `python manage.py migrate`; "
+                "other backends use the icontains fallback and need no index."
+            )
+
+        self.stdout.write("🔎 Rebuilding movie search index...")
+        indexed = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"✅ Indexed {indexed} movies"))
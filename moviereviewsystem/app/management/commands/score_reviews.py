@@ -0,0 +1,345 @@
+import csv
+import itertools
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from app import sentiment
+from app.inference_pool import SENTIMENT_PROCESS_POOL_SIZE, InferencePool
+from app.models import Movie
+from app.reviews import add_reviews, review_from_result
+
+# Columns of CSV output (JSONL rows have the same keys)
+OUTPUT_FIELDS = ['row', 'id', 'sentiment', 'confidence', 'positive', 'negative', 'model_version']
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'jsonl' if Path(path).suffix.lower() in ('.jsonl', '.ndjson') else 'csv'
+
+
+def read_records(path, fmt):
+    """Input records as dicts, one at a time (CSV rows or JSONL objects)"""
+    with open(path, encoding='utf-8', newline='') as file:
+        if fmt == 'csv':
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def chunked(records, size):
+    iterator = iter(records)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class Scored:
+    """Finished result with the same .get() as a pool's AsyncResult (inline scoring)"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class FileSink:
+    """Appends scored rows to a CSV/JSONL file; offset() is where a resumed run truncates to"""
+
+    def __init__(self, path, fmt, offset):
+        self.fmt = fmt
+        self.file = open(path, 'a+', encoding='utf-8', newline='')
+        # Drop anything written after the last checkpoint (a chunk cut short)
+        self.file.truncate(offset)
+        self.file.seek(offset)
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=OUTPUT_FIELDS)
+            if offset == 0:
+                self.writer.writeheader()
+
+    def write(self, chunk, scores):
+        for record, score in zip(chunk, scores):
+            row = {'row': record['row'], 'id': record['id'], 'sentiment': 'unknown'}  # rows without text
+            if score:
+                row.update({
+                    'sentiment': score['sentiment'],
+                    'confidence': score['confidence'],
+                    'positive': score['probabilities']['positive'],
+                    'negative': score['probabilities']['negative'],
+                    'model_version': score['model_version'],
+                })
+            if self.fmt == 'csv':
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps({field: row.get(field) for field in OUTPUT_FIELDS}) + '\n')
+        return 0
+
+    def offset(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ReviewSink:
+    """Saves scored rows as Review objects (one bulk insert per chunk) for movies that exist"""
+
+    def __init__(self, movie_key):
+        self.movie_key = movie_key
+        self.field = Movie._meta.get_field(movie_key)
+
+    def clean_key(self, value):
+        """
+        The movie key as its column's type, or None if it can't be one
+
+        CSV values are strings and JSONL ones may be numbers; either converts
+        ('12' and 12 for an id). Rows whose key doesn't are left unmatched
+        rather than failing the lookup for the whole chunk.
+        """
+        if value in (None, '') or isinstance(value, (bool, dict, list)):
+            return None
+        if isinstance(value, float) and not value.is_integer():
+            return None
+        try:
+            return self.field.to_python(value)
+        except ValidationError:
+            return None
+
+    def write(self, chunk, scores):
+        keys = [self.clean_key(record['movie']) for record in chunk]
+        movie_ids = dict(
+            Movie.objects.filter(**{f'{self.movie_key}__in': {key for key in keys if key is not None}})
+            .values_list(self.movie_key, 'id')
+        )
+
+        reviews = []
+        for record, key, score in zip(chunk, keys, scores):
+            movie_id = movie_ids.get(key)
+            if score and movie_id is not None:
+                reviews.append(review_from_result(movie_id, None, record['text'], score))
+        add_reviews(reviews)
+        return len(reviews)
+
+    def offset(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Score a CSV/JSONL file of reviews in chunks across worker processes (resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="CSV or JSONL file of reviews")
+        parser.add_argument(
+            "--output",
+            help="Write scores to this CSV/JSONL file (by extension)"
+        )
+        parser.add_argument(
+            "--to-db", action="store_true",
+            help="Save scored reviews as Review rows instead of writing a file"
+        )
+        parser.add_argument(
+            "--format", choices=["csv", "jsonl"],
+            help="Input format (default: by extension)"
+        )
+        parser.add_argument(
+            "--text-field", default="review",
+            help="Column/key holding the review text (default: review)"
+        )
+        parser.add_argument(
+            "--id-field", default="id",
+            help="Column/key copied to the output to join results back (default: id)"
+        )
+        parser.add_argument(
+            "--movie-field", default="movie_id",
+            help="With --to-db: column/key naming the reviewed movie (default: movie_id)"
+        )
+        parser.add_argument(
+            "--movie-key", choices=["id", "show_id"], default="id",
+            help="With --to-db: whether --movie-field holds Movie ids or show_ids (default: id)"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Reviews per predict_proba call and per checkpoint (default: 1000)"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=SENTIMENT_PROCESS_POOL_SIZE,
+            help=f"Worker processes, each loading the model once; 0 scores in this process (default: {SENTIMENT_PROCESS_POOL_SIZE})"
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Progress file (default: <output>.checkpoint.json, or cache/ for --to-db)"
+        )
+        parser.add_argument(
+            "--restart", action="store_true",
+            help="Ignore an existing checkpoint and start from the first row"
+        )
+
+    def handle(self, *args, **options):
+        input_path = Path(options["input"])
+        if not input_path.exists():
+            raise CommandError(f"Input file not found: {input_path}")
+        if bool(options["output"]) == options["to_db"]:
+            raise CommandError("Pass exactly one of --output or --to-db")
+        if options["chunk_size"] < 1 or options["workers"] < 0:
+            raise CommandError("--chunk-size must be positive and --workers not negative")
+
+        version, model_path = sentiment.model_registry.selected()
+        if model_path is None:
+            raise CommandError(f"No sentiment model available: {sentiment.model_registry.error}")
+        model = sentiment.LoadedModel(None, version, sentiment.model_file_identity(model_path), model_path)
+
+        # --- checkpoint -------------------------------------------------------
+        if options["checkpoint"]:
+            checkpoint_path = Path(options["checkpoint"])
+        elif options["output"]:
+            checkpoint_path = Path(f'{options["output"]}.checkpoint.json')
+        else:
+            checkpoint_path = Path(settings.BASE_DIR) / 'cache' / f'score_reviews-{input_path.name}.json'
+
+        stat = input_path.stat()
+        source = {'input': str(input_path.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        state = {} if options["restart"] else self.load_checkpoint(checkpoint_path)
+        if state and state.get('source') != source:
+            raise CommandError(
+                f"{checkpoint_path} belongs to a different input (or the file changed); use --restart"
+            )
+        if state.get('rows'):
+            self.stdout.write(f"⏯️ Resuming after row {state['rows']} ({state['chunks']} chunks done)")
+            if state.get('model_version') != version:
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️ Earlier chunks were scored by {state.get('model_version')}, the rest by {version}"
+                ))
+        self.checkpoint_path = checkpoint_path
+        self.state = {
+            'source': source, 'model_version': version,
+            'chunks': state.get('chunks', 0), 'rows': state.get('rows', 0), 'offset': state.get('offset', 0),
+            'totals': state.get('totals') or {'scored': 0, 'skipped': 0, 'saved': 0, 'unmatched': 0},
+        }
+
+        # --- input / output ---------------------------------------------------
+        fmt = detect_format(input_path, options["format"])
+        records = self.records(input_path, fmt, options)
+        records = itertools.islice(records, self.state['rows'], None)  # skip rows finished by an earlier run
+
+        if options["to_db"]:
+            sink = ReviewSink(options["movie_key"])
+        else:
+            sink = FileSink(options["output"], detect_format(options["output"]), self.state['offset'])
+
+        pool = InferencePool(size=options["workers"]) if options["workers"] else None
+        if pool is None:
+            model = model._replace(pipeline=sentiment.load_pipeline(model_path))
+
+        def submit(chunk):
+            texts = [record['text'] for record in chunk if record['text']]
+            if pool is None:
+                return Scored(sentiment.score_texts(texts, model=model))
+            return pool.submit(texts, model)
+
+        # At most this many chunks are read ahead of the one being written,
+        # so memory stays flat however large the input is
+        window = max(2, options["workers"] * 2)
+        pending = deque()
+        start = time.perf_counter()
+        processed = 0
+
+        self.stdout.write(
+            f"🧠 Scoring {input_path.name} with {version} in chunks of {options['chunk_size']} "
+            f"({options['workers'] or 'no'} worker processes)"
+        )
+        try:
+            for chunk in chunked(records, options["chunk_size"]):
+                pending.append((chunk, submit(chunk)))
+                while len(pending) >= window:
+                    processed += self.complete(pending.popleft(), sink)
+                    self.progress(processed, start)
+            while pending:
+                processed += self.complete(pending.popleft(), sink)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(f"⏸️ Interrupted; run again to resume after row {self.state['rows']}"))
+            return
+        finally:
+            sink.close()
+            if pool is not None:
+                pool.close()
+
+        checkpoint_path.unlink(missing_ok=True)
+        totals = self.state['totals']
+        elapsed = time.perf_counter() - start
+        self.stdout.write("=" * 50)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {processed} rows in {elapsed:.2f}s ({processed / elapsed if elapsed else 0:,.0f} rows/sec)"
+        ))
+        self.stdout.write(f"   scored:  {totals['scored']}")
+        self.stdout.write(f"   skipped: {totals['skipped']} (no text)")
+        if options["to_db"]:
+            self.stdout.write(f"   saved:   {totals['saved']} reviews")
+            self.stdout.write(f"   skipped: {totals.get('unmatched', 0)} (unknown or malformed movie)")
+
+    def records(self, path, fmt, options):
+        """Records reduced to what scoring and output need"""
+        for row, record in enumerate(read_records(path, fmt)):
+            text = record.get(options["text_field"])
+            yield {
+                'row': row,
+                'id': record.get(options["id_field"]),
+                'text': text.strip() if isinstance(text, str) else '',
+                'movie': record.get(options["movie_field"]),
+            }
+
+    def complete(self, item, sink):
+        """
+        Wait for a chunk's scores, write them (in input order) and checkpoint
+
+        The checkpoint is saved after the chunk's output is flushed, so a
+        resumed run never skips rows. File output is also truncated back to
+        the checkpoint, so it never repeats them; with --to-db, a crash in
+        between can save one chunk twice.
+        """
+        chunk, result = item
+        scores = iter(result.get())
+        aligned = [next(scores) if record['text'] else None for record in chunk]
+
+        totals = self.state['totals']
+        skipped = aligned.count(None)
+        totals['scored'] += len(chunk) - skipped
+        totals['skipped'] += skipped
+        saved = sink.write(chunk, aligned)
+        totals['saved'] += saved
+        if isinstance(sink, ReviewSink):
+            # Scored, but the movie key was malformed or names no movie
+            totals['unmatched'] = totals.get('unmatched', 0) + len(chunk) - skipped - saved
+
+        self.state['chunks'] += 1
+        self.state['rows'] += len(chunk)
+        self.state['offset'] = sink.offset()
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.state))
+        os.replace(tmp, self.checkpoint_path)
+        return len(chunk)
+
+    def progress(self, processed, start):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"   {processed} rows ({processed / elapsed:,.0f} rows/sec)")
+
+    def load_checkpoint(self, path):
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            self.stdout.write(self.style.WARNING(f"⚠️ Ignoring unreadable checkpoint {path}"))
+            return {}
@@ -1,65 +1,66 @@
 import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 
-api_key = '7b995d3c6fd91a2284b4ad8cb390c7b8'
+# Test samples
+SAMPLES = [
+    {'title': 'Inception', 'year': 2010, 'type': 'movie'},
+    {'title': 'Breaking Bad', 'year': 2008, 'type': 'tv'},
+    {'title': 'Oppenheimer', 'year': 2023, 'type': 'movie'},
+]
 
 
-def test_tmdb_images():
-    print("\n" + "=" * 60)
-    print("TMDb Poster + Backdrop Test")
-    print("=" * 60)
+class Command(BaseCommand):
+    help = 'Look up a few well-known titles on TMDb and print their poster and backdrop URLs'
 
-    # Test samples
-    tests = [
-        {'title': 'Inception', 'year': 2010, 'type': 'movie'},
-        {'title': 'Breaking Bad', 'year': 2008, 'type': 'tv'},
-        {'title': 'Oppenheimer', 'year': 2023, 'type': 'movie'},
-    ]
+    def handle(self, *args, **options):
+        api_key = getattr(settings, 'TMDB_API_KEY', '')
+        if not api_key:
+            raise CommandError("Set the TMDB_API_KEY environment variable (settings.TMDB_API_KEY)")
 
-    for item in tests:
-        print(f"\nTesting: {item['title']} ({item['year']})")
+        self.stdout.write("\n" + "=" * 60)
+        self.stdout.write("TMDb Poster + Backdrop Test")
+        self.stdout.write("=" * 60)
 
-        try:
-            response = requests.get(
-                f"https://api.themoviedb.org/3/search/{item['type']}",
-                params={
-                    'api_key': api_key,
-                    'query': item['title'],
-                    'year': item['year']
-                },
-                timeout=10
-            )
+        for item in SAMPLES:
+            self.stdout.write(f"\nTesting: {item['title']} ({item['year']})")
 
-            if response.status_code == 200:
-                data = response.json()
+            try:
+                response = requests.get(
+                    f"{settings.TMDB_API_BASE}/search/{item['type']}",
+                    params={
+                        'api_key': api_key,
+                        'query': item['title'],
+                        'year': item['year']
+                    },
+                    timeout=10
+                )
 
-                if data['results']:
-                    result = data['results'][0]
+                if response.status_code == 200:
+                    data = response.json()
 
-                    # Check poster
-                    if result.get('poster_path'):
-                        poster = f"https://image.tmdb.org/t/p/w500{result['poster_path']}"
-                        print(f"  ✓ Poster:   {poster}")
-                    else:
-                        print("  ✗ Poster:   Not available")
+                    if data['results']:
+                        result = data['results'][0]
+
+                        # Check poster
+                        if result.get('poster_path'):
+                            self.stdout.write(f"  ✓ Poster:   {settings.TMDB_IMAGE_BASE}{result['poster_path']}")
+                        else:
+                            self.stdout.write("  ✗ Poster:   Not available")
 
-                    # Check backdrop
-                    if result.get('backdrop_path'):
-                        backdrop = f"https://image.tmdb.org/t/p/w500{result['backdrop_path']}"
-                        print(f"  ✓ Backdrop: {backdrop}")
+                        # Check backdrop
+                        if result.get('backdrop_path'):
+                            self.stdout.write(f"  ✓ Backdrop: {settings.TMDB_IMAGE_BASE}{result['backdrop_path']}")
+                        else:
+                            self.stdout.write("  ✗ Backdrop: Not available")
                     else:
-                        print("  ✗ Backdrop: Not available")
+                        self.stdout.write("  ✗ No results found")
                 else:
-                    print("  ✗ No results found")
-            else:
-                print(f"  ✗ API Error: {response.status_code}")
-
-        except Exception as e:
-            print(f"  ✗ Error: {str(e)}")
-
-    print("\n" + "=" * 60)
-    print("Test Complete!")
-    print("=" * 60)
+                    self.stdout.write(f"  ✗ API Error: {response.status_code}")
 
+            except Exception as e:
+                self.stdout.write(f"  ✗ Error: {str(e)}")
 
-if __name__ == "__main__":
-    test_tmdb_images()
\ No newline at end of file
+        self.stdout.write("\n" + "=" * 60)
+        self.stdout.write("Test Complete!")
+        self.stdout.write("=" * 60)
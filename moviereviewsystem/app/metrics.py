@@ -0,0 +1,282 @@
+"""
+Per-request stage timings, exposed as a Server-Timing header and on /metrics
+
+MetricsMiddleware samples METRICS_SAMPLE_RATE of requests. For a sampled
+request it keeps a Timings object in a context variable; stage() blocks,
+@timed functions and a database execute wrapper add their durations to it.
+Once the response is ready they are written to the Server-Timing header
+and recorded in per-process summaries (count, sum, p50/p95/p99 over the
+last METRICS_WINDOW observations), which /metrics renders in the Prometheus
+text format.
+
+When a request isn't sampled, the context variable stays None and every hook
+costs one ContextVar.get(). With METRICS_SAMPLE_RATE = 0 the query counter
+isn't installed at all.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from collections import deque
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from functools import wraps
+import random
+import threading
+import time
+
+# Fraction of requests timed (1.0 = all, 0 = instrumentation off)
+METRICS_SAMPLE_RATE = getattr(settings, 'METRICS_SAMPLE_RATE', 0.0)
+# Add a Server-Timing header to sampled responses (visible in browser devtools,
+# and to anyone else: it tells clients how long the database took)
+METRICS_SERVER_TIMING = getattr(settings, 'METRICS_SERVER_TIMING', False)
+# Observations kept per series for the quantiles
+METRICS_WINDOW = getattr(settings, 'METRICS_WINDOW', 1024)
+# Client addresses that may read /metrics without a staff login (the scraper)
+METRICS_ALLOWED_IPS = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+
+METRICS_PREFIX = 'moviereview'
+QUANTILES = (0.5, 0.95, 0.99)
+
+METRIC_HELP = {
+    'http_request_duration_seconds': 'Time from the first middleware to the response, per view',
+    'http_request_stage_seconds': 'Time spent in each instrumented stage of a request',
+    'http_request_db_queries': 'Database queries run per request',
+}
+
+_current = ContextVar('metrics_timings', default=None)
+
+
+class Timings:
+    """Stage durations (seconds) and query count of one sampled request"""
+
+    __slots__ = ('stages', 'queries')
+
+    def __init__(self):
+        self.stages = {}
+        self.queries = 0
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+def active():
+    """True while a sampled request is being timed (e.g. to pick a finer-grained code path)"""
+    return _current.get() is not None
+
+
+class stage:
+    """
+    Time a block as one stage of the current request: `with stage('parse'): ...`
+
+    Repeated stages add up. Outside a sampled request it does nothing.
+    """
+
+    __slots__ = ('name', 'timings', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = _current.get()
+        if self.timings is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter() - self.start)
+
+
+def timed(name):
+    """Decorator form of stage()"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count_queries(execute, sql, params, many, context):
+    """Database execute wrapper: adds each query to the 'db' stage and the query count"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.add('db', time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    if METRICS_SAMPLE_RATE > 0 and count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+# --- aggregation ---------------------------------------------------------------
+
+class Series:
+    __slots__ = ('count', 'sum', 'samples')
+
+    def __init__(self, window):
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=window)
+
+
+def quantile(ordered, fraction):
+    """Nearest-rank quantile of a sorted list"""
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """Thread-safe summaries keyed by metric name and label values"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = Series(self.window)
+            series.count += 1
+            series.sum += value
+            series.samples.append(value)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        """[(name, labels, count, sum, {quantile: value})] sorted by name and labels"""
+        with self._lock:
+            items = [(name, labels, series.count, series.sum, sorted(series.samples))
+                     for (name, labels), series in self._series.items()]
+        return [
+            (name, dict(labels), count, total, {q: quantile(samples, q) for q in QUANTILES})
+            for name, labels, count, total, samples in sorted(items, key=lambda item: (item[0], item[1]))
+        ]
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4), one summary per metric"""
+        lines = []
+        family = None
+        for name, labels, count, total, quantiles in self.snapshot():
+            metric = f'{METRICS_PREFIX}_{name}'
+            if name != family:
+                family = name
+                lines.append(f'# HELP {metric} {METRIC_HELP.get(name, name)}')
+                lines.append(f'# TYPE {metric} summary')
+            pairs = [f'{key}="{escape_label(value)}"' for key, value in labels.items()]
+            label_text = ','.join(pairs)
+            for q, value in quantiles.items():
+                quantile_labels = ','.join(pairs + [f'quantile="{q}"'])
+                lines.append(f'{metric}{{{quantile_labels}}} {value:.6g}')
+            lines.append(f'{metric}_sum{{{label_text}}} {total:.6g}')
+            lines.append(f'{metric}_count{{{label_text}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics_registry = MetricsRegistry()
+
+
+def can_read_metrics(request):
+    """Staff users and the METRICS_ALLOWED_IPS addresses may read /metrics"""
+    if request.META.get('REMOTE_ADDR') in METRICS_ALLOWED_IPS:
+        return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+# --- middleware ------------------------------------------------------------------
+
+def sampled():
+    if METRICS_SAMPLE_RATE >= 1:
+        return True
+    return METRICS_SAMPLE_RATE > 0 and random.random() < METRICS_SAMPLE_RATE
+
+
+def server_timing(timings, total):
+    """Server-Timing header value: one entry per stage plus the total, in milliseconds"""
+    entries = []
+    for name, seconds in timings.stages.items():
+        entry = f'{name};dur={seconds * 1000:.2f}'
+        if name == 'db':
+            entry += f';desc="{timings.queries} queries"'
+        entries.append(entry)
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+def record(request, response, timings, total):
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else 'unmatched'
+
+    metrics_registry.observe('http_request_duration_seconds', total,
+                             view=view, method=request.method, status=response.status_code)
+    for name, seconds in timings.stages.items():
+        metrics_registry.observe('http_request_stage_seconds', seconds, view=view, stage=name)
+    metrics_registry.observe('http_request_db_queries', timings.queries, view=view)
+
+    if METRICS_SERVER_TIMING:
+        response['Server-Timing'] = server_timing(timings, total)
+
+
+class MetricsMiddleware:
+    """Times sampled requests end to end (put it first in MIDDLEWARE); works under WSGI and ASGI"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not sampled():
+            return self.get_response(request)
+
+        timings = Timings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        record(request, response, timings, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not sampled():
+            return await self.get_response(request)
+
+        timings = Timings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        record(request, response, timings, time.perf_counter() - start)
+        return response
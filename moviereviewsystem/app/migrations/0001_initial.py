@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Movie',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('show_id', models.CharField(max_length=20, unique=True)),
+                ('type', models.CharField(max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('director', models.CharField(blank=True, max_length=255, null=True)),
+                ('cast', models.TextField(blank=True, null=True)),
+                ('country', models.CharField(blank=True, max_length=255, null=True)),
+                ('date_added', models.CharField(blank=True, max_length=100, null=True)),
+                ('release_year', models.IntegerField()),
+                ('rating', models.CharField(blank=True, max_length=20, null=True)),
+                ('duration', models.CharField(blank=True, max_length=50, null=True)),
+                ('listed_in', models.CharField(blank=True, max_length=255, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('poster_url', models.URLField(blank=True, max_length=500, null=True)),
+                ('backdrop_url', models.URLField(blank=True, max_length=500, null=True)),
+            ],
+        ),
+    ]
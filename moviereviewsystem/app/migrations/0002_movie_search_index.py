@@ -0,0 +1,71 @@
+from django.db import migrations
+
+# SQLite FTS5 index over the searchable Movie columns. It is an external-content
+# table (no second copy of the text) kept in sync by triggers, so bulk inserts
+# and queryset updates are indexed too. Other database backends skip this and
+# app.search falls back to icontains queries.
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS app_movie_fts USING fts5(
+        title, "cast", director, description,
+        content='app_movie', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_movie_fts_ai AFTER INSERT ON app_movie BEGIN
+        INSERT INTO app_movie_fts(rowid, title, "cast", director, description)
+        VALUES (new.id, new.title, new."cast", new.director, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_movie_fts_ad AFTER DELETE ON app_movie BEGIN
+        INSERT INTO app_movie_fts(app_movie_fts, rowid, title, "cast", director, description)
+        VALUES ('delete', old.id, old.title, old."cast", old.director, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS app_movie_fts_au
+    AFTER UPDATE OF title, "cast", director, description ON app_movie BEGIN
+        INSERT INTO app_movie_fts(app_movie_fts, rowid, title, "cast", director, description)
+        VALUES ('delete', old.id, old.title, old."cast", old.director, old.description);
+        INSERT INTO app_movie_fts(rowid, title, "cast", director, description)
+        VALUES (new.id, new.title, new."cast", new.director, new.description);
+    END
+    """,
+    # Index the rows that already exist
+    "INSERT INTO app_movie_fts(app_movie_fts) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    "DROP TRIGGER IF EXISTS app_movie_fts_ai",
+    "DROP TRIGGER IF EXISTS app_movie_fts_ad",
+    "DROP TRIGGER IF EXISTS app_movie_fts_au",
+    "DROP TABLE IF EXISTS app_movie_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_movie_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['type', '-release_year', 'title'], name='movie_type_year_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-release_year', 'title'], name='movie_year_title_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:53
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# On SQLite every write to app_movie bumps the stamp in the same transaction,
+# whichever process or code path made it. Other backends rely on
+# app.catalogue.bump_catalogue_version() (signals plus explicit calls).
+BUMP = """
+    UPDATE app_cataloguestamp
+    SET version = version + 1, modified = strftime('%Y-%m-%d %H:%M:%f', 'now')
+    WHERE id = 1;
+"""
+
+CREATE_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS app_movie_stamp_{name} AFTER {event} ON app_movie BEGIN {BUMP} END"
+    for name, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+]
+
+DROP_TRIGGERS = [f"DROP TRIGGER IF EXISTS app_movie_stamp_{name}" for name in ('ai', 'au', 'ad')]
+
+
+def create_stamp(apps, schema_editor):
+    CatalogueStamp = apps.get_model('app', 'CatalogueStamp')
+    CatalogueStamp.objects.using(schema_editor.connection.alias).get_or_create(
+        id=1, defaults={'version': 1, 'modified': timezone.now()}
+    )
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in CREATE_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_movie_browse_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogueStamp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=1)),
+                ('modified', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(create_stamp, drop_triggers),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+import importlib
+
+# Adding (or removing) a NOT NULL column makes SQLite rebuild app_movie, which
+# drops the search index (0002) and catalogue stamp (0004) triggers with the
+# old table. They are created again after the rebuild, in both directions.
+search_index = importlib.import_module('app.migrations.0002_movie_search_index')
+catalogue_stamp = importlib.import_module('app.migrations.0004_catalogue_stamp')
+
+CREATE_TRIGGERS = [
+    statement for statement in search_index.CREATE_SEARCH_INDEX if 'CREATE TRIGGER' in statement
+] + catalogue_stamp.CREATE_TRIGGERS
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_catalogue_stamp'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_triggers),
+        migrations.AddField(
+            model_name='movie',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.RunPython(create_triggers, migrations.RunPython.noop),
+    ]
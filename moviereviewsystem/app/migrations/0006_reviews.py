@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_movie_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieSentiment',
+            fields=[
+                ('movie', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sentiment_summary', serialize=False, to='app.movie')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('positive_count', models.PositiveIntegerField(default=0)),
+                ('negative_count', models.PositiveIntegerField(default=0)),
+                ('confidence_sum', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField()),
+                ('sentiment', models.CharField(max_length=10)),
+                ('confidence', models.FloatField()),
+                ('positive_probability', models.FloatField()),
+                ('negative_probability', models.FloatField()),
+                ('model_version', models.CharField(blank=True, default='', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='app.movie')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['movie', '-created_at'], name='review_movie_created_idx')],
+            },
+        ),
+    ]
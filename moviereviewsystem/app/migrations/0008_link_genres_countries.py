@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# 0007 creates empty Genre/Country tables, so ?genre= / ?country= would match
+# nothing until they are filled. This links every existing movie from its
+# listed_in / country strings (what app.taxonomy.sync_movie_tags does, on the
+# historical models). Names or links already there are kept, so running
+# `manage.py backfill_tags` before this migration does no harm.
+
+BATCH_SIZE = 500
+
+# Movie relation -> (source column, tag model)
+RELATIONS = {
+    'genres': ('listed_in', 'Genre'),
+    'countries': ('country', 'Country'),
+}
+
+
+def link_tags(apps, schema_editor):
+    from app.taxonomy import split_names, unique_slug
+
+    db = schema_editor.connection.alias
+    Movie = apps.get_model('app', 'Movie')
+    for relation, (column, model_name) in RELATIONS.items():
+        model = apps.get_model('app', model_name)
+        names = {movie_id: split_names(value) for movie_id, value in Movie.objects.using(db).values_list('id', column)}
+
+        ids = dict(model.objects.using(db).values_list('name', 'id'))
+        taken = set(model.objects.using(db).values_list('slug', flat=True))
+        missing = list(dict.fromkeys(name for movie_names in names.values() for name in movie_names if name not in ids))
+        model.objects.using(db).bulk_create(
+            [model(name=name, slug=unique_slug(name, taken)) for name in missing], batch_size=BATCH_SIZE,
+        )
+        ids.update(model.objects.using(db).filter(name__in=missing).values_list('name', 'id'))
+
+        through = getattr(Movie, relation).through
+        target = f'{model._meta.model_name}_id'
+        through.objects.using(db).bulk_create([
+            through(movie_id=movie_id, **{target: ids[name]})
+            for movie_id, movie_names in names.items() for name in movie_names
+        ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_genres_countries'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+import importlib
+
+# The app_movie triggers (0004) don't see writes to the genre/country link
+# tables, so ?genre= / ?country= pages kept their catalogue ETag after a
+# backfill or an admin edit of a movie's tags. These bump the stamp for those
+# writes too. (A later migration that rebuilds a link table must recreate them.)
+catalogue_stamp = importlib.import_module('app.migrations.0004_catalogue_stamp')
+
+LINK_TABLES = ('app_movie_genres', 'app_movie_countries')
+
+CREATE_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS {table}_stamp_{name} AFTER {event} ON {table} BEGIN {catalogue_stamp.BUMP} END"
+    for table in LINK_TABLES
+    for name, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+]
+
+DROP_TRIGGERS = [
+    f"DROP TRIGGER IF EXISTS {table}_stamp_{name}" for table in LINK_TABLES for name in ('ai', 'au', 'ad')
+]
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in CREATE_TRIGGERS:
+            schema_editor.execute(statement)
+    # 0008 linked every movie without touching the stamp; cached filter pages are stale
+    CatalogueStamp = apps.get_model('app', 'CatalogueStamp')
+    CatalogueStamp.objects.using(schema_editor.connection.alias).filter(id=1).update(
+        version=F('version') + 1, modified=timezone.now()
+    )
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_link_genres_countries'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -1,6 +1,32 @@
+from django.conf import settings
 from django.db import models
 
 # Create your models here.
+class Genre(models.Model):
+    """One of the comma-separated names in Movie.listed_in, e.g. 'Dramas'"""
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=100, unique=True)  # ?genre= value
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class Country(models.Model):
+    """One of the comma-separated names in Movie.country"""
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=100, unique=True)  # ?country= value
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'countries'
+
+    def __str__(self):
+        return self.name
+
+
 class Movie(models.Model):
     show_id = models.CharField(max_length=20, unique=True)
     type = models.CharField(max_length=50)
@@ -16,6 +42,81 @@ class Movie(models.Model):
     description = models.TextField(blank=True, null=True)
     poster_url = models.URLField(max_length=500, blank=True, null=True)  # NEW FIELD
     backdrop_url = models.URLField(max_length=500, blank=True, null=True)  # NEW
+    # Hash of the CSV columns last imported for this title (import_titles --sync)
+    content_hash = models.CharField(max_length=32, blank=True, default='', editable=False)
+    # listed_in / country split into rows (app.taxonomy keeps them in step), so
+    # ?genre= and ?country= filter through the join tables' indexes
+    genres = models.ManyToManyField(Genre, blank=True, related_name='movies')
+    countries = models.ManyToManyField(Country, blank=True, related_name='movies')
+
+    class Meta:
+        indexes = [
+            # Movies browser: filter by type, newest first, then title
+            models.Index(fields=['type', '-release_year', 'title'], name='movie_type_year_title_idx'),
+            # Unfiltered browser pages and search results in the same order
+            models.Index(fields=['-release_year', 'title'], name='movie_year_title_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class CatalogueStamp(models.Model):
+    """
+    Single row (id=1) whose version goes up on every Movie write
+
+    On SQLite, triggers on app_movie bump it, so bulk_create, queryset
+    updates and other processes are covered; elsewhere app.catalogue bumps it.
+    """
+    version = models.BigIntegerField(default=1)
+    modified = models.DateTimeField()
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"catalogue v{self.version}"
+
+
+class Review(models.Model):
+    """A review written for a movie, with the sentiment the model gave it"""
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name='reviews')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True, related_name='reviews'
+    )
+    text = models.TextField()
+    sentiment = models.CharField(max_length=10)  # 'positive' / 'negative'
+    confidence = models.FloatField()  # percent, as returned by the API
+    positive_probability = models.FloatField()
+    negative_probability = models.FloatField()
+    model_version = models.CharField(max_length=100, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # A movie's latest reviews
+            models.Index(fields=['movie', '-created_at'], name='review_movie_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.movie_id}: {self.sentiment}'
+
+
+class MovieSentiment(models.Model):
+    """
+    Running sentiment totals for one movie, kept current by app.reviews
+
+    Counts and sums are adjusted with F() expressions as reviews are added
+    or deleted, so a summary is one row read however many reviews exist.
+    """
+    movie = models.OneToOneField(Movie, on_delete=models.CASCADE, primary_key=True, related_name='sentiment_summary')
+    review_count = models.PositiveIntegerField(default=0)
+    positive_count = models.PositiveIntegerField(default=0)
+    negative_count = models.PositiveIntegerField(default=0)
+    confidence_sum = models.FloatField(default=0)
+    updated_at = models.DateTimeField()
+
+    @property
+    def positive_ratio(self):
+        return self.positive_count / self.review_count if self.review_count else None
+
+    @property
+    def mean_confidence(self):
+        return self.confidence_sum / self.review_count if self.review_count else None
@@ -0,0 +1,205 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+import base64
+import hashlib
+import json
+
+# Seconds a total count is cached for (count='cached')
+MOVIES_COUNT_CACHE_TIMEOUT = getattr(settings, 'MOVIES_COUNT_CACHE_TIMEOUT', 300)
+
+# Browser order, made unique with id so every row has exactly one position
+BROWSE_ORDERING = ('-release_year', 'title', 'id')
+
+COUNT_MODES = ('exact', 'cached', 'none')
+
+
+class InvalidCursor(ValueError):
+    """A cursor that wasn't produced by KeysetPaginator (or no longer decodes)"""
+
+
+def encode_cursor(payload):
+    """Opaque, URL-safe token for a cursor payload"""
+    data = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(data)
+        if (not isinstance(payload, dict) or not isinstance(payload.get('k'), list)
+                or not isinstance(payload.get('n', 1), int)):
+            raise ValueError('malformed cursor')
+        return payload
+    except ValueError as e:  # binascii.Error and JSONDecodeError are ValueErrors
+        raise InvalidCursor(str(e)) from e
+
+
+class KeysetPage:
+    """One page of results; quacks enough like Django's Page for templates"""
+
+    def __init__(self, object_list, number, next_cursor, previous_cursor, paginator):
+        self.object_list = object_list
+        self.number = number
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination over a unique ordering (seek method)
+
+    Each page is fetched with `WHERE (ordering columns) after/before <cursor
+    row> LIMIT per_page + 1`, which an index on the ordering walks directly, so
+    page 300 costs the same as page 1. Django's Paginator instead runs
+    COUNT(*) and OFFSET n on every request.
+
+    The total count is optional: 'exact' counts on the first page only (a
+    cursor page reports None; the client has the total from page 1), 'cached'
+    keeps it in the default cache for MOVIES_COUNT_CACHE_TIMEOUT seconds and
+    'none' skips it (count is None). The COUNT(*) costs more than the page
+    query itself, so running it on every page would undo the seek.
+    """
+
+    def __init__(self, queryset, per_page, ordering=BROWSE_ORDERING, count='cached'):
+        if count not in COUNT_MODES:
+            raise ValueError(f"count must be one of {COUNT_MODES}")
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = per_page
+        self.ordering = ordering
+        self.count_mode = count
+        self._cursor_page = False
+
+    # --- counts -------------------------------------------------------------
+
+    @property
+    def count(self):
+        if not hasattr(self, '_count'):
+            self._count = self._get_count()
+        return self._count
+
+    def _get_count(self):
+        if self.count_mode == 'none':
+            return None
+        if self.count_mode == 'exact':
+            return None if self._cursor_page else self.queryset.count()
+
+        sql, params = self.queryset.order_by().values('pk').query.sql_with_params()
+        key = 'keyset-count:' + hashlib.sha256(repr((sql, params)).encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = self.queryset.count()
+            cache.set(key, count, MOVIES_COUNT_CACHE_TIMEOUT)
+        return count
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(1, -(-self.count // self.per_page))
+
+    # --- pages ----------------------------------------------------------------
+
+    def page(self, cursor=None):
+        """The first page, or the page a next/previous cursor points at"""
+        self._cursor_page = bool(cursor)
+        if not cursor:
+            return self._page_after(None, number=1)
+
+        payload = decode_cursor(cursor)
+        if len(payload['k']) != len(self.ordering):
+            raise InvalidCursor('cursor does not match this ordering')
+        key = self._clean_key(payload['k'])
+        number = payload.get('n', 1)
+        if payload.get('d') == 'prev':
+            return self._page_before(key, number)
+        return self._page_after(key, number)
+
+    def _clean_key(self, key):
+        """Cursor values converted to their ordering columns' types; InvalidCursor if they don't fit"""
+        opts = self.queryset.model._meta
+        cleaned = []
+        for field, value in zip(self.ordering, key):
+            # to_python() would happily turn {} into '{}' for a CharField
+            if value is None or isinstance(value, (bool, dict, list)):
+                raise InvalidCursor(f'bad cursor value for {field.lstrip("-")}')
+            try:
+                cleaned.append(opts.get_field(field.lstrip('-')).to_python(value))
+            except ValidationError as e:
+                raise InvalidCursor(f'bad cursor value for {field.lstrip("-")}') from e
+        return cleaned
+
+    def _page_after(self, key, number):
+        queryset = self.queryset
+        if key is not None:
+            queryset = queryset.filter(self._seek(key, forward=True))
+        rows = list(queryset[:self.per_page + 1])
+
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return self._make_page(rows, number, has_next, has_previous=key is not None)
+
+    def _page_before(self, key, number):
+        reverse = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+        queryset = self.queryset.filter(self._seek(key, forward=False)).order_by(*reverse)
+        rows = list(queryset[:self.per_page + 1])
+
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return self._make_page(rows, number, has_next=True, has_previous=has_previous)
+
+    def _make_page(self, rows, number, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor({'k': self._key(rows[-1]), 'd': 'next', 'n': number + 1})
+        if rows and has_previous:
+            previous_cursor = encode_cursor({'k': self._key(rows[0]), 'd': 'prev', 'n': max(1, number - 1)})
+        return KeysetPage(rows, number, next_cursor, previous_cursor, self)
+
+    def _key(self, row):
+        """Ordering values of a model instance or a .values() dict"""
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(row, dict):
+            return [row[field] for field in fields]
+        return [getattr(row, field) for field in fields]
+
+    def _seek(self, key, forward):
+        """
+        Rows strictly after (or before) `key` in the ordering
+
+        For (-release_year, title, id) going forward that is
+        year <= y AND (year < y OR (year = y AND (title > t OR (title = t AND id > i)))),
+        where the redundant leading bound lets the database range-seek the index.
+        """
+        condition = None
+        for position in reversed(range(len(self.ordering))):
+            field = self.ordering[position]
+            name = field.lstrip('-')
+            downward = field.startswith('-') == forward
+            step = Q(**{f"{name}__{'lt' if downward else 'gt'}": key[position]})
+            if condition is not None:
+                step |= Q(**{name: key[position]}) & condition
+            condition = step
+
+        first = self.ordering[0]
+        downward = first.startswith('-') == forward
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if downward else 'gte'}": key[0]})
+        return bound & condition
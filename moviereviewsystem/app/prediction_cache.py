@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.core.cache import caches
+from . import metrics, sentiment
+from .batching import SENTIMENT_MICROBATCH_ENABLED, get_batcher
+from .inference_pool import score_with_backend
+import hashlib
+import threading
+
+# Cache alias from settings.CACHES (local-memory or file-based)
+SENTIMENT_CACHE_ALIAS = getattr(settings, 'SENTIMENT_CACHE_ALIAS', 'sentiment')
+SENTIMENT_CACHE_ENABLED = getattr(settings, 'SENTIMENT_CACHE_ENABLED', True)
+
+# Per-process hit/miss counters
+_stats = {'hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(hits=0, misses=0):
+    with _stats_lock:
+        _stats['hits'] += hits
+        _stats['misses'] += misses
+
+
+def normalize_review(text):
+    """Normalize review text the same way the views do before scoring"""
+    return text.strip()
+
+
+def prediction_cache_key(text, model_identity):
+    """
+    Content-addressed key: hash of the normalized text plus the model identity
+
+    A retrained model written to MODEL_PATH gets a new identity, so entries
+    scored by the previous model are never served for it.
+    """
+    digest = hashlib.sha256(
+        f"{model_identity}\0{normalize_review(text)}".encode('utf-8')
+    ).hexdigest()
+    return f"sentiment:{digest}"
+
+
+def score_texts_uncached(texts, model):
+    """
+    Run texts through the inference backend, via the micro-batcher when it is enabled
+
+    Small requests are coalesced with concurrent ones; requests that are
+    already a full batch go straight to the backend.
+    """
+    if SENTIMENT_MICROBATCH_ENABLED and len(texts) < get_batcher().max_batch_size:
+        return get_batcher().score_texts(texts, model)
+    return score_with_backend(texts, model)
+
+
+def score_texts_cached(texts):
+    """
+    Score texts through the prediction cache
+
+    Cached results are looked up in one get_many call; only the misses go
+    through the pipeline (in one batch) and are written back with set_many.
+    """
+    # Keys and scoring use the same model snapshot
+    model = sentiment.get_model()
+    if not SENTIMENT_CACHE_ENABLED:
+        with metrics.stage('inference'):
+            scores = score_texts_uncached(texts, model)
+        return [dict(score, model_version=model.version) for score in scores]
+
+    cache = caches[SENTIMENT_CACHE_ALIAS]
+    keys = [prediction_cache_key(text, model.identity) for text in texts]
+    with metrics.stage('cache'):
+        cached = cache.get_many(keys)
+
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    _count(hits=len(keys) - len(missing), misses=len(missing))
+
+    if missing:
+        with metrics.stage('inference'):
+            scores = score_texts_uncached([texts[i] for i in missing], model)
+        fresh = {}
+        for i, score in zip(missing, scores):
+            fresh[keys[i]] = score
+        with metrics.stage('cache'):
+            cache.set_many(fresh)
+        cached.update(fresh)
+
+    # Hand out copies so callers can add fields without touching cached values;
+    # keys include the model identity, so every hit was scored by this version
+    return [dict(cached[key], model_version=model.version) for key in keys]
+
+
+def score_text_cached(text):
+    """Score one review text through the prediction cache"""
+    return score_texts_cached([text])[0]
+
+
+def cache_stats():
+    """Hit/miss counters for this process"""
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    model = sentiment.model_registry.current
+    return {
+        'enabled': SENTIMENT_CACHE_ENABLED,
+        'backend': settings.CACHES[SENTIMENT_CACHE_ALIAS]['BACKEND'] if SENTIMENT_CACHE_ALIAS in settings.CACHES else None,
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0.0,
+        'model_version': model.version if model else None,
+        'model_identity': model.identity if model else None,
+    }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats['hits'] = 0
+        _stats['misses'] = 0
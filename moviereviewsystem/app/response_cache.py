@@ -0,0 +1,216 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from .catalogue import catalogue_stamp
+from .models import Movie
+import hashlib
+import threading
+import uuid
+
+# Cache alias from settings.CACHES (local-memory or file-based)
+RESPONSE_CACHE_ALIAS = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'responses')
+RESPONSE_CACHE_ENABLED = getattr(settings, 'RESPONSE_CACHE_ENABLED', True)
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 600)
+
+# Tags shared by every entry whose *set or order* of movies a write can change
+ORDER_TAG = 'movies:order'    # browser pages and counts
+SEARCH_TAG = 'movies:search'  # search results
+
+# Fields whose change moves a movie between pages or in/out of search results
+# (release_year breaks ties between equally relevant matches; listed_in and
+# country decide the ?genre= / ?country= pages it is on)
+ORDER_FIELDS = ('type', 'release_year', 'title', 'listed_in', 'country')
+SEARCH_FIELDS = ('title', 'cast', 'director', 'description', 'release_year')
+
+
+def movie_tag(movie_id):
+    """Tag of every entry that shows this movie"""
+    return f'movie:{movie_id}'
+
+
+def _tag_key(tag):
+    return f'rc-tag:{tag}'
+
+
+class ResponseCache:
+    """
+    Cache for rendered fragments and API results, invalidated by tags
+
+    Each entry stores the token each of its tags had when it was computed.
+    Invalidating a tag gives it a fresh random token, so every entry that
+    carries the tag stops matching, and other entries are left alone. A hit
+    costs two cache round trips: the entry and its tags' tokens. Tokens are
+    random rather than counters, so a tag evicted and recreated can never
+    match an old entry by accident.
+
+    Tags only see writes whose invalidation reaches this cache. A write from
+    another process (import_titles, fetch_posters, another worker) invalidates
+    that process's cache, which with the default local-memory backend isn't
+    this one. So keys also carry an epoch: the catalogue stamp version the
+    last time it moved by more than this process's own model signals account
+    for. Such a change starts a new epoch and every older entry misses.
+    """
+
+    def __init__(self, alias=RESPONSE_CACHE_ALIAS, timeout=RESPONSE_CACHE_TIMEOUT, enabled=RESPONSE_CACHE_ENABLED):
+        self.alias = alias
+        self.timeout = timeout
+        self.enabled = enabled
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._version = None  # catalogue version the tags are known to be current for
+        self._own_writes = 0  # stamp bumps made by this process's saves/deletes since then
+        self._epoch = None
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def note_write(self):
+        """Record a Movie save/delete whose tags this process has just invalidated"""
+        with self._stats_lock:
+            self._own_writes += 1
+
+    def epoch(self):
+        """Current key epoch, moved on when the catalogue changed behind this process's back"""
+        version = catalogue_stamp()[0]
+        with self._stats_lock:
+            if self._version is None or version - self._version != self._own_writes:
+                self._epoch = version
+            self._version, self._own_writes = version, 0
+            return self._epoch
+
+    def _count(self, name, hit):
+        with self._stats_lock:
+            counts = self._stats.setdefault(name, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def get_or_compute(self, name, params, compute):
+        """
+        Cached value for view `name` and `params`, or compute() -> (value, tags) on a miss
+
+        The tags' tokens are read after compute(), so a write landing in
+        between can leave one stale entry until RESPONSE_CACHE_TIMEOUT.
+        """
+        if not self.enabled:
+            return compute()[0]
+
+        digest = hashlib.sha256(repr(params).encode()).hexdigest()
+        key = f'rc:{self.epoch()}:{name}:{digest}'
+        cache = self.cache
+
+        entry = cache.get(key)
+        if entry is not None:
+            current = cache.get_many(list(entry['tags']))
+            if all(current.get(tag_key) == token for tag_key, token in entry['tags'].items()):
+                self._count(name, hit=True)
+                return entry['value']
+
+        self._count(name, hit=False)
+        value, tags = compute()
+        cache.set(key, {'value': value, 'tags': self._tokens(tags)}, self.timeout)
+        return value
+
+    def _tokens(self, tags):
+        """Current token of each tag, creating tokens for tags seen for the first time"""
+        keys = [_tag_key(tag) for tag in set(tags)]
+        tokens = self.cache.get_many(keys)
+        missing = {key: uuid.uuid4().hex for key in keys if key not in tokens}
+        if missing:
+            self.cache.set_many(missing, None)  # tags never expire on their own
+            tokens.update(missing)
+        return tokens
+
+    def invalidate(self, *tags):
+        """Expire every entry carrying any of `tags`"""
+        if tags:
+            self.cache.set_many({_tag_key(tag): uuid.uuid4().hex for tag in tags}, None)
+
+    def stats(self):
+        with self._stats_lock:
+            views = {name: dict(counts) for name, counts in self._stats.items()}
+        for counts in views.values():
+            total = counts['hits'] + counts['misses']
+            counts['hit_ratio'] = round(counts['hits'] / total, 4) if total else 0.0
+
+        hits = sum(counts['hits'] for counts in views.values())
+        misses = sum(counts['misses'] for counts in views.values())
+        return {
+            'enabled': self.enabled,
+            'alias': self.alias,
+            'backend': type(self.cache).__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'views': views,
+        }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+
+response_cache = ResponseCache()
+
+
+def invalidate_movies(movie_ids, fields=None):
+    """
+    Expire cached responses affected by changes to these movies
+
+    `fields` are the changed fields; None means anything may have changed
+    (including rows being added or removed). Call this after bulk writes,
+    which don't send model signals.
+    """
+    tags = [movie_tag(movie_id) for movie_id in movie_ids]
+    if fields is None or set(fields) & set(ORDER_FIELDS):
+        tags.append(ORDER_TAG)
+    if fields is None or set(fields) & set(SEARCH_FIELDS):
+        tags.append(SEARCH_TAG)
+    response_cache.invalidate(*tags)
+
+
+# --- signals: work out which fields a save() actually changed ------------------
+
+TRACKED_FIELDS = tuple(dict.fromkeys(ORDER_FIELDS + SEARCH_FIELDS))
+
+
+def _snapshot(instance):
+    return tuple(instance.__dict__.get(field) for field in TRACKED_FIELDS)
+
+
+def saved_fields(instance):
+    """
+    Tracked fields the last save() of this instance changed
+
+    None for a new row or when unknown. Set by movie_saved, so post_save
+    receivers connected after this module's can use it.
+    """
+    return getattr(instance, '_response_cache_changed', None)
+
+
+@receiver(post_init, sender=Movie)
+def remember_movie_fields(sender, instance, **kwargs):
+    instance._response_cache_snapshot = _snapshot(instance)
+
+
+@receiver(post_save, sender=Movie)
+def movie_saved(sender, instance, created, **kwargs):
+    if created:
+        invalidate_movies([instance.pk])
+    else:
+        before = getattr(instance, '_response_cache_snapshot', None)
+        after = _snapshot(instance)
+        if before is None:
+            changed = None
+        else:
+            changed = [field for field, old, new in zip(TRACKED_FIELDS, before, after) if old != new]
+        invalidate_movies([instance.pk], changed)
+    response_cache.note_write()
+    instance._response_cache_changed = None if created else changed
+    instance._response_cache_snapshot = _snapshot(instance)
+
+
+@receiver(post_delete, sender=Movie)
+def movie_deleted(sender, instance, **kwargs):
+    invalidate_movies([instance.pk])
+    response_cache.note_write()
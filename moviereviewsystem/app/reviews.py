@@ -0,0 +1,102 @@
+from collections import defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import MovieSentiment, Review
+
+
+def review_from_result(movie_id, user, text, result):
+    """Unsaved Review for a scoring result (the dict analyze_review returns)"""
+    return Review(
+        movie_id=movie_id,
+        user=user if user is not None and user.is_authenticated else None,
+        text=text,
+        sentiment=result['sentiment'],
+        confidence=result['confidence'],
+        positive_probability=result['probabilities']['positive'],
+        negative_probability=result['probabilities']['negative'],
+        model_version=result.get('model_version') or '',
+    )
+
+
+def record_review(movie_id, user, text, result):
+    """Save a scored review; its movie's summary is updated in the same transaction"""
+    with transaction.atomic():
+        review = review_from_result(movie_id, user, text, result)
+        review.save()  # post_save adds it to the summary
+    return review
+
+
+def add_reviews(reviews):
+    """bulk_create reviews and add them to their movies' summaries (bulk_create sends no signals)"""
+    with transaction.atomic():
+        created = Review.objects.bulk_create(reviews)
+        update_summaries(created)
+    return created
+
+
+def update_summaries(reviews, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) reviews from their movies' summaries
+
+    One UPDATE per movie with F() expressions, so concurrent writers never
+    overwrite each other's counts. A movie's first review creates its row.
+    """
+    deltas = defaultdict(lambda: {'review_count': 0, 'positive_count': 0, 'negative_count': 0, 'confidence_sum': 0.0})
+    for review in reviews:
+        delta = deltas[review.movie_id]
+        delta['review_count'] += sign
+        delta['positive_count' if review.sentiment == 'positive' else 'negative_count'] += sign
+        delta['confidence_sum'] += sign * review.confidence
+
+    now = timezone.now()
+    for movie_id, delta in deltas.items():
+        changes = {field: F(field) + value for field, value in delta.items()}
+        if MovieSentiment.objects.filter(movie_id=movie_id).update(updated_at=now, **changes) or sign < 0:
+            continue
+        try:
+            # Savepoint, so losing the race to create the row doesn't break the caller's transaction
+            with transaction.atomic():
+                MovieSentiment.objects.create(movie_id=movie_id, updated_at=now, **delta)
+        except IntegrityError:
+            MovieSentiment.objects.filter(movie_id=movie_id).update(updated_at=now, **changes)
+
+
+def sentiment_summary(movie_id):
+    """JSON-ready summary for a movie (zeros when it has no reviews yet) - one row read"""
+    summary = MovieSentiment.objects.filter(movie_id=movie_id).first()
+    if summary is None:
+        summary = MovieSentiment(movie_id=movie_id, updated_at=None)
+
+    positive_ratio, mean_confidence = summary.positive_ratio, summary.mean_confidence
+    return {
+        'movie_id': movie_id,
+        'review_count': summary.review_count,
+        'positive_count': summary.positive_count,
+        'negative_count': summary.negative_count,
+        'positive_ratio': round(positive_ratio, 4) if positive_ratio is not None else None,
+        'mean_confidence': round(mean_confidence, 2) if mean_confidence is not None else None,
+        'updated_at': summary.updated_at.isoformat() if summary.updated_at else None,
+    }
+
+
+def sentiment_etag(request, movie_id, *args, **kwargs):
+    """Changes whenever a review of this movie is added or deleted"""
+    stamp = MovieSentiment.objects.filter(movie_id=movie_id).values_list('review_count', 'updated_at').first()
+    if stamp is None:
+        return f'sentiment-{movie_id}-0'
+    return f'sentiment-{movie_id}-{stamp[0]}-{stamp[1].timestamp():.6f}'
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    # Reviews are never edited; only new ones change the totals
+    if created:
+        update_summaries([instance])
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    update_summaries([instance], sign=-1)
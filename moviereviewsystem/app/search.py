@@ -0,0 +1,89 @@
+from django.db import connection
+from django.db.models import Q
+from .models import Movie
+import re
+
+# FTS5 table created by migration 0002 (SQLite only)
+FTS_TABLE = 'app_movie_fts'
+
+# bm25 column weights: title, cast, director, description
+FTS_WEIGHTS = (10.0, 2.0, 3.0, 1.0)
+
+SEARCH_SQL = f"""
+    SELECT m.* FROM {FTS_TABLE} f
+    JOIN app_movie m ON m.id = f.rowid
+    WHERE {FTS_TABLE} MATCH %s
+    ORDER BY bm25({FTS_TABLE}, {', '.join(str(weight) for weight in FTS_WEIGHTS)}),
+             m.release_year DESC, m.title
+    LIMIT %s
+"""
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+_fts_available = None
+
+
+def fts_available():
+    """True when the database is SQLite and the FTS5 search index exists"""
+    global _fts_available
+    if _fts_available is None:
+        if connection.vendor != 'sqlite':
+            _fts_available = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+                )
+                _fts_available = cursor.fetchone() is not None
+    return _fts_available
+
+
+def build_match_query(query):
+    """
+    Turn user input into an FTS5 MATCH expression
+
+    Every word becomes a quoted prefix term ("star"* "wa"*) so typeahead input
+    matches while the user is still typing, and FTS syntax characters in
+    the input can't break the query.
+    """
+    tokens = TOKEN_PATTERN.findall(query.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_movies_fts(query, limit):
+    """Full-text search over title, cast, director and description ranked by relevance"""
+    match = build_match_query(query)
+    if match is None:
+        return []
+    return list(Movie.objects.raw(SEARCH_SQL, [match, limit]))
+
+
+def like_queryset(query):
+    """Movies with `query` in title, cast, director or description, newest first"""
+    return Movie.objects.filter(
+        Q(title__icontains=query) | Q(cast__icontains=query)
+        | Q(director__icontains=query) | Q(description__icontains=query)
+    ).order_by('-release_year', 'title')
+
+
+def search_movies_like(query, limit):
+    """Fallback for databases without the FTS index: icontains on the same columns"""
+    return list(like_queryset(query)[:limit])
+
+
+def search(query, limit):
+    """Search movies with the FTS index when available, otherwise with LIKE scans"""
+    if fts_available():
+        return search_movies_fts(query, limit)
+    return search_movies_like(query, limit)
+
+
+def rebuild_index():
+    """Re-index every movie from app_movie and optimize the FTS b-trees"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
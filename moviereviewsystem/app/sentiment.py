@@ -0,0 +1,366 @@
+from django.conf import settings
+from collections import namedtuple
+from . import metrics
+import os
+import re
+import string
+import threading
+import time
+
+# Heavy dependencies (joblib, pandas, nltk) are imported on first use so that
+# management commands and worker startup don't pay for them.
+
+# Download the NLTK stopwords corpus when it is missing (may need network)
+SENTIMENT_DOWNLOAD_STOPWORDS = getattr(settings, 'SENTIMENT_DOWNLOAD_STOPWORDS', True)
+
+_stop_words = None
+_stop_words_lock = threading.Lock()
+
+
+def get_stop_words():
+    """English stopwords, loaded once on first use (thread-safe)"""
+    global _stop_words
+    if _stop_words is None:
+        with _stop_words_lock:
+            if _stop_words is None:
+                import nltk
+                from nltk.corpus import stopwords
+
+                # Ensure NLTK stopwords are available
+                try:
+                    nltk.data.find('corpora/stopwords')
+                except LookupError:
+                    if not SENTIMENT_DOWNLOAD_STOPWORDS:
+                        raise
+                    nltk.download('stopwords', quiet=True)
+
+                _stop_words = frozenset(stopwords.words("english"))
+    return _stop_words
+
+
+# Precompiled cleaning steps, built once instead of on every call
+HTML_TAG_PATTERN = re.compile(r"<.*?>")
+DIGITS_PATTERN = re.compile(r"\d+")
+PUNCTUATION_AND_DIGITS = str.maketrans("", "", string.punctuation + string.digits)
+
+
+def clean_text_manual(text):
+    """
+    Manual text cleaning function to show preprocessing
+
+    Same output as the original regex chain (strip tags, punctuation and
+    digits, lowercase, drop stopwords), but with precompiled tables:
+    punctuation and ASCII digits go in one str.translate pass, and the
+    regexes only run when the text can actually contain a match.
+    """
+    if not text:
+        return ""
+
+    if "<" in text:
+        text = HTML_TAG_PATTERN.sub("", text)  # remove HTML tags
+    text = text.translate(PUNCTUATION_AND_DIGITS)  # remove punctuation and ASCII digits
+    if not text.isascii():
+        text = DIGITS_PATTERN.sub("", text)  # remove non-ASCII digits (\d is Unicode-aware)
+
+    # Lowercase and remove stopwords
+    stop_words = get_stop_words()
+    return " ".join([word for word in text.lower().split() if word not in stop_words])
+
+
+def build_sentiment_result(prediction, probabilities):
+    """Shape one prediction the way the frontend expects it"""
+    confidence = max(probabilities) * 100  # Convert to percentage
+
+    # Convert to sentiment labels
+    sentiment = 'positive' if prediction == 1 else 'negative'
+
+    return {
+        'sentiment': sentiment,
+        'confidence': round(confidence, 2),
+        'prediction': int(prediction),
+        'probabilities': {
+            'negative': round(probabilities[0] * 100, 2),
+            'positive': round(probabilities[1] * 100, 2)
+        }
+    }
+
+
+def model_file_identity(path):
+    """Identify a model file by name, size and mtime (changes whenever it is rewritten)"""
+    stat = os.stat(path)
+    return f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_pipeline(path):
+    """Unpickle a pipeline; .joblib files get their NumPy arrays memory-mapped"""
+    import joblib
+
+    if path.endswith(MMAP_EXTENSION) and SENTIMENT_MODEL_MMAP:
+        return joblib.load(path, mmap_mode='r')
+    return joblib.load(path)
+
+
+# A loaded pipeline together with its version and the identity of its file
+LoadedModel = namedtuple('LoadedModel', ['pipeline', 'version', 'identity', 'path'])
+
+# Versioned pipelines live in MODEL_DIR as <version>.pkl (regular pickle) or
+# <version>.joblib (uncompressed joblib dump, see convert_model_mmap); the file
+# named by ACTIVE_POINTER pins the active version, otherwise the newest is used
+MODEL_DIR = str(getattr(settings, 'SENTIMENT_MODEL_DIR', os.path.join(settings.BASE_DIR, 'model')))
+PICKLE_EXTENSION = '.pkl'
+MMAP_EXTENSION = '.joblib'
+MODEL_EXTENSIONS = (PICKLE_EXTENSION, MMAP_EXTENSION)
+ACTIVE_POINTER = 'ACTIVE'
+
+# Memory-map NumPy arrays of .joblib models read-only, so every worker shares
+# one copy through the page cache instead of unpickling its own
+SENTIMENT_MODEL_MMAP = getattr(settings, 'SENTIMENT_MODEL_MMAP', True)
+
+# How often (seconds) workers look for a new or re-pointed model; None disables it
+SENTIMENT_MODEL_POLL_INTERVAL = getattr(settings, 'SENTIMENT_MODEL_POLL_INTERVAL', 5)
+
+
+class ModelUnavailable(RuntimeError):
+    """Raised when scoring is requested but the sentiment model can't be loaded"""
+
+
+class ModelRegistry:
+    """
+    Holds the active sentiment pipeline out of a directory of versioned pickles
+
+    The first load happens lazily, once per process, under a lock. After that
+    get() re-checks the directory every `poll_interval` seconds; when the
+    selected file changed, the new pipeline is unpickled in a background
+    thread and swapped in with a single reference assignment. Requests already
+    running keep the LoadedModel they started with, so none are dropped. A file
+    that fails to load is skipped until it changes again.
+    """
+
+    def __init__(self, model_dir, poll_interval=SENTIMENT_MODEL_POLL_INTERVAL):
+        self.model_dir = model_dir
+        self.poll_interval = poll_interval
+        self.error = None
+        self.loading = False
+        self._model = None
+        self._failed = set()
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+
+    @property
+    def current(self):
+        """The model if it is already loaded, without triggering a load"""
+        return self._model
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def available_versions(self):
+        """
+        Map of version name -> file path for every model file in model_dir
+
+        When a version exists in both layouts the memory-mappable .joblib file
+        wins (unless SENTIMENT_MODEL_MMAP is off).
+        """
+        try:
+            names = sorted(os.listdir(self.model_dir))
+        except OSError:
+            return {}
+
+        preferred = MMAP_EXTENSION if SENTIMENT_MODEL_MMAP else PICKLE_EXTENSION
+        versions = {}
+        for name in names:
+            version, extension = os.path.splitext(name)
+            if extension not in MODEL_EXTENSIONS:
+                continue
+            if version not in versions or extension == preferred:
+                versions[version] = os.path.join(self.model_dir, name)
+        return versions
+
+    def pinned_version(self):
+        """Version named in the ACTIVE pointer file, or None to follow the newest file"""
+        try:
+            with open(os.path.join(self.model_dir, ACTIVE_POINTER), encoding='utf-8') as pointer:
+                return pointer.read().strip() or None
+        except OSError:
+            return None
+
+    def selected(self):
+        """(version, path) of the model that should be active, or (None, None)"""
+        versions = self.available_versions()
+        pinned = self.pinned_version()
+        if pinned:
+            if pinned not in versions:
+                self.error = f'Pinned model version {pinned!r} not found in {self.model_dir}'
+                return None, None
+            return pinned, versions[pinned]
+        if not versions:
+            self.error = f'No model files found in {self.model_dir}'
+            return None, None
+
+        def mtime(item):
+            try:
+                return os.stat(item[1]).st_mtime_ns
+            except OSError:
+                return 0
+
+        return max(versions.items(), key=mtime)
+
+    def get(self):
+        """Return the active LoadedModel, loading it if needed, or None if unavailable"""
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._load_selected()
+                return self._model
+
+        if self.poll_interval is not None and time.monotonic() >= self._next_check:
+            self._check_for_update()
+        return model
+
+    def _check_for_update(self):
+        # One thread checks; everyone else keeps serving the current model
+        if not self._check_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = time.monotonic() + self.poll_interval
+            version, path = self.selected()
+            if path is None or self.loading:
+                return
+            try:
+                identity = model_file_identity(path)
+            except OSError:
+                return
+            if identity != self._model.identity and identity not in self._failed:
+                threading.Thread(target=self.reload, name='sentiment-reload', daemon=True).start()
+        finally:
+            self._check_lock.release()
+
+    def use_directory(self, model_dir):
+        """Serve models from another directory; the next get() loads from there"""
+        with self._lock:
+            self.model_dir = model_dir
+            self.error = None
+            self._model = None
+            self._failed = set()
+
+    def reload(self):
+        """Load the selected model now and swap it in if it changed; returns the active model"""
+        with self._lock:
+            self._load_selected()
+            return self._model
+
+    def _load_selected(self):
+        version, path = self.selected()
+        if path is None:
+            return
+        try:
+            identity = model_file_identity(path)
+        except OSError as e:
+            self.error = str(e)
+            return
+
+        if self._model is not None and identity == self._model.identity:
+            return  # already active
+        if identity in self._failed:
+            return  # same broken file as last time, don't unpickle it again
+
+        self.loading = True
+        try:
+            model = LoadedModel(load_pipeline(path), version, identity, path)
+            self._model = model  # atomic swap; in-flight requests keep the old one
+            self.error = None
+            print(f"✅ Sentiment model {version!r} loaded successfully!")
+        except Exception as e:
+            self._failed.add(identity)
+            self.error = str(e)
+            print(f"❌ Error loading sentiment model {version!r}: {e}")
+        finally:
+            self.loading = False
+
+    def warm_up(self):
+        """Load the model and stopwords in a background thread"""
+        def _warm_up():
+            model = self.get()
+            if model is not None:
+                from .inference_pool import SENTIMENT_INFERENCE_BACKEND, get_inference_pool
+                if SENTIMENT_INFERENCE_BACKEND == 'process':
+                    get_inference_pool().warm_up(model)
+            try:
+                get_stop_words()
+            except Exception as e:
+                print(f"❌ Error loading stopwords: {e}")
+
+        thread = threading.Thread(target=_warm_up, name='sentiment-warm-up', daemon=True)
+        thread.start()
+        return thread
+
+
+model_registry = ModelRegistry(MODEL_DIR)
+
+
+def get_model():
+    """The active sentiment model; raises ModelUnavailable if it can't be loaded"""
+    model = model_registry.get()
+    if model is None:
+        raise ModelUnavailable(f'Sentiment model not available: {model_registry.error}')
+    return model
+
+
+def predict_labels(pipeline, probabilities):
+    """Derive class labels from a predict_proba matrix (same as pipeline.predict)"""
+    classes = getattr(pipeline, 'classes_', None)
+    indices = probabilities.argmax(axis=1)
+    if classes is None:
+        return indices
+    return classes[indices]
+
+
+def predict_proba(pipeline, texts):
+    """
+    pipeline.predict_proba(texts); timed as 'vectorize' + 'classify' during a sampled request
+
+    Splitting the pipeline costs a Pipeline copy, so unsampled calls go
+    straight through.
+    """
+    if not metrics.active() or len(getattr(pipeline, 'steps', ())) < 2:
+        with metrics.stage('classify'):
+            return pipeline.predict_proba(texts)
+    with metrics.stage('vectorize'):
+        features = pipeline[:-1].transform(texts)
+    with metrics.stage('classify'):
+        return pipeline[-1].predict_proba(features)
+
+
+def score_texts(texts, model=None):
+    """
+    Score a list of raw review texts with a single pass through the pipeline
+
+    Vectorization and classification run once via predict_proba; the label
+    is taken from the probability vector instead of calling predict again.
+    Returns one result dict per text, in input order, tagged with the
+    version of the model that scored it.
+    """
+    import pandas as pd
+
+    if not texts:
+        return []
+    if model is None:
+        model = get_model()
+
+    probabilities = predict_proba(model.pipeline, pd.Series(list(texts)))
+    predictions = predict_labels(model.pipeline, probabilities)
+
+    results = []
+    for prediction, probs in zip(predictions, probabilities):
+        result = build_sentiment_result(prediction, probs)
+        result['model_version'] = model.version
+        results.append(result)
+    return results
+
+
+def score_text(text, model=None):
+    """Score one raw review text"""
+    return score_texts([text], model=model)[0]
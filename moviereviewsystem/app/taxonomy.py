@@ -0,0 +1,105 @@
+"""
+Genre and Country rows for the comma-separated Movie.listed_in / Movie.country
+
+sync_movie_tags() splits those strings and writes the names to Genre and
+Country, and movie links to their join tables, all with bulk queries.
+import_titles calls it for the titles it writes, a post_save receiver for
+movies created or re-tagged through save(), and migration 0008 (or `manage.py
+backfill_tags`) for the whole catalogue. Browsing can then filter with
+?genre=<slug> / ?country=<slug> through the join tables' indexes instead of
+an icontains scan of every row.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.text import slugify
+from .models import Country, Genre, Movie
+from .response_cache import saved_fields
+
+# Movie relation -> (source column, tag model)
+TAG_RELATIONS = {
+    'genres': ('listed_in', Genre),
+    'countries': ('country', Country),
+}
+
+# Rows per bulk INSERT / DELETE (keeps SQLite under its bound-parameter limit)
+TAG_BATCH_SIZE = 500
+
+
+def split_names(value):
+    """'Dramas, International Movies,' -> ['Dramas', 'International Movies'] (order kept, no duplicates)"""
+    return list(dict.fromkeys(name.strip() for name in (value or '').split(',') if name.strip()))
+
+
+def unique_slug(name, taken):
+    base = slugify(name) or 'unknown'
+    slug, suffix = base, 2
+    while slug in taken:
+        slug, suffix = f'{base}-{suffix}', suffix + 1
+    taken.add(slug)
+    return slug
+
+
+def tag_ids(model, names):
+    """{name: id} for these names, creating the missing rows in one bulk insert"""
+    ids = dict(model.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = [name for name in names if name not in ids]
+    if missing:
+        taken = set(model.objects.values_list('slug', flat=True))
+        model.objects.bulk_create(
+            [model(name=name, slug=unique_slug(name, taken)) for name in missing],
+            batch_size=TAG_BATCH_SIZE, ignore_conflicts=True,  # another import may have added some
+        )
+        ids.update(model.objects.filter(name__in=missing).values_list('name', 'id'))
+    return ids
+
+
+def sync_movie_tags(movies):
+    """
+    Replace the genre/country links of these movies with what their strings say
+
+    `movies` are dicts (or objects) with id, listed_in and country. Old links
+    are deleted and new ones inserted in bulk; Genre/Country rows nobody
+    links to any more are left in place. Returns {relation: links written}.
+    """
+    movies = [movie if isinstance(movie, dict) else {
+        'id': movie.id, 'listed_in': movie.listed_in, 'country': movie.country,
+    } for movie in movies]
+    movie_ids = [movie['id'] for movie in movies]
+    written = {}
+
+    for relation, (column, model) in TAG_RELATIONS.items():
+        names = {movie['id']: split_names(movie[column]) for movie in movies}
+        ids = tag_ids(model, list(dict.fromkeys(name for movie_names in names.values() for name in movie_names)))
+
+        through = getattr(Movie, relation).through
+        target = f'{model._meta.model_name}_id'
+        for start in range(0, len(movie_ids), TAG_BATCH_SIZE):
+            through.objects.filter(movie_id__in=movie_ids[start:start + TAG_BATCH_SIZE]).delete()
+        links = [
+            through(movie_id=movie_id, **{target: ids[name]})
+            for movie_id, movie_names in names.items() for name in movie_names
+        ]
+        through.objects.bulk_create(links, batch_size=TAG_BATCH_SIZE)
+        written[relation] = len(links)
+    return written
+
+
+@receiver(post_save, sender=Movie)
+def movie_saved(sender, instance, raw=False, **kwargs):
+    """Re-link a movie created, or whose listed_in/country changed, through save()"""
+    # Deleting a movie deletes its links with it (on_delete=CASCADE)
+    if raw:
+        return  # loaddata: fixtures carry their own links
+    changed = saved_fields(instance)
+    if changed is None or {column for column, _ in TAG_RELATIONS.values()} & set(changed):
+        with transaction.atomic():
+            sync_movie_tags([instance])
+
+
+def tag_options():
+    """(name, slug) of every genre and country, for filter menus (two small table reads)"""
+    return {
+        relation: list(model.objects.values_list('name', 'slug'))
+        for relation, (_, model) in TAG_RELATIONS.items()
+    }
@@ -1,3 +1,950 @@
-from django.test import TestCase
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
+import io
+import json
+import multiprocessing
+import multiprocessing.pool
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+import joblib
+
+from .autocomplete import AutocompleteIndex
+from .batching import MicroBatcher
+from .benchmarks.fixtures import stand_in_model
+from .benchmarks.inference import CORPUS
+from .benchmarks.normalizer import clean_text_legacy
+from .catalogue import forget_catalogue_stamp
+from .inference_pool import InferencePool
+from .metrics import MetricsRegistry, metrics_registry
+from .models import CatalogueStamp, Genre, Movie, MovieSentiment, Review
+from .pagination import InvalidCursor, KeysetPaginator, encode_cursor
+from .prediction_cache import (
+    SENTIMENT_CACHE_ALIAS, cache_stats, reset_cache_stats, score_text_cached, score_texts_cached,
+)
+from .response_cache import response_cache
+from .reviews import add_reviews, record_review, review_from_result
+from .search import search_movies_fts
+from .sentiment import LoadedModel, ModelRegistry, clean_text_manual, load_pipeline, model_registry, score_texts
+from .views import stream_json_array, stream_ndjson
+
+
+class CleanTextManualTests(SimpleTestCase):
+    """The precompiled normalizer must match the original regex chain exactly"""
+
+    SAMPLES = [
+        "",
+        "Great movie!!! 10/10 would watch again.",
+        "<br /><br />The BEST film of 2019, isn't it?",
+        "Unclosed <tag and a stray > bracket",
+        "Multi-line <b\n>tag</b> with\ttabs\nand newlines",
+        "!<b x>nested punctuation before a tag",
+        "Unicode digits ٣٤ and ２０２４, accents café, İstanbul, Straße",
+        "It was the worst of the worst, and I didn't like it at all",
+    ]
+
+    def test_matches_legacy_on_samples(self):
+        for text in self.SAMPLES:
+            with self.subTest(text=text):
+                self.assertEqual(clean_text_manual(text), clean_text_legacy(text))
+
+    def test_matches_legacy_on_random_text(self):
+        rng = random.Random(42)
+        alphabet = list("abcXYZ  <>!?.,;:'\"0123456789\n\t/-_") + ['٣', 'é', 'İ', 'ß', '<br />', '</b>', 'The', 'not']
+        for _ in range(2000):
+            text = "".join(rng.choices(alphabet, k=rng.randint(0, 60)))
+            self.assertEqual(clean_text_manual(text), clean_text_legacy(text), text)
+
+
+class AutocompleteIndexTests(SimpleTestCase):
+    """Typeahead lookups served from the in-memory title index"""
+
+    MOVIES = [
+        (1, 'Stranger Things', 2019),
+        (2, 'Beyond Stranger Things', 2017),
+        (3, 'The Dark Knight', 2008),
+        (4, 'Amélie', 2001),
+        (5, 'Into the Night', 2021),
+        (6, 'The Godfather', 1972),
+    ]
+
+    def setUp(self):
+        self.index = AutocompleteIndex(refresh_interval=0)
+        self.index.build([self.movie(*movie) for movie in self.MOVIES])
+
+    @staticmethod
+    def movie(movie_id, title, release_year):
+        return {'id': movie_id, 'title': title, 'release_year': release_year,
+                'type': 'Movie', 'rating': 'PG-13', 'poster_url': None}
+
+    def titles(self, query, limit=8):
+        return [movie['title'] for movie in self.index.lookup(query, limit)]
+
+    def test_prefix_of_any_word_newest_first(self):
+        self.assertEqual(self.titles('str'), ['Stranger Things', 'Beyond Stranger Things'])
+        self.assertEqual(self.titles('dark kn'), ['The Dark Knight'])
+        self.assertEqual(self.titles('str', limit=1), ['Stranger Things'])
+        self.assertEqual(self.titles('str', limit=0), [])
+        self.assertEqual(self.titles('str', limit=-1), [])
+
+    def test_accents_and_case_are_ignored(self):
+        self.assertEqual(self.titles('AMELIE'), ['Amélie'])
+
+    def test_infix_after_prefix_matches(self):
+        self.assertEqual(self.titles('ight'), ['Into the Night', 'The Dark Knight'])
+
+    def test_typos_fall_back_to_trigram_similarity(self):
+        self.assertEqual(self.titles('godfahter'), ['The Godfather'])
+        self.assertEqual(self.titles('xyzzy'), [])
+
+    def test_incremental_updates(self):
+        self.index.add(self.movie(7, 'Stranger Than Fiction', 2006))
+        self.index.add(self.movie(1, 'Stranger Things 4', 2022))
+        self.index.remove(2)
+        self.assertEqual(self.titles('st'), ['Stranger Things 4', 'Stranger Than Fiction'])
+        self.assertEqual(self.titles('things 4'), ['Stranger Things 4'])
+
+
+class KeysetPaginatorTests(TestCase):
+    """Cursor pages must cover the browser ordering exactly once, both ways"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Repeated years and titles so the id tie-breaker matters
+        Movie.objects.bulk_create([
+            Movie(show_id=f's{i}', type='Movie' if i % 3 else 'TV Show',
+                  title=f'Title {i % 7}', release_year=2000 + i % 4)
+            for i in range(50)
+        ])
+
+    def expected_ids(self, queryset):
+        return list(queryset.order_by('-release_year', 'title', 'id').values_list('id', flat=True))
+
+    def test_forward_and_backward_walks_match_offset_order(self):
+        for queryset in (Movie.objects.all(), Movie.objects.filter(type='TV Show')):
+            paginator = KeysetPaginator(queryset, 6, count='exact')
+            pages = [paginator.page()]
+            num_pages = paginator.num_pages
+            while pages[-1].has_next():
+                pages.append(paginator.page(pages[-1].next_cursor))
+
+            forward = [movie.id for page in pages for movie in page]
+            self.assertEqual(forward, self.expected_ids(queryset))
+            self.assertEqual(pages[-1].number, num_pages)
+
+            # 'exact' only counts on the first page
+            later = KeysetPaginator(queryset, 6, count='exact')
+            later.page(pages[1].next_cursor)
+            self.assertIsNone(later.count)
+
+            backward = []
+            page = pages[-1]
+            while page.has_previous():
+                page = paginator.page(page.previous_cursor)
+                backward = [movie.id for movie in page] + backward
+            self.assertEqual(page.number, 1)
+            self.assertEqual(backward, forward[:len(backward)])
+            self.assertEqual(len(backward), len(forward) - len(pages[-1]))
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator(Movie.objects.all(), 6)
+        for cursor in ('not-a-cursor', 'e30', 'eyJrIjpbMV19'):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+    def test_tampered_cursor_values_are_rejected(self):
+        tampered = [encode_cursor({'k': key, 'd': 'next', 'n': 2}) for key in (
+            [{}, 'a', 1], ['2001x', 'a', 1], [2001, ['a'], 1], [2001, 'a', 'one'], [2001, None, 1], [True, 'a', 1],
+        )]
+        paginator = KeysetPaginator(Movie.objects.all(), 6)
+        for cursor in tampered:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+        self.assertEqual(self.client.get('/api/movies/page/', {'cursor': tampered[0]}).status_code, 400)
+        self.assertEqual(self.client.get('/api/movies/', {'cursor': encode_cursor({'k': ['one']})}).status_code, 400)
+        self.assertEqual(self.client.get('/movies/', {'cursor': tampered[0]}).status_code, 200)  # back to page 1
+
+        # Digit strings still convert to the column type
+        page = paginator.page(encode_cursor({'k': ['2003', 'Title 0', '7'], 'n': 2}))
+        self.assertEqual(page.number, 2)
+
+
+class MovieStreamTests(SimpleTestCase):
+    """Chunked serializers must produce valid JSON at every chunk boundary"""
+
+    def test_chunk_boundaries(self):
+        for size in (0, 1, 2, 3, 5):
+            rows = [{'id': i, 'title': f'Title "{i}"'} for i in range(size)]
+            with self.subTest(size=size):
+                self.assertEqual(json.loads(''.join(stream_json_array(iter(rows), chunk_size=2))), rows)
+                lines = ''.join(stream_ndjson(iter(rows), chunk_size=2)).splitlines()
+                self.assertEqual([json.loads(line) for line in lines], rows)
+
+
+class CatalogueConditionalTests(TestCase):
+    """Catalogue responses revalidate to 304 until a movie changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(show_id='s1', type='Movie', title='Title', release_year=2020)
+
+    def test_not_modified_until_a_movie_changes(self):
+        for url in ('/api/movies/', '/api/movies/page/', f'/review/{self.movie.id}/'):
+            with self.subTest(url=url):
+                self.client.get(url)  # the first page view sets the CSRF cookie
+                etag = self.client.get(url)['ETag']
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+                self.movie.poster_url = f'https://image.example/{url}.jpg'
+                self.movie.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+
+class ResponseCacheInvalidationTests(TestCase):
+    """Cached pages expire only when a movie they show (or their ordering) changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Movie.objects.bulk_create([
+            Movie(show_id=f's{i}', type='Movie', title=f'Title {i}', release_year=2000 + i)
+            for i in range(4)
+        ])
+
+    def setUp(self):
+        response_cache.cache.clear()
+        response_cache.reset_stats()
+
+    def fetch_first_page(self):
+        return self.client.get('/api/movies/page/?per_page=2&count=none').json()['results']
+
+    def test_targeted_invalidation(self):
+        shown = self.fetch_first_page()
+        newest, oldest = Movie.objects.get(id=shown[0]['id']), Movie.objects.order_by('release_year').first()
+
+        oldest.poster_url = 'https://image.example/old.jpg'
+        oldest.save()  # not on the page: still a hit
+        self.assertEqual(self.fetch_first_page(), shown)
+        self.assertEqual(response_cache.stats()['views']['movie_page']['hits'], 1)
+
+        newest.poster_url = 'https://image.example/new.jpg'
+        newest.save()  # on the page: recomputed
+        self.assertEqual(self.fetch_first_page()[0]['poster_url'], 'https://image.example/new.jpg')
+
+        oldest.release_year = 2050
+        oldest.save()  # moves onto the page: the ordering tag expires every page
+        self.assertEqual(self.fetch_first_page()[0]['id'], oldest.id)
+
+    def test_writes_this_process_did_not_signal_expire_entries(self):
+        shown = self.fetch_first_page()
+        # What another worker or a management command's process does: the row
+        # changes, but the invalidation lands in that process's cache
+        Movie.objects.filter(id=shown[0]['id']).update(poster_url='https://image.example/elsewhere.jpg')
+        forget_catalogue_stamp()  # as CATALOGUE_STAMP_TTL running out would
+
+        self.assertEqual(self.fetch_first_page()[0]['poster_url'], 'https://image.example/elsewhere.jpg')
+        self.assertEqual(response_cache.stats()['views']['movie_page'], {'hits': 0, 'misses': 2, 'hit_ratio': 0.0})
+
+
+class FtsSearchTests(TestCase):
+    """The FTS5 index ranks and prefix-matches, and its triggers follow every write"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Movie.objects.bulk_create([
+            Movie(show_id='s1', type='Movie', title='Quiet Harbour', release_year=2021,
+                  description='A lighthouse keeper and a storm'),
+            Movie(show_id='s2', type='Movie', title='Lighthouse', release_year=2001,
+                  description='Two keepers'),
+            Movie(show_id='s3', type='Movie', title='Lovebirds', release_year=2020),
+        ] + [
+            Movie(show_id=f'x{i}', type='Movie', title=f'Extra {i}', release_year=1990)
+            for i in range(60)
+        ])
+
+    def setUp(self):
+        response_cache.cache.clear()
+
+    def titles(self, query, limit=8):
+        return [movie.title for movie in search_movies_fts(query, limit)]
+
+    def test_title_matches_rank_first(self):
+        # The 2021 description match is newer, but title matches weigh more
+        self.assertEqual(self.titles('lighthouse'), ['Lighthouse', 'Quiet Harbour'])
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.titles('lov'), ['Lovebirds'])
+        self.assertEqual(self.titles('quiet harb'), ['Quiet Harbour'])
+
+    def test_limit_is_clamped(self):
+        for limit, expected in (('-1', 1), ('0', 1), ('1000', 50)):
+            with self.subTest(limit=limit):
+                response = self.client.get('/api/movies/search/', {'q': 'extra', 'limit': limit})
+                self.assertEqual(len(response.json()), expected)
+        response = self.client.get('/api/movies/search/', {'q': 'extra', 'limit': 'lots'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_index_follows_insert_update_delete(self):
+        movie = Movie.objects.create(show_id='s4', type='Movie', title='Zephyr', release_year=2022)
+        self.assertEqual(self.titles('zeph'), ['Zephyr'])
+
+        movie.title = 'Mistral'
+        movie.save()
+        self.assertEqual(self.titles('zeph'), [])
+        self.assertEqual(self.titles('mistr'), ['Mistral'])
+
+        movie.delete()
+        self.assertEqual(self.titles('mistr'), [])
+
+
+class ImportTitlesTests(TestCase):
+    """import_titles inserts new rows, skips or refreshes existing ones, and rejects bad rows"""
+
+    HEADER = 'show_id,type,title,director,cast,country,date_added,release_year,rating,duration,listed_in,description\n'
+
+    def import_csv(self, rows, *args):
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'titles.csv'
+        path.write_text(self.HEADER + ''.join(rows), encoding='utf-8')
+        out = io.StringIO()
+        call_command('import_titles', str(path), '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_insert_skip_and_update(self):
+        self.import_csv([
+            's2,TV Show,Beta,,,,,2002,,,,first\n',
+            's2,TV Show,Beta,,,,,2002,,,,second\n',  # duplicate in one batch: last row wins
+            's1,Movie, Alpha ,,,,,2001,,,,\n',
+            's3,Movie,Gamma,,,,,not-a-year,,,,\n',
+        ])
+        self.assertEqual(dict(Movie.objects.values_list('show_id', 'title')), {'s1': 'Alpha', 's2': 'Beta'})
+        self.assertEqual(Movie.objects.get(show_id='s2').description, 'second')
+
+        Movie.objects.filter(show_id='s1').update(poster_url='https://image.example/a.jpg')
+        changed = ['s1,Movie,Alpha Redux,,,,,2001,,,,\n']
+        self.import_csv(changed)
+        self.assertEqual(Movie.objects.get(show_id='s1').title, 'Alpha')
+
+        self.import_csv(changed, '--update')
+        movie = Movie.objects.get(show_id='s1')
+        self.assertEqual(movie.title, 'Alpha Redux')
+        self.assertEqual(movie.poster_url, 'https://image.example/a.jpg')  # not a CSV column: kept
+
+    def test_import_links_genres_and_countries(self):
+        self.import_csv([
+            's1,Movie,Alpha,,,"India, United States",,2001,,,"Dramas, Comedies",\n',
+            's2,Movie,Beta,,,India,,2002,,,Dramas,\n',
+        ])
+        self.assertEqual(list(Genre.objects.values_list('slug', flat=True)), ['comedies', 'dramas'])
+        self.assertEqual(Movie.objects.get(show_id='s1').countries.count(), 2)
+
+        # A changed listed_in replaces the links; backfill_tags rebuilds them from the strings
+        self.import_csv(['s2,Movie,Beta,,,India,,2002,,,Comedies,\n'], '--sync')
+        self.assertEqual(list(Movie.objects.get(show_id='s2').genres.values_list('name', flat=True)), ['Comedies'])
+        Movie.genres.through.objects.all().delete()
+        call_command('backfill_tags', stdout=io.StringIO())
+
+        page = self.client.get('/api/movies/page/', {'genre': 'comedies', 'country': 'india', 'fields': 'title'}).json()
+        self.assertEqual([row['title'] for row in page['results']], ['Beta', 'Alpha'])
+        page = self.client.get('/api/movies/page/', {'genre': 'dramas', 'fields': 'title'}).json()
+        self.assertEqual([row['title'] for row in page['results']], ['Alpha'])
+        self.assertEqual(self.client.get('/api/movies/page/', {'genre': 'westerns'}).json()['count'], 0)
+
+    def test_saved_movies_are_relinked(self):
+        movie = Movie.objects.create(show_id='s1', type='Movie', title='Alpha', release_year=2001,
+                                     listed_in='Dramas, Comedies', country='India')
+        self.assertEqual(sorted(movie.genres.values_list('slug', flat=True)), ['comedies', 'dramas'])
+
+        movie.title = 'Alpha (Director\'s Cut)'
+        with self.assertNumQueries(1):  # just the UPDATE: listed_in/country unchanged
+            movie.save()
+
+        movie.listed_in = 'Thrillers'
+        movie.save()
+        self.assertEqual(list(movie.genres.values_list('name', flat=True)), ['Thrillers'])
+        self.assertEqual(list(movie.countries.values_list('name', flat=True)), ['India'])
+
+    def test_tag_link_changes_bump_the_catalogue(self):
+        movie = Movie.objects.create(show_id='s1', type='Movie', title='Alpha', release_year=2001, listed_in='Dramas')
+        url = '/api/movies/page/?genre=comedies'
+        etag = self.client.get(url)['ETag']
+
+        comedies = Genre.objects.create(name='Comedies', slug='comedies')
+        movie.genres.add(comedies)  # e.g. the admin, no Movie save
+        forget_catalogue_stamp()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['title'] for row in response.json()['results']], ['Alpha'])
+
+        version = CatalogueStamp.objects.get().version
+        call_command('backfill_tags', stdout=io.StringIO())
+        self.assertGreater(CatalogueStamp.objects.get().version, version)
+
+    def test_sync_writes_only_the_diff(self):
+        rows = ['s1,Movie,Alpha,,,,,2001,,,,\n', 's2,Movie,Beta,,,,,2002,,,,\n', 's3,Movie,Gamma,,,,,2003,,,,\n']
+        self.import_csv(rows, '--sync')
+        Movie.objects.filter(show_id='s1').update(poster_url='https://image.example/a.jpg')
+
+        rows[1] = 's2,Movie,Beta (Remastered),,,,,2002,,,,\n'
+        out = self.import_csv(rows[:2], '--sync', '--delete-missing')
+        for line in ('created:   0', 'updated:   1', 'unchanged: 1', 'deleted:   1'):
+            self.assertIn(line, out)
+        self.assertEqual(
+            dict(Movie.objects.values_list('show_id', 'title')),
+            {'s1': 'Alpha', 's2': 'Beta (Remastered)'},
+        )
+        self.assertEqual(Movie.objects.get(show_id='s1').poster_url, 'https://image.example/a.jpg')
+
+
+class StubTMDbHandler(BaseHTTPRequestHandler):
+    """Answers /search/* like TMDb, throttling the first request with a 429"""
+    requests_seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        self.requests_seen.append(query['query'][0])
+        if len(self.requests_seen) == 1:
+            self.send_response(429)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        results = [] if query['query'][0] == 'Nowhere' else [{'poster_path': '/p.jpg', 'backdrop_path': '/b.jpg'}]
+        body = json.dumps({'results': results}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(TMDB_API_KEY='test-key')
+class FetchPostersTests(TestCase):
+    """fetch_posters against a local stub server: retries 429s, resumes from its checkpoint"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Movie.objects.bulk_create([
+            Movie(show_id=f's{i}', type='Movie', title=title, release_year=2000)
+            for i, title in enumerate(['Skipped', 'Somewhere', 'Nowhere'])
+        ])
+
+    def setUp(self):
+        StubTMDbHandler.requests_seen = []
+        server = HTTPServer(('127.0.0.1', 0), StubTMDbHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.api_base = f'http://127.0.0.1:{server.server_port}'
+
+    def test_resumes_from_checkpoint(self):
+        checkpoint = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'checkpoint.json'
+        first = Movie.objects.get(title='Skipped')
+        checkpoint.write_text(json.dumps({
+            'selection': 'missing', 'last_id': first.id, 'totals': {'updated': 1, 'not_found': 0, 'failed': 0},
+        }))
+
+        call_command('fetch_posters', '--api-base', self.api_base, '--checkpoint', str(checkpoint),
+                     '--workers', '2', stdout=io.StringIO())
+
+        self.assertNotIn('Skipped', StubTMDbHandler.requests_seen)
+        self.assertEqual(len(StubTMDbHandler.requests_seen), 3)  # one request was retried after the 429
+        posters = dict(Movie.objects.values_list('title', 'poster_url'))
+        self.assertEqual(posters['Somewhere'], 'https://image.tmdb.org/t/p/w500/p.jpg')
+        self.assertIsNone(posters['Nowhere'])
+        self.assertFalse(checkpoint.exists())  # finished runs leave no checkpoint
+
+
+class MovieSentimentSummaryTests(TestCase):
+    """Per-movie totals follow reviews as they are added and deleted"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(show_id='s1', type='Movie', title='Title', release_year=2020)
+
+    def result(self, sentiment, confidence):
+        positive = confidence if sentiment == 'positive' else 100 - confidence
+        return {
+            'sentiment': sentiment, 'confidence': confidence, 'model_version': 'v1',
+            'probabilities': {'positive': positive, 'negative': 100 - positive},
+        }
+
+    def test_totals_track_reviews(self):
+        url = f'/api/movies/{self.movie.id}/sentiment/'
+        self.assertEqual(self.client.get(url).json()['review_count'], 0)
+
+        review = record_review(self.movie.id, None, 'Loved it', self.result('positive', 90.0))
+        add_reviews([
+            review_from_result(self.movie.id, None, text, self.result(sentiment, 70.0))
+            for text, sentiment in (('Fine', 'positive'), ('Dull', 'negative'))
+        ])
+        response = self.client.get(url)
+        summary = response.json()
+        self.assertEqual((summary['review_count'], summary['positive_count'], summary['negative_count']), (3, 2, 1))
+        self.assertEqual(summary['positive_ratio'], round(2 / 3, 4))
+        self.assertAlmostEqual(summary['mean_confidence'], round(230 / 3, 2))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        review.delete()
+        summary = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).json()
+        self.assertEqual((summary['review_count'], summary['positive_count'], summary['mean_confidence']), (2, 1, 70.0))
+        self.assertEqual(self.client.get('/api/movies/999/sentiment/').status_code, 404)
+
+
+class ModelRegistryTests(SimpleTestCase):
+    """Versioned model files: newest or pinned one served, swapped in place, broken ones skipped"""
+
+    def setUp(self):
+        self.model_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.registry = ModelRegistry(self.model_dir, poll_interval=None)
+        self.enterContext(redirect_stdout(io.StringIO()))  # load messages
+        self.mtime = 1_700_000_000
+
+    def write(self, version, payload=None):
+        """Stand-in pipeline file, each one newer than the last"""
+        path = Path(self.model_dir) / f'{version}.pkl'
+        if payload is None:
+            joblib.dump({'version': version}, path)
+        else:
+            path.write_bytes(payload)
+        self.mtime += 10
+        os.utime(path, (self.mtime, self.mtime))
+
+    def test_newest_file_is_swapped_in(self):
+        self.write('v1')
+        first = self.registry.get()
+        self.assertEqual(first.pipeline, {'version': 'v1'})
+
+        self.write('v2')
+        self.assertIs(self.registry.get(), first)  # polling off: nothing changes until a reload
+        self.assertEqual(self.registry.reload().version, 'v2')
+        self.assertEqual(first.version, 'v1')  # requests holding the old model keep it
+
+        self.write('v3')
+        self.registry.poll_interval = 0
+        self.assertEqual(self.registry.get().version, 'v2')  # notices v3, loads it in the background
+        for thread in threading.enumerate():
+            if thread.name == 'sentiment-reload':
+                thread.join()
+        self.assertEqual(self.registry.current.version, 'v3')
+
+    def test_active_file_pins_a_version(self):
+        self.write('v1')
+        self.write('v2')
+        (Path(self.model_dir) / 'ACTIVE').write_text('v1\n')
+        self.assertEqual(self.registry.get().version, 'v1')
+
+        (Path(self.model_dir) / 'ACTIVE').write_text('v9')
+        self.assertEqual(self.registry.reload().version, 'v1')  # missing pin: keep serving
+        self.assertIn("'v9' not found", self.registry.error)
+
+    def test_broken_file_is_skipped_until_it_changes(self):
+        self.write('v1')
+        self.registry.get()
+        self.write('v2', b'not a pickle')
+        with mock.patch('app.sentiment.load_pipeline', wraps=load_pipeline) as load:
+            self.assertEqual(self.registry.reload().version, 'v1')
+            self.assertEqual(self.registry.reload().version, 'v1')
+        self.assertEqual(load.call_count, 1)
+        self.assertIsNotNone(self.registry.error)
+
+        self.write('v2')
+        self.assertEqual(self.registry.reload().version, 'v2')
+        self.assertIsNone(self.registry.error)
+
+
+class PredictionCacheTests(SimpleTestCase):
+    """Repeated reviews skip the pipeline until the model file changes"""
+
+    def setUp(self):
+        caches[SENTIMENT_CACHE_ALIAS].clear()
+        reset_cache_stats()
+        self.model = LoadedModel(None, 'v1', 'v1.pkl:10:1', None)
+        self.enterContext(mock.patch('app.sentiment.get_model', side_effect=lambda: self.model))
+        self.pipeline = self.enterContext(mock.patch(
+            'app.prediction_cache.score_texts_uncached',
+            side_effect=lambda texts, model: [{'sentiment': 'positive', 'confidence': 80.0} for _ in texts],
+        ))
+
+    def scored(self):
+        return [text for call in self.pipeline.call_args_list for text in call.args[0]]
+
+    def test_hits_skip_the_pipeline(self):
+        score_texts_cached(['Great film', 'Awful film'])
+        results = score_texts_cached(['  Great film ', 'New review', 'Awful film'])
+
+        self.assertEqual(self.scored(), ['Great film', 'Awful film', 'New review'])
+        self.assertEqual([result['model_version'] for result in results], ['v1'] * 3)
+        stats = self.client.get('/api/analyze-sentiment/cache/').json()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (2, 3, 0.4))
+
+    def test_new_model_file_misses(self):
+        score_text_cached('Great film')
+        self.model = LoadedModel(None, 'v1', 'v1.pkl:12:2', None)  # same version, rewritten file
+        self.assertEqual(score_text_cached('Great film')['model_version'], 'v1')
+
+        self.assertEqual(self.scored(), ['Great film', 'Great film'])
+        self.assertEqual((cache_stats()['hits'], cache_stats()['misses']), (0, 2))
+
+
+class MicroBatcherTests(SimpleTestCase):
+    """Concurrent single texts are scored together, per model, with a per-item retry on failure"""
+
+    def setUp(self):
+        self.calls = []
+        self.model = LoadedModel(None, 'v1', 'v1.pkl:10:1', None)
+
+    def score_batch(self, texts, model):
+        self.calls.append((model.version, list(texts)))
+        if 'bad' in texts:
+            raise ValueError('bad input')
+        return [{'text': text, 'model_version': model.version} for text in texts]
+
+    def test_batches_fill_up_then_flush_on_timeout(self):
+        batcher = MicroBatcher(self.score_batch, max_batch_size=4, max_wait_ms=200)
+        start = time.monotonic()
+        results = batcher.score_texts([f'review {i}' for i in range(6)], self.model, timeout=5)
+
+        self.assertEqual([result['text'] for result in results], [f'review {i}' for i in range(6)])
+        self.assertEqual([len(texts) for _, texts in self.calls], [4, 2])
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)  # the partial batch waited out max_wait
+        self.assertEqual(batcher.stats()['mean_batch_size'], 3.0)
+
+    def test_one_call_per_model_in_a_batch(self):
+        batcher = MicroBatcher(self.score_batch, max_batch_size=3, max_wait_ms=200)
+        new_model = LoadedModel(None, 'v2', 'v2.pkl:10:2', None)
+        futures = [batcher.submit('a', self.model), batcher.submit('b', new_model), batcher.submit('c', self.model)]
+
+        self.assertEqual([future.result(timeout=5)['model_version'] for future in futures], ['v1', 'v2', 'v1'])
+        self.assertEqual(self.calls, [('v1', ['a', 'c']), ('v2', ['b'])])
+
+    def test_failed_batch_is_retried_per_item(self):
+        batcher = MicroBatcher(self.score_batch, max_batch_size=3, max_wait_ms=200)
+        futures = [batcher.submit(text, self.model) for text in ('fine', 'bad', 'also fine')]
+
+        self.assertEqual(futures[0].result(timeout=5)['text'], 'fine')
+        with self.assertRaisesMessage(ValueError, 'bad input'):
+            futures[1].result(timeout=5)
+        self.assertEqual(futures[2].result(timeout=5)['text'], 'also fine')
+        self.assertEqual([texts for _, texts in self.calls], [['fine', 'bad', 'also fine'], ['fine'], ['bad'], ['also fine']])
+
+
+class InferencePoolTests(SimpleTestCase):
+    """Worker processes score with the model file and hand results back in input order"""
+
+    def test_results_in_input_order(self):
+        self.enterContext(stand_in_model())
+        model = model_registry.get()
+        texts = CORPUS[:40]  # more than one chunk per worker
+        pool = InferencePool(size=2)
+        self.addCleanup(pool.close)
+
+        expected = score_texts(texts, model=model)
+        self.assertEqual(pool.score_texts(texts, model), expected)
+        self.assertEqual(pool.submit(texts[:3], model).get(timeout=60), expected[:3])
+        self.assertEqual(pool.score_texts([], model), [])
+
+    def test_model_swap_while_scoring(self):
+        self.enterContext(stand_in_model())
+        old = model_registry.get()
+        new_path = Path(model_registry.model_dir) / 'v2.pkl'
+        shutil.copyfile(old.path, new_path)
+        os.utime(new_path, (time.time() + 10, time.time() + 10))
+        texts = CORPUS[:40]
+        expected = score_texts(texts, model=old)
+
+        pool = InferencePool(size=1)
+        self.addCleanup(pool.close)
+        pool.warm_up(old)
+
+        # Hold the first map() call (an old-model request that already has its
+        # pool) until the swap to v2 has happened
+        entered, swapped = threading.Event(), threading.Event()
+        real_map = multiprocessing.pool.Pool.map
+
+        def held_map(self_, *args, **kwargs):
+            if not entered.is_set():
+                entered.set()
+                swapped.wait(30)
+            return real_map(self_, *args, **kwargs)
+
+        results, errors = [], []
+
+        def score_old():
+            try:
+                results.append(pool.score_texts(texts, old))
+            except Exception as e:
+                errors.append(e)
+
+        with mock.patch.object(multiprocessing.pool.Pool, 'map', held_map):
+            thread = threading.Thread(target=score_old)
+            thread.start()
+            entered.wait(30)
+            new = model_registry.reload()
+            swapped_results = pool.score_texts(texts, new)
+            swapped.set()
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [expected])
+        self.assertEqual({result['model_version'] for result in swapped_results}, {'v2'})
+        # A request that still holds the old model after its pool is gone is scored inline
+        self.assertEqual(pool.score_texts(texts[:2], old), expected[:2])
+
+        for thread in threading.enumerate():
+            if thread.name == 'sentiment-pool-retire':
+                thread.join()
+        self.assertEqual(len(multiprocessing.active_children()), 1)  # the old pool's worker was joined
+
+
+class AnalyzeSentimentBatchTests(SimpleTestCase):
+    """One pipeline call per batch, results in input order, bad items reported per item"""
+
+    URL = '/api/analyze-sentiment/batch/'
+
+    def setUp(self):
+        self.enterContext(stand_in_model())
+
+    def post(self, body):
+        return self.client.post(self.URL, body if isinstance(body, str) else json.dumps(body),
+                                content_type='application/json')
+
+    def test_mixed_items_keep_their_order(self):
+        reviews = ['A wonderful, moving film', '', {'id': 'a', 'review': 'Dull and far too long'},
+                   {'id': 7}, 42, {'review': 'Brilliant acting'}]
+        data = self.post({'reviews': reviews}).json()
+
+        self.assertEqual((data['count'], data['failed']), (6, 3))
+        self.assertEqual([result['index'] for result in data['results']], list(range(6)))
+        self.assertEqual([result.get('id') for result in data['results']], [None, None, 'a', 7, None, None])
+        for index in (1, 3, 4):
+            self.assertEqual(data['results'][index]['error'], 'Review must be a non-empty string')
+        for index, text in ((0, 'A wonderful, moving film'), (2, 'Dull and far too long'), (5, 'Brilliant acting')):
+            single = self.client.post('/api/analyze-sentiment/', json.dumps({'review': text}),
+                                      content_type='application/json').json()
+            self.assertEqual(data['results'][index]['sentiment'], single['sentiment'])
+
+    def test_failed_batch_falls_back_to_single_items(self):
+        def score_one(text):
+            if text == 'boom':
+                raise ValueError('bad input')
+            return {'sentiment': 'positive', 'confidence': 90.0}
+
+        with mock.patch('app.views.score_texts_cached', side_effect=RuntimeError('batch failed')), \
+                mock.patch('app.views.score_text_cached', side_effect=score_one):
+            data = self.post({'reviews': ['fine', 'boom', 'also fine']}).json()
+        self.assertEqual([result['sentiment'] for result in data['results']], ['positive', 'unknown', 'positive'])
+        self.assertEqual(data['results'][1]['error'], 'Analysis failed: bad input')
+        self.assertEqual(data['failed'], 1)
+
+    def test_rejected_bodies(self):
+        for body in ('not json', '"a review"', '42', '[]', {'reviews': 'one review'}, {'reviews': []}):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+        response = self.post({'reviews': ['Good'] * 101})  # SENTIMENT_BATCH_MAX_SIZE = 100
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()['results'], [])
+
+
+class AsyncAnalyzeOverloadTests(SimpleTestCase):
+    """A full inference queue is a retryable 503, distinct from a model that can't load"""
+
+    URL = '/api/async/analyze-sentiment/'
+
+    def post(self):
+        return self.client.post(self.URL, json.dumps({'review': 'A wonderful film'}), content_type='application/json')
+
+    def test_overload_is_not_reported_as_a_missing_model(self):
+        self.addCleanup(model_registry.use_directory, model_registry.model_dir)
+        model_registry.use_directory(self.enterContext(tempfile.TemporaryDirectory()))  # no model files
+
+        with mock.patch('app.async_views.SENTIMENT_ASYNC_MAX_PENDING', 0):
+            response = self.post()
+        self.assertEqual((response.status_code, response['Retry-After']), (503, '1'))
+        self.assertEqual(response.json()['error'], 'Sentiment service is busy, please retry')
+
+        response = self.post()
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn('Retry-After', response)
+        self.assertEqual(response.json()['error'], 'Sentiment model not available')
+
+    def test_overload_while_scoring(self):
+        self.enterContext(stand_in_model())
+        model_registry.get()
+        self.assertEqual(self.post().status_code, 200)
+        with mock.patch('app.async_views.SENTIMENT_ASYNC_MAX_PENDING', 0):
+            response = self.post()
+        self.assertEqual((response.status_code, response['Retry-After']), (503, '1'))
+
+
+@skipUnless(model_registry.selected()[1], 'needs a sentiment model file')
+class AnalyzeSentimentSaveTests(TestCase):
+    """Scoring needs no CSRF token; saving a review under a movie does, and a well-formed movie_id"""
+
+    URLS = ('/api/analyze-sentiment/', '/api/async/analyze-sentiment/')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(show_id='s1', type='Movie', title='Title', release_year=2020)
+
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+
+    def post(self, url, token=None, **data):
+        headers = {'X-CSRFToken': token} if token else {}
+        return self.client.post(url, json.dumps({'review': 'A wonderful film', **data}),
+                                content_type='application/json', headers=headers)
+
+    def test_saving_needs_a_csrf_token(self):
+        for url in self.URLS:
+            with self.subTest(url=url):
+                self.assertEqual(self.post(url).status_code, 200)
+                self.assertEqual(self.post(url, movie_id=self.movie.id).status_code, 403)
+        self.assertFalse(Review.objects.exists())
+
+        self.client.get(f'/review/{self.movie.id}/')  # sets the CSRF cookie
+        token = self.client.cookies['csrftoken'].value
+        for url in self.URLS:
+            with self.subTest(url=url):
+                response = self.post(url, token, movie_id=str(self.movie.id))
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('review_id', response.json())
+        self.assertEqual(Review.objects.filter(movie=self.movie).count(), 2)
+
+    def test_movie_id_must_be_an_integer(self):
+        self.client.get(f'/review/{self.movie.id}/')
+        token = self.client.cookies['csrftoken'].value
+        for url in self.URLS:
+            for movie_id in (True, 1.0, [1], '1.0', ' 1', '¹'):
+                with self.subTest(url=url, movie_id=movie_id):
+                    self.assertEqual(self.post(url, token, movie_id=movie_id).status_code, 400)
+            self.assertEqual(self.post(url, token, movie_id=self.movie.id + 1).status_code, 404)
+        self.assertFalse(Review.objects.exists())
+
+
+@skipUnless(model_registry.selected()[1], 'needs a sentiment model file')
+class ScoreReviewsTests(TestCase):
+    """score_reviews saves scored reviews and resumes after the last finished chunk"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = Movie.objects.create(show_id='s1', type='Movie', title='Title', release_year=2020)
+
+    def test_resume_skips_finished_chunks(self):
+        tmp = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        source = tmp / 'reviews.jsonl'
+        source.write_text(''.join(
+            json.dumps({'id': i, 'movie_id': self.movie.id, 'review': text}) + '\n'
+            for i, text in enumerate(['Loved it', 'Awful', '', 'Brilliant film', 'Boring'])
+        ))
+        checkpoint = tmp / 'checkpoint.json'
+        stat = source.stat()
+        # As if an earlier run finished the first chunk (rows 0-1) and was killed
+        checkpoint.write_text(json.dumps({
+            'source': {'input': str(source.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns},
+            'model_version': model_registry.selected()[0], 'chunks': 1, 'rows': 2, 'offset': 0,
+            'totals': {'scored': 2, 'skipped': 0, 'saved': 2},
+        }))
+
+        call_command('score_reviews', str(source), '--to-db', '--workers', '0', '--chunk-size', '2',
+                     '--checkpoint', str(checkpoint), stdout=io.StringIO())
+
+        self.assertEqual(sorted(Review.objects.values_list('text', flat=True)), ['Boring', 'Brilliant film'])
+        self.assertEqual(MovieSentiment.objects.get(movie=self.movie).review_count, 2)
+        self.assertFalse(checkpoint.exists())
+
+    def test_malformed_movie_keys_are_skipped(self):
+        tmp = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        source = tmp / 'reviews.jsonl'
+        movies = [self.movie.id, str(self.movie.id), 'abc', True, 1.5, {'id': 1}, self.movie.id + 1, None]
+        source.write_text(''.join(
+            json.dumps({'id': i, 'movie_id': movie, 'review': f'Review {i}'}) + '\n' for i, movie in enumerate(movies)
+        ))
+        out = io.StringIO()
+        call_command('score_reviews', str(source), '--to-db', '--workers', '0', '--restart',
+                     '--checkpoint', str(tmp / 'checkpoint.json'), stdout=out)
+
+        self.assertEqual(sorted(Review.objects.values_list('text', flat=True)), ['Review 0', 'Review 1'])
+        self.assertIn('skipped: 6 (unknown or malformed movie)', out.getvalue())
+
+
+class BenchmarkCompareTests(TestCase):
+    """--json output can be fed back as --compare, which fails on slowdowns past the threshold"""
+
+    def test_compare_flags_regressions(self):
+        tmp = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        baseline = tmp / 'baseline.json'
+        call_command('benchmark', 'normalizer', '--repeat', '1', '--json', str(baseline), stdout=io.StringIO())
+
+        results = json.loads(baseline.read_text())
+        self.assertIn('commit', results['meta'])
+        rows = results['suites']['normalizer']
+        self.assertTrue(rows and all(row['median'] > 0 for row in rows))
+
+        # Same code, generous threshold: no regression
+        call_command('benchmark', 'normalizer', '--repeat', '1', '--compare', str(baseline),
+                     '--threshold', '10', stdout=io.StringIO())
+
+        # A baseline a thousand times faster makes every row a regression
+        for row in rows:
+            row['median'] /= 1000
+        baseline.write_text(json.dumps(results))
+        with self.assertRaisesMessage(CommandError, f'{len(rows)} benchmark(s) slower'):
+            call_command('benchmark', 'normalizer', '--repeat', '1', '--compare', str(baseline), stdout=io.StringIO())
+
+
+class MetricsTests(TestCase):
+    """Sampled requests get a Server-Timing header and show up on /metrics"""
+
+    def setUp(self):
+        metrics_registry.reset()
+        response_cache.cache.clear()
+        self.enterContext(mock.patch('app.metrics.METRICS_SAMPLE_RATE', 1.0))
+        self.enterContext(mock.patch('app.metrics.METRICS_SERVER_TIMING', True))
+
+    def test_registry_quantiles(self):
+        registry = MetricsRegistry(window=100)
+        for value in range(1, 101):
+            registry.observe('http_request_db_queries', value, view='movies')
+        text = registry.render()
+        self.assertIn('# TYPE moviereview_http_request_db_queries summary', text)
+        self.assertIn('moviereview_http_request_db_queries{view="movies",quantile="0.5"} 51', text)
+        self.assertIn('moviereview_http_request_db_queries{view="movies",quantile="0.99"} 99', text)
+        self.assertIn('moviereview_http_request_db_queries_sum{view="movies"} 5050', text)
+        self.assertIn('moviereview_http_request_db_queries_count{view="movies"} 100', text)
+
+    def test_search_is_timed_per_stage(self):
+        Movie.objects.create(show_id='s1', type='Movie', title='Love Actually', release_year=2003)
+        response = self.client.get('/api/movies/search/', {'q': 'love'})
+        self.assertEqual(response.status_code, 200)
+        stages = {entry.split(';')[0] for entry in response['Server-Timing'].split(', ')}
+        self.assertTrue({'search', 'db', 'total'} <= stages)
+
+        with mock.patch('app.metrics.METRICS_ALLOWED_IPS', ['127.0.0.1']):
+            text = self.client.get('/metrics').content.decode()
+        self.assertIn(
+            'moviereview_http_request_duration_seconds_count{method="GET",status="200",view="movie_search_api"} 1', text
+        )
+        self.assertIn('moviereview_http_request_stage_seconds_count{stage="search",view="movie_search_api"} 1', text)
+
+    def test_metrics_are_for_staff_and_allowed_addresses(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(User.objects.create_user('viewer'))
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
@@ -0,0 +1,174 @@
+from django.conf import settings
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+import random
+import requests
+import threading
+import time
+
+# Base URLs are settings so the fetcher can be pointed at a local stub server
+TMDB_API_BASE = getattr(settings, 'TMDB_API_BASE', 'https://api.themoviedb.org/3')
+TMDB_IMAGE_BASE = getattr(settings, 'TMDB_IMAGE_BASE', 'https://image.tmdb.org/t/p/w500')
+
+# Requests per second across all threads, and how many may go out back to back
+TMDB_RATE_LIMIT = getattr(settings, 'TMDB_RATE_LIMIT', 20)
+TMDB_RATE_BURST = getattr(settings, 'TMDB_RATE_BURST', 10)
+
+# Retries for 429s, 5xx responses and connection errors, with exponential backoff
+TMDB_MAX_RETRIES = getattr(settings, 'TMDB_MAX_RETRIES', 5)
+TMDB_BACKOFF_BASE = getattr(settings, 'TMDB_BACKOFF_BASE', 0.5)
+TMDB_BACKOFF_MAX = getattr(settings, 'TMDB_BACKOFF_MAX', 30.0)
+TMDB_TIMEOUT = getattr(settings, 'TMDB_TIMEOUT', 10)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TMDbError(Exception):
+    """Request that still failed after all retries"""
+
+
+class TMDbAuthError(TMDbError):
+    """API key missing or rejected: no other request can succeed either"""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst` saved up
+
+    acquire() blocks until a token is free. pause() empties the bucket until
+    a deadline, so one 429 slows every thread down, not only the one that
+    got it.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now > self._updated:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                # Time until the next token (or the end of a pause)
+                wait = max(self._updated - now, 0) + (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Hand out no tokens for `seconds` (e.g. a server's Retry-After)"""
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = max(self._updated, time.monotonic() + seconds)
+
+
+def retry_after(response):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TMDbClient:
+    """
+    TMDb search over one pooled requests.Session
+
+    Keep-alive connections are shared by every thread (pool_size should be
+    at least the number of threads). All requests go through the token
+    bucket; 429s pause it for Retry-After, other retryable failures back
+    off exponentially with jitter.
+    """
+
+    def __init__(self, api_key, api_base=TMDB_API_BASE, image_base=TMDB_IMAGE_BASE,
+                 rate=TMDB_RATE_LIMIT, burst=TMDB_RATE_BURST, max_retries=TMDB_MAX_RETRIES,
+                 timeout=TMDB_TIMEOUT, pool_size=10):
+        self.api_key = api_key
+        self.api_base = api_base.rstrip('/')
+        self.image_base = image_base
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, burst)
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0}
+        self._stats_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def close(self):
+        self.session.close()
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def backoff(self, attempt):
+        delay = min(TMDB_BACKOFF_MAX, TMDB_BACKOFF_BASE * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    def get(self, path, **params):
+        """GET {api_base}{path} as JSON, retrying throttled and failed requests"""
+        params['api_key'] = self.api_key
+        url = f'{self.api_base}{path}'
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            self._count('requests')
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code in (401, 403):
+                        raise TMDbAuthError(f"HTTP {response.status_code}: check the TMDb API key")
+                    if response.status_code >= 400:
+                        raise TMDbError(f"HTTP {response.status_code}")
+                    return response.json()
+
+                error = TMDbError(f"HTTP {response.status_code}")
+                wait = retry_after(response)
+                if response.status_code == 429:
+                    self._count('throttled')
+                    self.bucket.pause(wait if wait is not None else self.backoff(attempt))
+                    if attempt < self.max_retries:
+                        self._count('retries')
+                    continue
+                if wait is not None:
+                    self.bucket.pause(wait)
+
+            if attempt < self.max_retries:
+                self._count('retries')
+                time.sleep(self.backoff(attempt))
+        raise TMDbError(f"{path} failed after {self.max_retries + 1} attempts: {error}")
+
+    def search_images(self, title, year, media_type='movie'):
+        """(poster_url, backdrop_url) of the best match, or None when nothing matched"""
+        year_param = 'first_air_date_year' if media_type == 'tv' else 'year'
+        data = self.get(f'/search/{media_type}', query=title, **{year_param: year})
+        results = data.get('results') or []
+        if not results:
+            return None
+
+        result = results[0]
+        poster_path, backdrop_path = result.get('poster_path'), result.get('backdrop_path')
+        return (
+            f'{self.image_base}{poster_path}' if poster_path else None,
+            f'{self.image_base}{backdrop_path}' if backdrop_path else None,
+        )
@@ -1,11 +1,22 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('', views.main, name='main'),
     path('movies/', views.movies, name='movies'),
     path('review/<int:movie_id>/', views.movie_detail, name='movie_detail'),
     path('api/movies/', views.movie_list, name='movie_list'),
+    path('api/movies/page/', views.movie_page, name='movie_page'),
+    path('api/movies/cache/', views.response_cache_stats, name='response_cache_stats'),
     path('api/movies/search/', views.movie_search_api, name='movie_search_api'),
+    path('api/movies/<int:movie_id>/sentiment/', views.movie_sentiment_api, name='movie_sentiment_api'),
     path('api/analyze-sentiment/', views.analyze_sentiment, name='analyze_sentiment'),
+    path('api/analyze-sentiment/batch/', views.analyze_sentiment_batch, name='analyze_sentiment_batch'),
+    path('api/analyze-sentiment/cache/', views.sentiment_cache_stats, name='sentiment_cache_stats'),
+    path('api/async/movies/', async_views.movie_list, name='movie_list_async'),
+    path('api/async/movies/search/', async_views.movie_search_api, name='movie_search_api_async'),
+    path('api/async/analyze-sentiment/', async_views.analyze_sentiment, name='analyze_sentiment_async'),
+    path('healthz/', views.healthz, name='healthz'),
+    path('readyz/', views.readyz, name='readyz'),
+    path('metrics', views.metrics, name='metrics'),  # no slash: the path Prometheus scrapes by default
 ]
\ No newline at end of file
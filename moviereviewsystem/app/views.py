@@ -1,57 +1,86 @@
 from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from django.conf import settings
 from .models import Movie
-import os
-import joblib
-import pandas as pd
+from . import autocomplete, search
+from .metrics import can_read_metrics, metrics_registry, stage, timed
+from .catalogue import catalogue_api, catalogue_page
+from .response_cache import ORDER_TAG, SEARCH_TAG, movie_tag, response_cache
+from .pagination import BROWSE_ORDERING, COUNT_MODES, InvalidCursor, KeysetPaginator
+from .sentiment import clean_text_manual, model_registry
+from .prediction_cache import cache_stats, score_text_cached, score_texts_cached
+from .reviews import record_review, sentiment_etag, sentiment_summary
+from .taxonomy import tag_options
 import json
-import re
-import string
-import nltk
-from nltk.corpus import stopwords
 
-# Ensure NLTK stopwords are available
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Upper bound on reviews per batch request so memory stays bounded
+SENTIMENT_BATCH_MAX_SIZE = getattr(settings, 'SENTIMENT_BATCH_MAX_SIZE', 100)
 
-STOP_WORDS = set(stopwords.words("english"))
 
+def analyze_review(review_text):
+    """Score one review and add the texts shown on the results card"""
+    # Clean the text manually (to show in results)
+    with stage('clean'):
+        cleaned_text = clean_text_manual(review_text)
+
+    # One pass through the pipeline (label derived from the probabilities),
+    # skipped entirely when the same text was scored before
+    result = score_text_cached(review_text)
+    result['cleaned_text'] = cleaned_text  # Send cleaned text to frontend
+    result['original_text'] = review_text  # Send original text too
+    return result
+
+
+def review_movie_id(data):
+    """
+    Movie an analyze request wants the review saved under, or None
 
-def clean_text_manual(text):
+    Raises ValueError for a malformed movie_id, Movie.DoesNotExist for an unknown one.
     """
-    Manual text cleaning function to show preprocessing
+    movie_id = data.get('movie_id')
+    if movie_id in (None, ''):
+        return None
+    # int(True) == 1 and int(' 7 ') == 7: take only JSON integers and digit strings
+    if isinstance(movie_id, str) and movie_id.isascii() and movie_id.isdigit():
+        movie_id = int(movie_id)
+    elif isinstance(movie_id, bool) or not isinstance(movie_id, int):
+        raise ValueError('movie_id must be an integer')
+    if not Movie.objects.filter(id=movie_id).exists():
+        raise Movie.DoesNotExist(f'Movie {movie_id} not found')
+    return movie_id
+
+
+def csrf_passes(request):
     """
-    if not text:
-        return ""
+    True when the request passes Django's CSRF check
 
-    # Apply cleaning steps
-    text = re.sub("<.*?>", "", text)  # remove HTML tags
-    text = re.sub("[%s]" % re.escape(string.punctuation), "", text)  # remove punctuation
-    text = re.sub("\d+", "", text)  # remove numbers
-    text = text.lower()  # lowercase
+    The analyze endpoints are csrf_exempt so API clients can score text
+    without a session, but saving a review changes state, so that part only
+    happens for requests carrying the site's CSRF token.
+    """
+    return CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {}) is None
 
-    # Remove stopwords
-    text = " ".join([word for word in text.split() if word not in STOP_WORDS])
-    return text
 
+def csrf_rejected():
+    return JsonResponse({
+        'error': 'CSRF token missing or incorrect; reviews are only saved from the site',
+        'sentiment': 'unknown',
+        'confidence': 0
+    }, status=403)
 
-# Load the model once when the server starts
-MODEL_PATH = os.path.join(settings.BASE_DIR, 'model', 'sentiment_classification_pipeline_new.pkl')
 
-try:
-    sentiment_pipeline = joblib.load(MODEL_PATH)
-    MODEL_LOADED = True
-    print("✅ Sentiment model loaded successfully!")
-except Exception as e:
-    sentiment_pipeline = None
-    MODEL_LOADED = False
-    print(f"❌ Error loading sentiment model: {e}")
+def save_review(result, movie_id, user, review_text):
+    """Persist a scored review and add its id and the movie's new summary to the result"""
+    review = record_review(movie_id, user, review_text, result)
+    result['review_id'] = review.id
+    result['summary'] = sentiment_summary(movie_id)
+    return result
 
 
 @csrf_exempt
@@ -59,8 +88,11 @@ except Exception as e:
 def analyze_sentiment(request):
     """
     API endpoint to analyze sentiment of a movie review
+
+    With a movie_id the review is also saved and counted in that movie's
+    summary; that needs a valid CSRF token (X-CSRFToken), scoring alone doesn't.
     """
-    if not MODEL_LOADED:
+    if model_registry.get() is None:
         return JsonResponse({
             'error': 'Sentiment model not available',
             'sentiment': 'unknown',
@@ -69,7 +101,8 @@ def analyze_sentiment(request):
 
     try:
         # Parse JSON data
-        data = json.loads(request.body)
+        with stage('parse'):
+            data = json.loads(request.body)
         review_text = data.get('review', '').strip()
 
         if not review_text:
@@ -79,40 +112,141 @@ def analyze_sentiment(request):
                 'confidence': 0
             }, status=400)
 
-        # Clean the text manually (to show in results)
-        cleaned_text = clean_text_manual(review_text)
+        if data.get('movie_id') not in (None, '') and not csrf_passes(request):
+            return csrf_rejected()
+        try:
+            movie_id = review_movie_id(data)
+        except ValueError as e:
+            return JsonResponse({'error': str(e), 'sentiment': 'unknown', 'confidence': 0}, status=400)
+        except Movie.DoesNotExist as e:
+            return JsonResponse({'error': str(e), 'sentiment': 'unknown', 'confidence': 0}, status=404)
+
+        result = analyze_review(review_text)
+        if movie_id is not None:
+            save_review(result, movie_id, request.user, review_text)
+        with stage('serialize'):
+            return JsonResponse(result)
 
-        # Create a pandas Series for the input (as expected by your pipeline)
-        review_series = pd.Series([review_text])
+    except Exception as e:
+        return JsonResponse({
+            'error': f'Analysis failed: {str(e)}',
+            'sentiment': 'unknown',
+            'confidence': 0
+        }, status=500)
 
-        # Get prediction (0 = negative, 1 = positive)
-        prediction = sentiment_pipeline.predict(review_series)[0]
 
-        # Get prediction probabilities for confidence score
-        probabilities = sentiment_pipeline.predict_proba(review_series)[0]
-        confidence = max(probabilities) * 100  # Convert to percentage
+@csrf_exempt
+@require_http_methods(["POST"])
+def analyze_sentiment_batch(request):
+    """
+    API endpoint to analyze sentiment of many reviews in one pipeline call
 
-        # Convert to sentiment labels
-        sentiment = 'positive' if prediction == 1 else 'negative'
+    Expects {"reviews": [...]} where each item is either a review string or
+    an object {"id": ..., "review": "..."}. Invalid items get a per-item
+    error instead of failing the whole batch.
+    """
+    if model_registry.get() is None:
+        return JsonResponse({
+            'error': 'Sentiment model not available',
+            'results': []
+        }, status=503)
+
+    try:
+        with stage('parse'):
+            data = json.loads(request.body)
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'Invalid JSON body', 'results': []}, status=400)
+
+    reviews = data.get('reviews') if isinstance(data, dict) else None
+    if not isinstance(reviews, list) or not reviews:
+        return JsonResponse({'error': 'No reviews provided', 'results': []}, status=400)
 
+    if len(reviews) > SENTIMENT_BATCH_MAX_SIZE:
         return JsonResponse({
-            'sentiment': sentiment,
-            'confidence': round(confidence, 2),
-            'prediction': int(prediction),
-            'cleaned_text': cleaned_text,  # Send cleaned text to frontend
-            'original_text': review_text,  # Send original text too
-            'probabilities': {
-                'negative': round(probabilities[0] * 100, 2),
-                'positive': round(probabilities[1] * 100, 2)
-            }
+            'error': f'Too many reviews: at most {SENTIMENT_BATCH_MAX_SIZE} per batch',
+            'results': []
+        }, status=413)
+
+    # Validate every item first so only clean text reaches the pipeline
+    results = []
+    valid_texts = []
+    for index, item in enumerate(reviews):
+        result = {'index': index}
+        review_text = item
+        if isinstance(item, dict):
+            if 'id' in item:
+                result['id'] = item['id']
+            review_text = item.get('review')
+
+        if isinstance(review_text, str) and review_text.strip():
+            valid_texts.append((result, review_text.strip()))
+        else:
+            result.update({
+                'error': 'Review must be a non-empty string',
+                'sentiment': 'unknown',
+                'confidence': 0
+            })
+        results.append(result)
+
+    if valid_texts:
+        try:
+            # One vectorized call for the whole batch
+            scores = score_texts_cached([text for _, text in valid_texts])
+            for (result, _), score in zip(valid_texts, scores):
+                result.update(score)
+        except Exception:
+            # Fall back to one-by-one scoring so a single bad entry is isolated
+            for result, review_text in valid_texts:
+                try:
+                    result.update(score_text_cached(review_text))
+                except Exception as e:
+                    result.update({
+                        'error': f'Analysis failed: {str(e)}',
+                        'sentiment': 'unknown',
+                        'confidence': 0
+                    })
+
+    with stage('serialize'):
+        return JsonResponse({
+            'results': results,
+            'count': len(results),
+            'failed': sum(1 for result in results if 'error' in result),
         })
 
-    except Exception as e:
-        return JsonResponse({
-            'error': f'Analysis failed: {str(e)}',
-            'sentiment': 'unknown',
-            'confidence': 0
-        }, status=500)
+
+def sentiment_cache_stats(request):
+    """API endpoint exposing prediction cache hit/miss counters"""
+    return JsonResponse(cache_stats())
+
+
+def response_cache_stats(request):
+    """API endpoint exposing page/API response cache hit ratios per view"""
+    return JsonResponse(response_cache.stats())
+
+
+def metrics(request):
+    """Request latency, per-stage timings and query counts in the Prometheus text format (staff/allowlist only)"""
+    if not can_read_metrics(request):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain; charset=utf-8')
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def healthz(request):
+    """Liveness probe: the process is up and serving requests"""
+    return JsonResponse({'status': 'ok'})
+
+
+def readyz(request):
+    """Readiness probe: reports whether the sentiment model is loaded (never loads it)"""
+    model = model_registry.current
+    ready = model is not None
+    return JsonResponse({
+        'ready': ready,
+        'model_loaded': ready,
+        'model_version': model.version if ready else None,
+        'model_loading': model_registry.loading,
+        'error': model_registry.error,
+    }, status=200 if ready else 503)
 
 
 def main(request):
@@ -120,95 +254,410 @@ def main(request):
     return render(request, 'main.html')
 
 
-def movies(request):
-    """Movies browser page with filtering and pagination"""
-    type_filter = request.GET.get('type', '').strip().lower()
+MOVIE_TYPES = {'movie': 'Movie', 'tv': 'TV Show'}
+MOVIES_PER_PAGE = 24
+
+
+def parse_tag_filters(request):
+    """Genre and country slugs from ?genre= / ?country= ('' when not filtering)"""
+    return request.GET.get('genre', '').strip().lower(), request.GET.get('country', '').strip().lower()
+
 
+def filter_by_tags(queryset, genre='', country=''):
+    """
+    Movies linked to the genre/country with these slugs
+
+    Joins through the indexed movie_genres / movie_countries tables instead
+    of scanning listed_in / country with LIKE. An unknown slug matches nothing.
+    """
+    if genre:
+        queryset = queryset.filter(genres__slug=genre)
+    if country:
+        queryset = queryset.filter(countries__slug=country)
+    return queryset
+
+
+def browse_movies(type_filter='', genre='', country=''):
+    """Movies for the browser, optionally filtered by type ('movie' or 'tv'), genre and country, newest first"""
     # Get all movies
-    movies_list = Movie.objects.all()
+    movies_list = filter_by_tags(Movie.objects.all(), genre, country)
 
     # Apply type filter
     if type_filter and type_filter != 'all':
-        type_mapping = {'movie': 'Movie', 'tv': 'TV Show'}
-        db_type = type_mapping.get(type_filter)
+        db_type = MOVIE_TYPES.get(type_filter)
         if db_type:
             movies_list = movies_list.filter(type=db_type)
 
-    # Order by release year (newest first) then title
-    movies_list = movies_list.order_by('-release_year', 'title')
+    # Order by release year (newest first) then title; served by the
+    # movie_type_year_title_idx / movie_year_title_idx indexes
+    return movies_list.order_by('-release_year', 'title')
+
 
-    # Pagination with error handling
-    paginator = Paginator(movies_list, 24)
-    page_number = request.GET.get('page', 1)
+@timed('grid')
+def render_movie_grid(type_filter, cursor, genre='', country=''):
+    """Rendered grid + pagination for one browser page, with its cache tags"""
+    # Cursor pagination: no OFFSET, and the total count comes from the cache
+    paginator = KeysetPaginator(browse_movies(type_filter, genre, country), MOVIES_PER_PAGE)
 
     try:
-        page_obj = paginator.page(page_number)
-    except (EmptyPage, PageNotAnInteger):
-        page_obj = paginator.page(1)
+        page_obj = paginator.page(cursor)
+    except InvalidCursor:
+        page_obj = paginator.page()
 
-    context = {
+    html = render_to_string('movie_grid.html', {
         'page_obj': page_obj,
         'type_filter': type_filter if type_filter else 'all',
-        'total_movies': paginator.count,
+        # Appended to the pagination links so they keep the filters
+        'filter_query': filter_query(type=type_filter, genre=genre, country=country),
+    })
+    tags = [ORDER_TAG] + [movie_tag(movie.id) for movie in page_obj]
+    return {'html': html, 'total_movies': paginator.count}, tags
+
+
+def filter_query(**filters):
+    """'&type=tv&genre=dramas' for the filters that are set ('all' counts as unset)"""
+    filters = {name: value for name, value in filters.items() if value and value != 'all'}
+    return f'&{urlencode(filters)}' if filters else ''
+
+
+def render_movie_filters(type_filter, genre, country):
+    """Rendered genre/country menus, with their cache tags"""
+    html = render_to_string('movie_filters.html', {
+        'type_filter': type_filter if type_filter else 'all',
+        'genre': genre,
+        'country': country,
+        **tag_options(),
+    })
+    return html, [ORDER_TAG]
+
+
+@catalogue_page
+def movies(request):
+    """Movies browser page with filtering and pagination"""
+    type_filter = request.GET.get('type', '').strip().lower()
+    genre, country = parse_tag_filters(request)
+    cursor = request.GET.get('cursor', '')
+
+    # The grid is cached per (type, genre, country, cursor); the page around it
+    # shows the logged-in user and CSRF tokens, so it's rendered every time
+    grid = response_cache.get_or_compute(
+        'movies', (type_filter, genre, country, cursor),
+        lambda: render_movie_grid(type_filter, cursor, genre, country)
+    )
+    filters = response_cache.get_or_compute(
+        'movie_filters', (type_filter, genre, country), lambda: render_movie_filters(type_filter, genre, country)
+    )
+
+    context = {
+        'grid_html': mark_safe(grid['html']),
+        'type_filter': type_filter if type_filter else 'all',
+        'filters_html': mark_safe(filters),
+        # Appended to the type tabs so they keep the genre/country
+        'tag_query': filter_query(genre=genre, country=country),
+        'total_movies': grid['total_movies'],
     }
 
     return render(request, 'movies.html', context)
 
 
+@timed('panel')
+def render_movie_panel(movie_id):
+    """Rendered detail panel for one movie, with its cache tags"""
+    movie = get_object_or_404(Movie, id=movie_id)
+    html = render_to_string('movie_detail_panel.html', {'movie': movie})
+    header = {'title': movie.title, 'backdrop_url': movie.backdrop_url}
+    return {'html': html, 'movie': header}, [movie_tag(movie.id)]
+
+
+@catalogue_page(extra_etag=sentiment_etag)
 def movie_detail(request, movie_id):
     """Movie detail view"""
-    movie = get_object_or_404(Movie, id=movie_id)
+    detail = response_cache.get_or_compute(
+        'movie_detail', (movie_id,), lambda: render_movie_panel(movie_id)
+    )
 
     context = {
-        'movie': movie,
+        'movie': detail['movie'],  # title and backdrop for the <head> blocks
+        'movie_id': movie_id,
+        'panel_html': mark_safe(detail['html']),
+        # Running totals: one row, however many reviews there are
+        'sentiment': sentiment_summary(movie_id),
     }
 
     return render(request, 'review.html', context)
 
 
-def movie_search_api(request):
-    """API endpoint for movie title search"""
+@condition(etag_func=sentiment_etag)
+def movie_sentiment_api(request, movie_id):
+    """API endpoint with a movie's review sentiment summary"""
+    summary = sentiment_summary(movie_id)
+    if not summary['review_count'] and not Movie.objects.filter(id=movie_id).exists():
+        return JsonResponse({'error': 'Movie not found'}, status=404)
+    return JsonResponse(summary)
+
+
+def parse_search_params(request):
+    """
+    Read the search query, a validated result limit and the search mode from the request
+
+    The limit is clamped to 1..50 (SQLite treats a negative LIMIT as no limit
+    at all); raises ValueError when it isn't an integer.
+    """
     query = request.GET.get('q', '').strip()
+    mode = request.GET.get('mode', 'full')
 
     # Validate limit parameter
     try:
-        limit = min(int(request.GET.get('limit', 8)), 50)  # Max 50
+        limit = max(1, min(int(request.GET.get('limit', 8)), 50))  # Max 50
     except (ValueError, TypeError):
-        limit = 8
+        raise ValueError('limit must be an integer')
+
+    return query, limit, mode
+
+
+def search_movies(query, limit, mode='full'):
+    """
+    Movies matching the query, as dicts
+
+    mode='typeahead' matches titles only from the in-memory autocomplete index
+    (newest first); anything else is a full-text search over title, cast,
+    director and description, best match first.
+    """
+    if mode == 'typeahead' and autocomplete.MOVIE_AUTOCOMPLETE_ENABLED:
+        with stage('typeahead'):
+            return autocomplete.autocomplete_index.lookup(query, limit)
+
+    return response_cache.get_or_compute(
+        'movie_search', (query, limit), lambda: full_text_search(query, limit)
+    )
+
+
+@timed('search')
+def full_text_search(query, limit):
+    """Full-text search results as dicts, with their cache tags"""
+    movies = search.search(query, limit)
+
+    # Build results
+    results = [{
+        'id': m.id,
+        'title': m.title,
+        'release_year': m.release_year,
+        'type': m.type,
+        'rating': m.rating,
+        'poster_url': m.poster_url,
+    } for m in movies]
+    return results, [SEARCH_TAG] + [movie_tag(m.id) for m in movies]
+
+
+@catalogue_api
+def movie_search_api(request):
+    """API endpoint for movie search (full-text, prefix-matching for typeahead)"""
+    try:
+        query, limit, mode = parse_search_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
     # Require minimum 2 characters
     if not query or len(query) < 2:
         return JsonResponse([], safe=False)
 
     try:
-        # Search by title only
-        movies = Movie.objects.filter(
-            title__icontains=query
-        ).order_by('-release_year', 'title')[:limit]
-
-        # Build results
-        results = [{
-            'id': m.id,
-            'title': m.title,
-            'release_year': m.release_year,
-            'type': m.type,
-            'rating': m.rating,
-            'poster_url': m.poster_url,
-        } for m in movies]
-
-        return JsonResponse(results, safe=False)
+        return JsonResponse(search_movies(query, limit, mode), safe=False)
 
     except Exception as e:
         return JsonResponse({'error': 'Search failed'}, status=500)
 
 
-def movie_list(request):
-    """API endpoint for all movies"""
+MOVIE_LIST_FIELDS = (
+    'id', 'title', 'release_year', 'type', 'rating',
+    'listed_in', 'description', 'poster_url', 'backdrop_url'
+)
+
+# Rows fetched from the database (and serialized) per chunk when streaming
+MOVIE_STREAM_CHUNK_SIZE = 500
+
+# Upper bound on ?limit= for /api/movies/
+MOVIE_LIST_MAX_LIMIT = 1000
+
+
+def parse_movie_fields(request):
+    """
+    Fields requested with ?fields=id,title,poster_url (default: MOVIE_LIST_FIELDS)
+
+    Raises ValueError naming any field that isn't in MOVIE_LIST_FIELDS.
+    """
+    requested = request.GET.get('fields', '').strip()
+    if not requested:
+        return MOVIE_LIST_FIELDS
+
+    fields = tuple(dict.fromkeys(field.strip() for field in requested.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in MOVIE_LIST_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Choose from {', '.join(MOVIE_LIST_FIELDS)}")
+    return fields
+
+
+@timed('page')
+def paginate_fields(queryset, fields, per_page, cursor, **options):
+    """
+    One KeysetPaginator page of `queryset` projected to `fields`
+
+    The ordering columns and id are selected too (the next cursor and
+    page.movie_ids are built from them) and dropped from the returned rows
+    if they weren't requested.
+    """
+    ordering = options.get('ordering', BROWSE_ORDERING)
+    columns = tuple(dict.fromkeys(fields + tuple(field.lstrip('-') for field in ordering) + ('id',)))
+    paginator = KeysetPaginator(queryset.values(*columns), per_page, **options)
+    page = paginator.page(cursor)
+    page.movie_ids = [row['id'] for row in page.object_list]
+    if columns != fields:
+        page.object_list = [{field: row[field] for field in fields} for row in page.object_list]
+    return paginator, page
+
+
+def list_movies(fields=MOVIE_LIST_FIELDS, genre='', country=''):
+    """Every movie (of a genre/country, if given) as a dict of `fields`"""
+    return list(filter_by_tags(Movie.objects.all(), genre, country).values(*fields))
+
+
+def stream_json_array(rows, chunk_size=MOVIE_STREAM_CHUNK_SIZE):
+    """Serialize rows as one JSON array, yielding a chunk of text per `chunk_size` rows"""
+    yield '['
+    chunk = []
+    separator = ''
+    for row in rows:
+        chunk.append(json.dumps(row))
+        if len(chunk) == chunk_size:
+            yield separator + ','.join(chunk)
+            chunk, separator = [], ','
+    if chunk:
+        yield separator + ','.join(chunk)
+    yield ']'
+
+
+def stream_ndjson(rows, chunk_size=MOVIE_STREAM_CHUNK_SIZE):
+    """Serialize rows as newline-delimited JSON, yielding a chunk of text per `chunk_size` rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(row) + '\n')
+        if len(chunk) == chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+@catalogue_api
+def movie_page(request):
+    """
+    Paginated API endpoint for movies, newest first
+
+    Query params: cursor (from a previous response), per_page (max 100),
+    type ('movie' or 'tv'), genre and country (slugs), count ('cached',
+    'exact' or 'none'; 'exact' is only counted on the first page) and fields
+    (as for /api/movies/).
+    """
+    type_filter = request.GET.get('type', '').strip().lower()
+    genre, country = parse_tag_filters(request)
+    count = request.GET.get('count', 'cached')
+    if count not in COUNT_MODES:
+        return JsonResponse({'error': f'count must be one of {", ".join(COUNT_MODES)}'}, status=400)
+
+    try:
+        per_page = max(1, min(int(request.GET.get('per_page', MOVIES_PER_PAGE)), 100))  # Max 100
+    except (ValueError, TypeError):
+        per_page = MOVIES_PER_PAGE
+
+    try:
+        fields = parse_movie_fields(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    cursor = request.GET.get('cursor', '')
+
+    def compute():
+        paginator, page = paginate_fields(browse_movies(type_filter, genre, country), fields, per_page, cursor,
+                                          count=count)
+        data = {
+            'results': page.object_list,
+            'page': page.number,
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+            'count': paginator.count,
+            'num_pages': paginator.num_pages,
+        }
+        return data, [ORDER_TAG] + [movie_tag(movie_id) for movie_id in page.movie_ids]
+
     try:
-        movies = Movie.objects.all().values(
-            'id', 'title', 'release_year', 'type', 'rating',
-            'listed_in', 'description', 'poster_url', 'backdrop_url'
+        data = response_cache.get_or_compute(
+            'movie_page', (type_filter, genre, country, count, per_page, fields, cursor), compute
         )
-        return JsonResponse(list(movies), safe=False)
+    except InvalidCursor:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    return JsonResponse(data)
+
+
+@catalogue_api
+def movie_list(request):
+    """
+    API endpoint for all movies, streamed
+
+    Query params:
+      fields          comma-separated subset of MOVIE_LIST_FIELDS (default: all)
+      genre, country  only movies linked to this genre/country slug
+      format          'json' (one array, the default) or 'ndjson' (one object per line)
+      limit / cursor  return one page in id order; the next page's URL is in
+                      the Link header (rel="next")
+
+    Without limit/cursor the whole catalogue is streamed from a chunked
+    queryset iterator, so memory stays flat and the first bytes go out
+    before the last rows are read.
+    """
+    try:
+        fields = parse_movie_fields(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    output = request.GET.get('format', 'json')
+    if output not in ('json', 'ndjson'):
+        return JsonResponse({'error': "format must be 'json' or 'ndjson'"}, status=400)
+
+    cursor = request.GET.get('cursor')
+    next_url = None
+    queryset = filter_by_tags(Movie.objects.all(), *parse_tag_filters(request))
+
+    try:
+        if 'limit' in request.GET or cursor:
+            try:
+                limit = max(1, min(int(request.GET.get('limit', MOVIE_LIST_MAX_LIMIT)), MOVIE_LIST_MAX_LIMIT))
+            except (ValueError, TypeError):
+                return JsonResponse({'error': 'limit must be an integer'}, status=400)
+
+            # id order walks the primary key
+            try:
+                _, page = paginate_fields(queryset, fields, limit, cursor,
+                                          ordering=('id',), count='none')
+            except InvalidCursor:
+                return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+            rows = page.object_list
+            if page.has_next():
+                params = request.GET.copy()
+                params['cursor'] = page.next_cursor
+                params['limit'] = limit
+                next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+        else:
+            rows = queryset.order_by('id').values(*fields).iterator(chunk_size=MOVIE_STREAM_CHUNK_SIZE)
+
+        if output == 'ndjson':
+            response = StreamingHttpResponse(stream_ndjson(rows), content_type='application/x-ndjson')
+        else:
+            response = StreamingHttpResponse(stream_json_array(rows), content_type='application/json')
+        if next_url:
+            response['Link'] = f'<{next_url}>; rel="next"'
+        return response
+
     except Exception as e:
-        return JsonResponse({'error': 'Failed to fetch movies'}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': 'Failed to fetch movies'}, status=500)
@@ -5,6 +5,7 @@ Generated by 'django-admin startproject' using Django 5.2.7.
 """
 
 from pathlib import Path
+import os
 
 # ---------------------------
 # 🧱 Base Directory
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
 # 🧩 Middleware
 # ---------------------------
 MIDDLEWARE = [
+    'app.metrics.MetricsMiddleware',  # first, so its timings cover the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -117,6 +119,140 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = BASE_DIR / "staticfiles"  # Where collectstatic gathers files
 
+# ---------------------------
+# 🗄️ Caches
+# ---------------------------
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Sentiment predictions keyed by hash(review text + model file identity).
+    # Local-memory is a per-process LRU; for several workers on one box switch to:
+    #   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    #   'LOCATION': BASE_DIR / 'cache' / 'sentiment',
+    'sentiment': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sentiment-predictions',
+        'TIMEOUT': 60 * 60 * 24,  # TTL in seconds
+        'OPTIONS': {'MAX_ENTRIES': 10000},  # bound; least recently used entries are culled
+    },
+    # Rendered movie grids/detail panels and catalogue API results, expired per
+    # movie by tag (app/response_cache.py). Writes from other processes expire
+    # all of a worker's entries once it sees the catalogue stamp move; with a
+    # shared backend their tag invalidations reach every worker instead:
+    #   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    #   'LOCATION': BASE_DIR / 'cache' / 'responses',
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalogue-responses',
+        'TIMEOUT': 60 * 10,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+
+# ---------------------------
+# 🧠 Sentiment Analysis
+# ---------------------------
+# Max reviews accepted by /api/analyze-sentiment/batch/ in one request
+SENTIMENT_BATCH_MAX_SIZE = 100
+
+# Versioned pipelines (<version>.pkl). The newest file is served unless one is
+# pinned with `manage.py activate_model <version>`; workers re-check every
+# SENTIMENT_MODEL_POLL_INTERVAL seconds and swap models without a restart.
+SENTIMENT_MODEL_DIR = BASE_DIR / 'model'
+SENTIMENT_MODEL_POLL_INTERVAL = 5
+
+# Memory-map <version>.joblib models (made by `manage.py convert_model_mmap`)
+# so worker processes share the NumPy arrays through the page cache
+SENTIMENT_MODEL_MMAP = True
+
+# Load the model in a background thread when a web worker starts
+# (management commands never load it; otherwise it loads on first request)
+SENTIMENT_WARMUP = True
+
+# Fetch the NLTK stopwords corpus on first use if it is missing
+SENTIMENT_DOWNLOAD_STOPWORDS = True
+
+# Micro-batching: concurrent requests are queued and scored together by one
+# worker thread, flushed every MAX_WAIT_MS or at MAX_BATCH_SIZE items
+SENTIMENT_MICROBATCH_ENABLED = False
+SENTIMENT_MICROBATCH_MAX_BATCH_SIZE = 32
+SENTIMENT_MICROBATCH_MAX_WAIT_MS = 5
+
+# Inference backend: 'inline' (calling thread) or 'process' (pre-forked pool of
+# SENTIMENT_PROCESS_POOL_SIZE workers, each loading the model once; None = CPUs)
+SENTIMENT_INFERENCE_BACKEND = 'inline'
+SENTIMENT_PROCESS_POOL_SIZE = None
+SENTIMENT_PROCESS_START_METHOD = 'spawn'
+
+# Async endpoints (/api/async/...): inference thread pool size per process and
+# max scoring requests in flight before new ones get a 503
+SENTIMENT_ASYNC_INFERENCE_WORKERS = 4
+SENTIMENT_ASYNC_MAX_PENDING = 256
+
+# Cache predictions for repeated reviews (see CACHES['sentiment'])
+SENTIMENT_CACHE_ENABLED = True
+SENTIMENT_CACHE_ALIAS = 'sentiment'
+
+# ---------------------------
+# 🔎 Movie Search & Browsing
+# ---------------------------
+# Typeahead (/api/movies/search/?mode=typeahead) is served from an in-memory
+# title index built at startup; each worker checks the catalogue version for
+# changes made elsewhere every REFRESH_INTERVAL seconds
+MOVIE_AUTOCOMPLETE_ENABLED = True
+MOVIE_AUTOCOMPLETE_REFRESH_INTERVAL = 60
+
+# Movies browser and /api/movies/page/ use cursor pagination; the total count
+# shown next to it is cached for this many seconds
+MOVIES_COUNT_CACHE_TIMEOUT = 300
+
+# Catalogue responses carry an ETag/Last-Modified from a version stamp that
+# every Movie write bumps; APIs are cacheable by shared caches for MAX_AGE
+# seconds, pages revalidate privately. Each process re-reads the stamp at most
+# every STAMP_TTL seconds.
+CATALOGUE_CACHE_MAX_AGE = 60
+CATALOGUE_STAMP_TTL = 1.0
+
+# Server-side cache of rendered grids/detail panels and API results
+# (see CACHES['responses']); hit ratios at /api/movies/cache/
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# ---------------------------
+# 🎞️ TMDb Posters
+# ---------------------------
+# `manage.py fetch_posters` reads the key from the environment. Point
+# TMDB_API_BASE at a local stub server to test the fetcher offline.
+TMDB_API_KEY = os.environ.get('TMDB_API_KEY', '')
+TMDB_API_BASE = 'https://api.themoviedb.org/3'
+TMDB_IMAGE_BASE = 'https://image.tmdb.org/t/p/w500'
+
+# Requests/sec shared by all fetch threads (token bucket, BURST back to back);
+# 429s pause every thread for Retry-After, other failures back off exponentially
+TMDB_RATE_LIMIT = 20
+TMDB_RATE_BURST = 10
+TMDB_MAX_RETRIES = 5
+
+# Progress of an interrupted fetch_posters run (resumed on the next run)
+TMDB_CHECKPOINT_PATH = BASE_DIR / 'cache' / 'fetch_posters.json'
+
+# ---------------------------
+# 📈 Metrics
+# ---------------------------
+# Sampled requests get a Server-Timing header (parse, clean, cache, inference,
+# vectorize, classify, db, serialize, search, grid, ...) and are recorded in
+# per-process summaries served at /metrics. SAMPLE_RATE 0 turns it all off;
+# raise it (and turn SERVER_TIMING on) while profiling, not in production.
+METRICS_SAMPLE_RATE = 0.01
+METRICS_SERVER_TIMING = False
+# /metrics is for staff users and these client addresses (e.g. the Prometheus
+# scraper); behind a reverse proxy REMOTE_ADDR is the proxy's address
+METRICS_ALLOWED_IPS = []
+# Recent observations per series that p50/p95/p99 are computed over
+METRICS_WINDOW = 1024
+
 # ---------------------------
 # 🧩 Default Auto Field
 # ---------------------------